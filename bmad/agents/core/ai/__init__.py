@@ -20,10 +20,13 @@ from .llm_client import (
     assess_complexity,
     assess_security_risk,
     calculate_confidence,
+    StreamingCompletion,
+    stream_openai_with_confidence,
 )
 
 __all__ = [
     "ConfidenceScoring",
+    "StreamingCompletion",
     "ask_openai",
     "ask_openai_with_confidence",
     "assess_complexity",
@@ -31,5 +34,6 @@ __all__ = [
     "calculate_confidence",
     "confidence_scoring",
     "create_review_request",
-    "format_confidence_message"
+    "format_confidence_message",
+    "stream_openai_with_confidence"
 ]
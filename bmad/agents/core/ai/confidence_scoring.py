@@ -7,23 +7,29 @@ en review requirements te bepalen voor hun output.
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from .llm_client import calculate_confidence
+from .memoization import ContentMemo, content_hash
 
 logger = logging.getLogger(__name__)
 
+# Context velden waar de score van afhangt; de timestamp telt niet mee
+_SCORED_CONTEXT_KEYS = ("agent", "task", "llm_confidence", "output")
+
 class ConfidenceScoring:
     """
     Utility class voor confidence scoring en review management.
     """
 
-    def __init__(self):
+    def __init__(self, memo_size: int = 1024):
         self.review_thresholds = {
             "low": 0.5,      # Vereist volledige review
             "medium": 0.8,   # Notificeer maar ga door
             "high": 1.0      # Auto-approve
         }
+        # Scores van herhaalde output/context combinaties
+        self._score_memo = ContentMemo(memo_size)
 
     def enhance_agent_output(
         self,
@@ -51,14 +57,7 @@ class ConfidenceScoring:
             "timestamp": datetime.now().isoformat()
         })
 
-        # Bereken confidence score
-        confidence = calculate_confidence(output, context)
-
-        # Bepaal review requirement
-        review_required = self._determine_review_requirement(confidence, context)
-
-        # Bepaal review level
-        review_level = self._get_review_level(confidence)
+        confidence, review_required, review_level = self._score(output, context)
 
         # Maak enhanced output
         enhanced_output = {
@@ -79,6 +78,25 @@ class ConfidenceScoring:
 
         return enhanced_output
 
+    def _score(self, output: str, context: Dict[str, Any]) -> Tuple[float, bool, str]:
+        """
+        Confidence, review requirement en review level, gememoized op de inhoud.
+
+        De key bevat alleen de output, de gescoorde context velden en de
+        thresholds. Andere context velden tellen mee in de security-risk
+        heuristiek, dus zulke contexts worden altijd opnieuw gescoord.
+        """
+        def compute() -> Tuple[float, bool, str]:
+            confidence = calculate_confidence(output, context)
+            review_required = self._determine_review_requirement(confidence, context)
+            return confidence, review_required, self._get_review_level(confidence)
+
+        if any(k != "timestamp" and k not in _SCORED_CONTEXT_KEYS for k in context):
+            return compute()
+        key = content_hash(output, *(repr(context.get(k)) for k in _SCORED_CONTEXT_KEYS),
+                           repr(tuple(self.review_thresholds.items())))
+        return self._score_memo.get_or_compute(key, compute)
+
     def _determine_review_requirement(self, confidence: float, context: Dict[str, Any]) -> bool:
         """
         Bepaal of menselijke review vereist is.
@@ -1,14 +1,20 @@
+import asyncio
 import hashlib
 import json
 import logging
 import os
+import threading
 import time
-from copy import deepcopy
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from bmad.agents.core.ai.response_cache import ShardedFileCache
+from bmad.core.ai.async_llm_client import get_llm_performance_monitor
+from bmad.core.ai.context_compaction import compact_messages
 from bmad.agents.core.data.redis_cache import cache_llm_response
 
 # Optionele YAML support voor per-agent configuratie
@@ -20,31 +26,99 @@ except Exception:  # pragma: no cover
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-nano")
 CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+# Token budget voor de messages van één request (0 = geen limiet); per request te overschrijven via context["context_token_budget"]
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "0"))
+
+# HTTP connection pool (keep-alive) voor alle OpenAI calls
+HTTP_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("LLM_HTTP_READ_TIMEOUT", "30"))
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
 os.makedirs(CACHE_DIR, exist_ok=True)
 
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Gedeelde requests.Session met connection pooling; hergebruikt TCP/TLS verbindingen."""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+def configure_http_session(pool_size: Optional[int] = None,
+                           connect_timeout: Optional[float] = None,
+                           read_timeout: Optional[float] = None) -> None:
+    """Pas pool grootte en timeouts aan; de sessie wordt bij het volgende request opnieuw opgebouwd."""
+    global HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+    if pool_size is not None:
+        HTTP_POOL_SIZE = pool_size
+    if connect_timeout is not None:
+        HTTP_CONNECT_TIMEOUT = connect_timeout
+    if read_timeout is not None:
+        HTTP_READ_TIMEOUT = read_timeout
+    close_http_session()
+
+def close_http_session() -> None:
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
 # --- Helper: file-cache fallback ---
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_COMPRESS = os.getenv("LLM_CACHE_COMPRESS", "1").lower() not in ("0", "false", "no")
+
+file_cache = ShardedFileCache(
+    CACHE_DIR,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl=LLM_CACHE_TTL,
+    compress=LLM_CACHE_COMPRESS,
+)
+
 def _file_cache_get(key: str) -> Optional[dict]:
-    path = os.path.join(CACHE_DIR, f"{key}.json")
-    if os.path.exists(path):
-        try:
-            with open(path, encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            logging.warning(f"[LLM][FILECACHE] Fout bij lezen: {e}")
+    try:
+        return file_cache.get(key)
+    except Exception as e:
+        logging.warning(f"[LLM][FILECACHE] Fout bij lezen: {e}")
     return None
 
 def _file_cache_set(key: str, value: dict):
-    path = os.path.join(CACHE_DIR, f"{key}.json")
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(value, f, indent=2)
+        file_cache.set(key, value)
     except Exception as e:
         logging.warning(f"[LLM][FILECACHE] Fout bij schrijven: {e}")
 
 # --- Einde file-cache helpers ---
 
+def _record_metrics(started_at: float, model: str, context: Dict[str, Any], usage: Any = None,
+                    cached: bool = False, error: bool = False, ttft: Optional[float] = None):
+    """Report one request to the shared LLM performance monitor."""
+    usage = usage if isinstance(usage, dict) else {}
+    get_llm_performance_monitor().record_request(
+        time.time() - started_at,
+        cached=cached,
+        error=error,
+        model=model or None,
+        agent=context.get("agent"),
+        prompt_tokens=int(usage.get("prompt_tokens") or 0),
+        completion_tokens=int(usage.get("completion_tokens") or 0),
+        ttft=ttft
+    )
+
 def _cache_key(prompt: str, model: str, temperature: float, max_tokens: int, logprobs: bool) -> str:
     key = json.dumps({
         "prompt": prompt,
@@ -94,15 +168,18 @@ def assess_complexity(task_description: str) -> float:
         complexity_score = 0.2 + (low_count * 0.1)
     return min(1.0, complexity_score)
 
+SECURITY_KEYWORDS = (
+    "password", "token", "key", "secret", "auth", "login", "admin", "root",
+    "delete", "drop", "remove", "update", "modify", "change", "deploy"
+)
+
+def _security_keyword_count(text: str) -> int:
+    text_lower = text.lower()
+    return sum(1 for keyword in SECURITY_KEYWORDS if keyword in text_lower)
+
 def assess_security_risk(output: str, context: Dict[str, Any]) -> float:
-    security_keywords = [
-        "password", "token", "key", "secret", "auth", "login", "admin", "root",
-        "delete", "drop", "remove", "update", "modify", "change", "deploy"
-    ]
-    output_lower = output.lower()
-    context_lower = str(context).lower()
-    security_count = sum(1 for keyword in security_keywords if keyword in output_lower)
-    context_security_count = sum(1 for keyword in security_keywords if keyword in context_lower)
+    security_count = _security_keyword_count(output)
+    context_security_count = _security_keyword_count(str(context))
     risk_score = min(1.0, (security_count + context_security_count) * 0.1)
     agent_type = context.get("agent", "").lower()
     if "security" in agent_type or "admin" in agent_type:
@@ -150,23 +227,104 @@ def _to_snake_case(name: str) -> str:
         result.append(ch.lower())
     return "".join(result)
 
+# Agent configs worden in-process gecached en alleen opnieuw geparsed als het YAML bestand wijzigt
+AGENT_CONFIG_ROOT = Path(__file__).resolve().parents[5] / "bmad" / "agents" / "Agent"
+AGENT_CONFIG_CHECK_INTERVAL = float(os.getenv("BMAD_AGENT_CONFIG_CHECK_INTERVAL", "2"))
+# Begrensd op aantal agents (LRU), zodat willekeurige agent namen de cache niet laten groeien
+AGENT_CONFIG_CACHE_SIZE = int(os.getenv("BMAD_AGENT_CONFIG_CACHE_SIZE", "256"))
+
+class _AgentConfigEntry:
+    __slots__ = ("path", "mtime_ns", "config", "model", "checked_at")
+
+    def __init__(self, path: Optional[Path], mtime_ns: Optional[int], config: Dict[str, Any], checked_at: float):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.config = config
+        self.model = _model_from_agent_config(config)
+        self.checked_at = checked_at
+
+_agent_configs: "OrderedDict[str, _AgentConfigEntry]" = OrderedDict()
+_agent_config_lock = threading.Lock()
+_agent_routes_loaded = False
+
+def _model_from_agent_config(cfg: Dict[str, Any]) -> Optional[str]:
+    # Ondersteun zowel llm.model als llm_model
+    try:
+        from_llm_block = cfg.get("llm", {}) if isinstance(cfg.get("llm"), dict) else {}
+        yaml_model = from_llm_block.get("model") or cfg.get("llm_model")
+        if isinstance(yaml_model, str) and yaml_model:
+            return yaml_model
+    except Exception:
+        pass
+    return None
+
+def _find_agent_yaml(agent_name: str) -> Tuple[Optional[Path], Optional[int]]:
+    # Probeer meerdere bestandsnamen
+    agent_dir = AGENT_CONFIG_ROOT / agent_name
+    for path in (agent_dir / f"{agent_name.lower()}.yaml", agent_dir / f"{_to_snake_case(agent_name)}.yaml"):
+        try:
+            return path, path.stat().st_mtime_ns
+        except OSError:
+            continue
+    return None, None
+
+def _agent_config_entry(agent_name: str) -> _AgentConfigEntry:
+    now = time.monotonic()
+    entry = _agent_configs.get(agent_name)
+    if entry is not None and now - entry.checked_at < AGENT_CONFIG_CHECK_INTERVAL:
+        return entry
+
+    with _agent_config_lock:
+        path, mtime_ns = _find_agent_yaml(agent_name) if yaml else (None, None)
+        entry = _agent_configs.get(agent_name)
+        if entry is not None and entry.path == path and entry.mtime_ns == mtime_ns:
+            entry.checked_at = now
+            _agent_configs.move_to_end(agent_name)
+            return entry
+
+        config: Dict[str, Any] = {}
+        if path is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    config = yaml.safe_load(f) or {}
+            except Exception as e:
+                logging.debug(f"[LLM] Kon agent YAML niet laden voor {agent_name}: {e}")
+        entry = _agent_configs[agent_name] = _AgentConfigEntry(path, mtime_ns, config, now)
+        _agent_configs.move_to_end(agent_name)
+        while len(_agent_configs) > max(AGENT_CONFIG_CACHE_SIZE, 1):
+            _agent_configs.popitem(last=False)
+        return entry
+
 def _load_agent_yaml(agent_name: str) -> Dict[str, Any]:
-    if not yaml:
+    return _agent_config_entry(agent_name).config
+
+def load_agent_model_routes() -> Dict[str, Optional[str]]:
+    """Parse de YAML van alle agents onder AGENT_CONFIG_ROOT en bouw de routing table."""
+    global _agent_routes_loaded
+    _agent_routes_loaded = True
+    if yaml is None:
         return {}
     try:
-        # Probeer meerdere bestandsnamen
-        agent_dir = Path(__file__).resolve().parents[5] / "bmad" / "agents" / "Agent" / agent_name
-        candidates = [
-            agent_dir / f"{agent_name.lower()}.yaml",
-            agent_dir / f"{_to_snake_case(agent_name)}.yaml",
-        ]
-        for path in candidates:
-            if path.exists():
-                with open(path, "r", encoding="utf-8") as f:
-                    return yaml.safe_load(f) or {}
-    except Exception as e:
-        logging.debug(f"[LLM] Kon agent YAML niet laden voor {agent_name}: {e}")
-    return {}
+        agent_dirs = sorted(p.name for p in AGENT_CONFIG_ROOT.iterdir()
+                            if p.is_dir() and not p.name.startswith(("_", ".")))
+    except OSError as e:
+        logging.debug(f"[LLM] Agent configs niet gevonden in {AGENT_CONFIG_ROOT}: {e}")
+        agent_dirs = []
+    for agent_name in agent_dirs:
+        _agent_config_entry(agent_name)
+    return get_agent_model_routes()
+
+def get_agent_model_routes() -> Dict[str, Optional[str]]:
+    """Routing table agent → effectief model (ENV → YAML → project default); YAML wordt op mtime gecontroleerd."""
+    if not _agent_routes_loaded:
+        load_agent_model_routes()
+    return {name: resolve_agent_model({"agent": name}, None) for name in list(_agent_configs)}
+
+def clear_agent_config_cache() -> None:
+    global _agent_routes_loaded
+    with _agent_config_lock:
+        _agent_configs.clear()
+        _agent_routes_loaded = False
 
 def resolve_agent_model(context: Optional[Dict[str, Any]], explicit_model: Optional[str]) -> str:
     """Bepaal het model op volgorde: expliciet → context → ENV per-agent → YAML → project default."""
@@ -183,20 +341,53 @@ def resolve_agent_model(context: Optional[Dict[str, Any]], explicit_model: Optio
         env_model = os.getenv(env_key)
         if env_model:
             return env_model
-        # YAML per-agent
-        cfg = _load_agent_yaml(agent_name)
-        if cfg:
-            # Ondersteun zowel llm.model als llm_model
-            try:
-                from_llm_block = cfg.get("llm", {}) if isinstance(cfg.get("llm"), dict) else {}
-                yaml_model = from_llm_block.get("model") or cfg.get("llm_model")
-                if isinstance(yaml_model, str) and yaml_model:
-                    return yaml_model
-            except Exception:
-                pass
+        # YAML per-agent (gecached, herladen bij mtime wijziging)
+        yaml_model = _agent_config_entry(agent_name).model
+        if yaml_model:
+            return yaml_model
     # Project default
     return OPENAI_MODEL
 
+def _build_request(prompt: str, context: Dict[str, Any], model: str, temperature: float,
+                   max_tokens: int, structured_output: Optional[str], include_logprobs: bool,
+                   stream: bool) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Headers en payload voor een chat completion request."""
+    headers = {
+        "Authorization": f"Bearer {OPENAI_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    # Build messages
+    messages = []
+    if context.get("system_prompt"):
+        messages.append({"role": "system", "content": context["system_prompt"]})
+    
+    if context.get("conversation_history"):
+        messages.extend(context["conversation_history"])
+    
+    messages.append({"role": "user", "content": prompt})
+    
+    # Stable system prefix on every request; conversation content only changes over the budget
+    messages = compact_messages(messages, context.get("context_token_budget") or LLM_CONTEXT_TOKEN_BUDGET or None)
+    
+    # Prepare request payload
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": stream
+    }
+    
+    if include_logprobs:
+        payload["logprobs"] = True
+        payload["top_logprobs"] = 5
+    
+    if structured_output:
+        payload["response_format"] = {"type": "json_object"}
+    
+    return headers, payload
+
 @cache_llm_response
 def ask_openai_with_confidence(
     prompt: str, 
@@ -224,102 +415,61 @@ def ask_openai_with_confidence(
     Returns:
         Dict with response and metadata
     """
-    print(f"DEBUG: ask_openai_with_confidence called with prompt: {prompt}")
-    print(f"DEBUG: context: {context}")
-    print(f"DEBUG: model: {model}")
-    print(f"DEBUG: OPENAI_API_KEY: {OPENAI_API_KEY}")
-    
     if not prompt or not isinstance(prompt, str):
         raise ValueError("Prompt must be a non-empty string")
     
-    # Deep copy context to avoid mutations
-    context = deepcopy(context) if context else {}
+    # Context wordt alleen gelezen, nooit gemuteerd: geen kopie nodig
+    context = context or {}
     
     # Resolve model per-agent (explicit → context → ENV → YAML → OPENAI_MODEL)
     model = resolve_agent_model(context, model)
     
-    print(f"DEBUG: Using model: {model}")
-    
     # Generate cache key
     cache_key = _cache_key(prompt, model, temperature, max_tokens, include_logprobs)
+    logger.debug("[LLM] ask_openai_with_confidence model=%s agent=%s cache_key=%s",
+                 model, context.get("agent"), cache_key)
     
-    print(f"DEBUG: Generated cache key: {cache_key}")
+    started_at = time.time()
     
     # Check cache first (non-streaming only)
     if not stream:
         cached_response = _file_cache_get(cache_key)
         if cached_response:
-            logging.debug(f"LLM response from cache: {cache_key}")
-            print(f"DEBUG: Found cached response: {cached_response}")
+            logger.debug("[LLM] Response from cache: %s", cache_key)
+            _record_metrics(started_at, model, context, cached=True)
             return cached_response
     
-    print(f"DEBUG: No cache hit, proceeding with API call")
+    headers, payload = _build_request(prompt, context, model, temperature, max_tokens,
+                                      structured_output, include_logprobs, stream)
     
-    # Prepare request
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    print(f"DEBUG: Prepared headers: {headers}")
-    
-    # Build messages
-    messages = []
-    if context.get("system_prompt"):
-        messages.append({"role": "system", "content": context["system_prompt"]})
-    
-    if context.get("conversation_history"):
-        messages.extend(context["conversation_history"])
-    
-    messages.append({"role": "user", "content": prompt})
-    
-    print(f"DEBUG: Built messages: {messages}")
-    
-    # Prepare request payload
-    payload = {
-        "model": model,
-        "messages": messages,
-        "temperature": temperature,
-        "max_tokens": max_tokens,
-        "stream": stream
-    }
-    
-    if include_logprobs:
-        payload["logprobs"] = True
-        payload["top_logprobs"] = 5
-    
-    if structured_output:
-        payload["response_format"] = {"type": "json_object"}
-    
-    print(f"DEBUG: Making API request with payload: {payload}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[LLM] Request payload: %s", json.dumps(payload, default=str))
     
     try:
-        print(f"DEBUG: About to make requests.post call")
-        # Make request
-        response = requests.post(
-            "https://api.openai.com/v1/chat/completions",
+        # Make request over the pooled keep-alive session
+        response = get_http_session().post(
+            OPENAI_CHAT_URL,
             headers=headers,
             json=payload,
-            timeout=30,
+            timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
             stream=stream
         )
-        print(f"DEBUG: requests.post call completed")
         response.raise_for_status()
         
-        print(f"DEBUG: API request successful")
-        
         if stream:
             # Handle streaming response (memory efficient)
-            return _handle_streaming_response(response, cache_key, context)
+            return _handle_streaming_response(response, cache_key, context, model, started_at)
         else:
             # Handle regular response
             data = response.json()
-            print(f"DEBUG: API response data: {data}")
-            return _process_response(data, cache_key, context)
+            logger.debug("[LLM] API response usage: %s", data.get("usage") if isinstance(data, dict) else None)
+            result = _process_response(data, cache_key, context)
+            _record_metrics(started_at, model, context, result.get("usage"), error="error" in result)
+            return result
             
     except requests.exceptions.RequestException as e:
         logging.error(f"OpenAI API request failed: {e}")
-        print(f"DEBUG: API request failed: {e}")
+        _record_metrics(started_at, model, context, error=True)
         return {
             "answer": f"Error: {str(e)}",
             "llm_confidence": 0.0,
@@ -330,7 +480,7 @@ def ask_openai_with_confidence(
         }
     except json.JSONDecodeError as e:
         logging.error(f"Failed to parse OpenAI response: {e}")
-        print(f"DEBUG: JSON decode error: {e}")
+        _record_metrics(started_at, model, context, error=True)
         return {
             "answer": "Error: Invalid response format",
             "llm_confidence": 0.0,
@@ -340,56 +490,207 @@ def ask_openai_with_confidence(
             "error": "Invalid response format"
         }
 
-def _handle_streaming_response(response, cache_key: str, context: Dict[str, Any]) -> Dict[str, Any]:
-    """Handle streaming response for memory efficiency."""
-    content = ""
-    model = ""
+_STREAM_END = object()
+
+def _iter_sse_chunks(response) -> Iterator[Dict[str, Any]]:
+    """Decode ``data:`` events of an OpenAI server-sent event stream as they arrive."""
+    for line in response.iter_lines():
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        if not line.startswith('data: '):
+            continue
+        data = line[6:]
+        if data == '[DONE]':
+            break
+        try:
+            yield json.loads(data)
+        except json.JSONDecodeError:
+            continue
+
+class StreamingCompletion:
+    """
+    Tokens van een gestreamde chat completion, zodra ze binnenkomen.
     
-    try:
-        for line in response.iter_lines():
-            if line:
-                line = line.decode('utf-8')
-                if line.startswith('data: '):
-                    data = line[6:]
-                    if data == '[DONE]':
-                        break
-                    
-                    try:
-                        chunk = json.loads(data)
-                        if 'choices' in chunk and chunk['choices']:
-                            delta = chunk['choices'][0].get('delta', {})
-                            if 'content' in delta:
-                                content += delta['content']
-                            if 'model' in chunk:
-                                model = chunk['model']
-                    except json.JSONDecodeError:
-                        continue
+    Iterate with ``for`` (or ``async for``) to receive content deltas as soon
+    as their SSE chunk arrives. Logprobs are accumulated on the fly, so
+    ``logprob_confidence`` is current after every token. Once the stream is
+    exhausted ``result`` holds the final dict; the answer is also written to the
+    file cache in the non-streaming shape (``answer``/``llm_confidence``).
+    ``time_to_first_token`` is measured from ``started_at`` (the moment the
+    request was sent) and reported to the LLM performance monitor.
+    """
+    
+    def __init__(self, response, cache_key: str, context: Dict[str, Any],
+                 model: str = "", started_at: Optional[float] = None):
+        self._response = response
+        self._cache_key = cache_key
+        self._context = context
+        self._parts: List[str] = []
+        self._logprob_sum = 0.0
+        self._logprob_count = 0
+        self._started_at = started_at if started_at is not None else time.time()
+        self.time_to_first_token: Optional[float] = None
+        self.model = model
+        self.finish_reason: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self._tokens = self._iter_tokens()
+    
+    def __iter__(self) -> "StreamingCompletion":
+        return self
+    
+    def __next__(self) -> str:
+        return next(self._tokens)
+    
+    def __aiter__(self) -> "StreamingCompletion":
+        return self
+    
+    async def __anext__(self) -> str:
+        # Blocking socket reads happen in the default executor, one chunk at a time
+        token = await asyncio.get_running_loop().run_in_executor(None, next, self._tokens, _STREAM_END)
+        if token is _STREAM_END:
+            raise StopAsyncIteration
+        return token
+    
+    @property
+    def content(self) -> str:
+        return "".join(self._parts)
+    
+    @property
+    def logprob_confidence(self) -> Optional[float]:
+        if self._logprob_count == 0:
+            return None
+        avg_logprob = self._logprob_sum / self._logprob_count
+        return min(1.0, max(0.0, (avg_logprob + 2.0) / 2.0))
+    
+    def consume(self) -> Dict[str, Any]:
+        """Read the rest of the stream and return the final result."""
+        for _ in self:
+            pass
+        return self.result
+    
+    def _iter_tokens(self) -> Iterator[str]:
+        try:
+            for chunk in _iter_sse_chunks(self._response):
+                token = self._accumulate(chunk)
+                if token:
+                    if self.time_to_first_token is None:
+                        self.time_to_first_token = time.time() - self._started_at
+                    yield token
+        except Exception as e:
+            logging.error(f"Streaming response error: {e}")
+            _record_metrics(self._started_at, self.model, self._context, error=True,
+                            ttft=self.time_to_first_token)
+            self.result = {
+                "content": f"Error: {str(e)}",
+                "confidence": 0.0,
+                "model": self.model,
+                "usage": {"total_tokens": 0},
+                "cached": False,
+                "error": str(e)
+            }
+            return
+        finally:
+            self._response.close()
+        self.result = self._finalize()
+    
+    def _accumulate(self, chunk: Dict[str, Any]) -> Optional[str]:
+        choices = chunk.get('choices')
+        if not choices:
+            return None
+        if 'model' in chunk:
+            self.model = chunk['model']
+        choice = choices[0]
+        if choice.get('finish_reason'):
+            self.finish_reason = choice['finish_reason']
+        for token in (choice.get('logprobs') or {}).get('content') or ():
+            if 'logprob' in token:
+                self._logprob_sum += token['logprob']
+                self._logprob_count += 1
+        token = (choice.get('delta') or {}).get('content')
+        if token:
+            self._parts.append(token)
+        return token
+    
+    def _finalize(self) -> Dict[str, Any]:
+        content = self.content
+        confidence = calculate_confidence(content, self._context)
+        if self.logprob_confidence is not None:
+            confidence = (confidence + self.logprob_confidence) / 2
         
-        # Process final result
         result = {
             "content": content,
-            "confidence": calculate_confidence(content, context),
-            "model": model,
+            "confidence": confidence,
+            "model": self.model,
             "usage": {"total_tokens": len(content.split())},  # Approximate
             "cached": False,
             "streamed": True
         }
+        if self.finish_reason:
+            result["finish_reason"] = self.finish_reason
         
-        # Cache the final result
-        _file_cache_set(cache_key, result)
-        
+        # Cached in the shape ask_openai_with_confidence stores, which reads the same key
+        _file_cache_set(self._cache_key, {
+            "answer": content,
+            "llm_confidence": confidence,
+            "model": self.model,
+            "usage": result["usage"],
+            "cached": False
+        })
+        # One content delta per generated token
+        _record_metrics(self._started_at, self.model, self._context,
+                        {"completion_tokens": len(self._parts)}, ttft=self.time_to_first_token)
         return result
-        
-    except Exception as e:
-        logging.error(f"Streaming response error: {e}")
-        return {
-            "content": f"Error: {str(e)}",
-            "confidence": 0.0,
-            "model": model,
-            "usage": {"total_tokens": 0},
-            "cached": False,
-            "error": str(e)
-        }
+
+def _handle_streaming_response(response, cache_key: str, context: Dict[str, Any],
+                               model: str = "", started_at: Optional[float] = None) -> Dict[str, Any]:
+    """Handle streaming response for memory efficiency."""
+    return StreamingCompletion(response, cache_key, context, model, started_at).consume()
+
+def stream_openai_with_confidence(
+    prompt: str,
+    context: Optional[Dict[str, Any]] = None,
+    model: Optional[str] = None,
+    temperature: float = 0.7,
+    max_tokens: int = 512,
+    structured_output: Optional[str] = None,
+    include_logprobs: bool = True
+) -> StreamingCompletion:
+    """
+    Stream een OpenAI completion token voor token.
+    
+    Returns:
+        StreamingCompletion: iterate for tokens; ``result`` holds the final
+        dict (content, confidence, model, ...) once the stream is exhausted
+    
+    Raises:
+        requests.exceptions.RequestException: If the request cannot be started
+    """
+    if not prompt or not isinstance(prompt, str):
+        raise ValueError("Prompt must be a non-empty string")
+    
+    context = context or {}
+    model = resolve_agent_model(context, model)
+    cache_key = _cache_key(prompt, model, temperature, max_tokens, include_logprobs)
+    headers, payload = _build_request(prompt, context, model, temperature, max_tokens,
+                                      structured_output, include_logprobs, True)
+    
+    started_at = time.time()
+    response = get_http_session().post(
+        OPENAI_CHAT_URL,
+        headers=headers,
+        json=payload,
+        timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        stream=True
+    )
+    try:
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        response.close()
+        _record_metrics(started_at, model, context, error=True)
+        raise
+    return StreamingCompletion(response, cache_key, context, model, started_at)
 
 def _process_response(data: dict, cache_key: str, context: Dict[str, Any]) -> Dict[str, Any]:
     """Process OpenAI API response and add confidence scoring."""
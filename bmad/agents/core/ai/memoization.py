@@ -0,0 +1,76 @@
+"""
+BMAD Content Memoization
+
+Begrensde LRU memo voor confidence scoring, gekeyed op een hash van de
+input in plaats van de input zelf, zodat lange outputs niet in het
+geheugen blijven.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+def content_hash(*parts: Any) -> bytes:
+    """16-byte BLAKE2b digest of the parts; ``None`` and ``""`` hash differently."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if part is None:
+            digest.update(b"\x00N")
+        else:
+            data = part if isinstance(part, bytes) else str(part).encode("utf-8", "surrogatepass")
+            digest.update(b"\x00S" + len(data).to_bytes(8, "little") + data)
+    return digest.digest()
+
+
+class ContentMemo:
+    """
+    Thread-safe bounded LRU memo.
+
+    Keys are normally ``content_hash`` digests; the least recently used
+    entry is evicted once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is not _MISSING:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        # Compute outside the lock; a concurrent duplicate computes the same pure value
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._entries), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses}
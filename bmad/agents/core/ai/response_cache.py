@@ -0,0 +1,221 @@
+"""
+Sharded on-disk cache voor LLM responses.
+
+Entries worden opgeslagen als ``<dir>/<ab>/<sha256>.json[.gz]`` (256 shards),
+met een in-memory LRU index voor de size- en entry-caps. De index wordt bij
+het eerste gebruik eenmalig opgebouwd uit de bestanden op schijf (oudste
+access time eerst); oude platte ``<dir>/<key>.json`` bestanden worden daarbij
+naar hun shard verplaatst.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+JSON_SUFFIX = ".json"
+GZIP_SUFFIX = ".json.gz"
+
+
+class ShardedFileCache:
+    """
+    Size- and count-bounded LRU cache of JSON values on disk.
+
+    Every entry records its creation time, so entries older than ``ttl``
+    seconds are treated as misses and removed. Hits refresh the file's mtime
+    so LRU order survives a restart. Writes go through a temp file and
+    ``os.replace``; concurrent processes may share the directory, each
+    enforcing the caps for the entries it knows about.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024,
+                 max_entries: int = 10000, ttl: Optional[float] = 7 * 24 * 3600,
+                 compress: bool = True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl or None
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, Tuple[Path, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._indexed = False
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------ #
+    # Paths and index
+    # ------------------------------------------------------------------ #
+
+    def _path(self, key: str, compressed: bool) -> Path:
+        suffix = GZIP_SUFFIX if compressed else JSON_SUFFIX
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    @staticmethod
+    def _key_from_name(name: str) -> Optional[str]:
+        for suffix in (GZIP_SUFFIX, JSON_SUFFIX):
+            if name.endswith(suffix) and not name.startswith("."):
+                return name[:-len(suffix)]
+        return None
+
+    def _ensure_index(self) -> None:
+        if self._indexed:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    with os.scandir(entry.path) as shard:
+                        for item in shard:
+                            key = self._key_from_name(item.name)
+                            if key and item.is_file(follow_symlinks=False):
+                                stat = item.stat()
+                                found.append((stat.st_mtime, key, Path(item.path), stat.st_size))
+                elif entry.is_file(follow_symlinks=False):
+                    # Legacy flat layout: move into its shard
+                    key = self._key_from_name(entry.name)
+                    if not key:
+                        continue
+                    target = self.directory / key[:2] / entry.name
+                    target.parent.mkdir(exist_ok=True)
+                    os.replace(entry.path, target)
+                    stat = target.stat()
+                    found.append((stat.st_mtime, key, target, stat.st_size))
+
+        for _, key, path, size in sorted(found):
+            self._track(key, path, size)
+        self._indexed = True
+        self._evict()
+
+    def _track(self, key: str, path: Path, size: int) -> None:
+        previous = self._index.pop(key, None)
+        if previous is not None:
+            self._total_bytes -= previous[1]
+        self._index[key] = (path, size)
+        self._total_bytes += size
+
+    def _forget(self, key: str, unlink: bool = True) -> None:
+        previous = self._index.pop(key, None)
+        if previous is None:
+            return
+        self._total_bytes -= previous[1]
+        if unlink:
+            try:
+                previous[0].unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        while self._index and (len(self._index) > self.max_entries or self._total_bytes > self.max_bytes):
+            key = next(iter(self._index))
+            self._forget(key)
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._ensure_index()
+            entry = self._read(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+
+            path, size, record = entry
+            if self.ttl is not None and time.time() - record.get("created_at", 0) > self.ttl:
+                self._forget(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._track(key, path, size)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.stats["hits"] += 1
+            return record.get("value")
+
+    def _read(self, key: str) -> Optional[Tuple[Path, int, Dict[str, Any]]]:
+        indexed = self._index.get(key)
+        candidates = [indexed[0]] if indexed else []
+        # Also look on disk: another process may have written it, or compression was toggled
+        candidates += [self._path(key, self.compress), self._path(key, not self.compress)]
+
+        for path in dict.fromkeys(candidates):
+            try:
+                raw = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            size = len(raw)
+            try:
+                if path.name.endswith(GZIP_SUFFIX):
+                    raw = gzip.decompress(raw)
+                record = json.loads(raw)
+            except Exception as e:
+                logging.warning(f"[LLM][FILECACHE] Fout bij lezen: {e}")
+                self._forget(key, unlink=False)
+                path.unlink(missing_ok=True)
+                continue
+            if not isinstance(record, dict) or "value" not in record:
+                # Legacy entry without envelope: the file is the value itself
+                record = {"created_at": path.stat().st_mtime, "value": record}
+            return path, size, record
+        if indexed:
+            self._forget(key, unlink=False)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        record = {"created_at": time.time(), "value": value}
+        data = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data, compresslevel=5)
+        path = self._path(key, self.compress)
+
+        with self._lock:
+            self._ensure_index()
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, path)
+            except Exception as e:
+                logging.warning(f"[LLM][FILECACHE] Fout bij schrijven: {e}")
+                tmp.unlink(missing_ok=True)
+                return
+
+            indexed = self._index.get(key)
+            if indexed and indexed[0] != path:
+                # Replaced an entry stored with the other compression setting
+                self._forget(key)
+            self._track(key, path, len(data))
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._ensure_index()
+            self._forget(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ensure_index()
+            for key in list(self._index):
+                self._forget(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._ensure_index()
+            return {
+                **self.stats,
+                "entries": len(self._index),
+                "total_bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
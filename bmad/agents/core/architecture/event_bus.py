@@ -6,12 +6,14 @@ Zorgt voor loose coupling en scalable communication.
 """
 
 import asyncio
+import contextvars
 import logging
 import time
-from typing import Any, Callable, Dict, List, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
-from collections import defaultdict
+from collections import defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -33,19 +35,145 @@ class Event:
     correlation_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
+DEFAULT_WORKERS_PER_PRIORITY: Dict[EventPriority, int] = {
+    EventPriority.CRITICAL: 2,
+    EventPriority.HIGH: 2,
+    EventPriority.NORMAL: 4,
+    EventPriority.LOW: 4,
+}
+
+# Set inside worker tasks so nested publishes run inline instead of waiting on the pool
+_in_worker: contextvars.ContextVar = contextvars.ContextVar("bmad_event_bus_worker", default=False)
+
+class _PendingHandlers:
+    """Completion tracker voor alle handlers van één gepubliceerd event."""
+    __slots__ = ("remaining", "future")
+    
+    def __init__(self, count: int, loop: asyncio.AbstractEventLoop):
+        self.remaining = count
+        self.future = loop.create_future()
+    
+    def done_one(self):
+        self.remaining -= 1
+        if self.remaining == 0 and not self.future.done():
+            self.future.set_result(None)
+    
+    def fail(self):
+        if not self.future.done():
+            try:
+                self.future.set_exception(RuntimeError("Event bus stopped before all handlers ran"))
+            except RuntimeError:
+                pass  # its loop is already closed
+
 class EventBus:
     """
     Event bus voor BMAD agents.
     Ondersteunt async event handling, priority queues, en event filtering.
+    
+    Async publishing gebruikt per priority level een eigen queue met
+    long-lived workers, zodat high-priority events nooit achter low-priority
+    events wachten. Sync handlers draaien in een eigen, begrensde thread pool.
     """
     
-    def __init__(self):
+    def __init__(self, max_history: int = 1000,
+                 workers_per_priority: Optional[Dict[EventPriority, int]] = None,
+                 sync_handler_threads: int = 4):
         self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
         self._priority_subscribers: Dict[str, Dict[EventPriority, List[Callable]]] = defaultdict(lambda: defaultdict(list))
-        self._event_history: List[Event] = []
-        self._max_history: int = 1000
+        self._max_history: int = max_history
+        self._event_history: Deque[Event] = deque(maxlen=max_history)
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._running: bool = False
+        self._workers_per_priority = {**DEFAULT_WORKERS_PER_PRIORITY, **(workers_per_priority or {})}
+        self._queues: Dict[EventPriority, asyncio.Queue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._sync_handler_threads = sync_handler_threads
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    async def start(self):
+        """Start de worker pools op de huidige event loop."""
+        loop = asyncio.get_running_loop()
+        if self._running and self._loop is loop:
+            return
+        if self._running:
+            # Workers belong to another loop; cancel them and start fresh on this one
+            self._cancel_workers()
+        
+        self._loop = loop
+        self._queues = {priority: asyncio.Queue() for priority in EventPriority}
+        self._workers = [
+            loop.create_task(self._worker(self._queues[priority]))
+            for priority in EventPriority
+            for _ in range(max(1, self._workers_per_priority.get(priority, 1)))
+        ]
+        self._running = True
+        logger.debug(f"Event bus started with {len(self._workers)} workers")
+    
+    async def stop(self):
+        """Stop de worker pools en de sync handler thread pool."""
+        workers = [worker for worker in self._workers if worker.get_loop() is asyncio.get_running_loop()]
+        self._cancel_workers()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._running = False
+        self._loop = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def _cancel_workers(self):
+        """Fail publishes that still wait on queued handlers and cancel the workers."""
+        for queue in self._queues.values():
+            while not queue.empty():
+                _, _, pending = queue.get_nowait()
+                pending.fail()
+        for worker in self._workers:
+            try:
+                worker.cancel()
+            except RuntimeError:
+                pass  # its loop is already closed
+        self._workers = []
+        self._queues = {}
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._sync_handler_threads,
+                thread_name_prefix="bmad-event-bus"
+            )
+        return self._executor
+    
+    async def _worker(self, queue: asyncio.Queue):
+        _in_worker.set(True)
+        while True:
+            handler, event, pending = await queue.get()
+            try:
+                await self._invoke(handler, event)
+            except asyncio.CancelledError:
+                pending.fail()
+                raise
+            finally:
+                pending.done_one()
+                queue.task_done()
+    
+    async def _invoke(self, handler: Callable, event: Event):
+        try:
+            if asyncio.iscoroutinefunction(handler):
+                await handler(event)
+            else:
+                await asyncio.get_running_loop().run_in_executor(self._get_executor(), handler, event)
+        except Exception as e:
+            logger.error(f"Error in event handler {getattr(handler, '__name__', handler)}: {e}")
+    
+    def _collect_handlers(self, event_name: str) -> List[Callable]:
+        handlers = []
+        
+        # Add priority handlers in order
+        for priority in sorted(EventPriority, key=lambda p: p.value, reverse=True):
+            handlers.extend(self._priority_subscribers[event_name][priority])
+        
+        # Add normal handlers
+        handlers.extend(self._subscribers[event_name])
+        return handlers
     
     def subscribe(self, event_name: str, handler: Callable, priority: EventPriority = EventPriority.NORMAL):
         """
@@ -113,41 +241,30 @@ class EventBus:
         
         # Store in history
         self._event_history.append(event)
-        if len(self._event_history) > self._max_history:
-            self._event_history.pop(0)
         
         # Get all handlers for this event
-        handlers = []
-        
-        # Add priority handlers in order
-        for priority in sorted(EventPriority, key=lambda p: p.value, reverse=True):
-            handlers.extend(self._priority_subscribers[event_name][priority])
-        
-        # Add normal handlers
-        handlers.extend(self._subscribers[event_name])
+        handlers = self._collect_handlers(event_name)
         
         # Execute handlers
         if handlers:
             logger.debug(f"Publishing event: {event_name} to {len(handlers)} handlers")
             
-            # Execute handlers asynchronously
-            tasks = []
+            if _in_worker.get():
+                # Published from inside a handler: run inline so a full pool cannot deadlock
+                for handler in handlers:
+                    await self._invoke(handler, event)
+                return
+            
+            await self.start()
+            
+            # Hand handlers to the long-lived workers of this priority level
+            pending = _PendingHandlers(len(handlers), self._loop)
+            queue = self._queues[event.priority]
             for handler in handlers:
-                try:
-                    if asyncio.iscoroutinefunction(handler):
-                        task = asyncio.create_task(handler(event))
-                        tasks.append(task)
-                    else:
-                        # Run sync handler in thread pool
-                        loop = asyncio.get_event_loop()
-                        task = loop.run_in_executor(None, handler, event)
-                        tasks.append(task)
-                except Exception as e:
-                    logger.error(f"Error creating task for handler {handler.__name__}: {e}")
+                queue.put_nowait((handler, event, pending))
             
             # Wait for all handlers to complete
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
+            await pending.future
         else:
             logger.debug(f"No handlers found for event: {event_name}")
     
@@ -178,18 +295,9 @@ class EventBus:
         
         # Store in history
         self._event_history.append(event)
-        if len(self._event_history) > self._max_history:
-            self._event_history.pop(0)
         
         # Get all handlers for this event
-        handlers = []
-        
-        # Add priority handlers in order
-        for priority in sorted(EventPriority, key=lambda p: p.value, reverse=True):
-            handlers.extend(self._priority_subscribers[event_name][priority])
-        
-        # Add normal handlers
-        handlers.extend(self._subscribers[event_name])
+        handlers = self._collect_handlers(event_name)
         
         # Execute handlers synchronously
         if handlers:
@@ -217,7 +325,7 @@ class EventBus:
         Returns:
             List of events
         """
-        events = self._event_history
+        events = list(self._event_history)
         
         # Filter by event name
         if event_name:
@@ -8,7 +8,14 @@ __version__ = "1.0.0"
 __author__ = "BMAD Team"
 
 # Import main communication components
-from .message_bus import clear_events, get_events, publish, subscribe
+from .message_bus import (
+    clear_events,
+    compact_events,
+    configure_backend,
+    get_events,
+    publish,
+    subscribe,
+)
 from .notification_manager import (
     NotificationManager,
     NotificationType,
@@ -19,6 +26,8 @@ __all__ = [
     "NotificationManager",
     "NotificationType",
     "clear_events",
+    "compact_events",
+    "configure_backend",
     "get_events",
     "get_notification_manager",
     "publish",
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Incremental Context Reader
+Houdt geparste events en tellers in geheugen en leest alleen nieuwe bytes van de journal
+"""
+
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .event_journal import EventJournal
+
+FileSignature = Optional[Tuple[int, int, int]]
+
+
+def _file_signature(path: Path) -> FileSignature:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def event_agent(event_obj: dict) -> str:
+    """Best-effort name of the agent that published an event."""
+    data = event_obj.get("data")
+    if isinstance(data, dict):
+        for key in ("agent", "agent_name", "source_agent"):
+            if data.get(key):
+                return str(data[key])
+    return "unknown"
+
+
+class ContextReader:
+    """
+    mtime/offset-aware reader for ``shared_context.json`` plus its journal.
+
+    The snapshot is only re-parsed when its inode, size or mtime changed; the
+    journal is consumed from the byte offset reached by the previous read.
+    Per event type and per agent counters are updated as records come in, so
+    statistics cost O(new events) instead of O(all events).
+    """
+
+    def __init__(self, context_path: Path, load_snapshot: Callable[[], dict]):
+        self.context_path = Path(context_path)
+        self.journal = EventJournal(self.context_path)
+        self._load_snapshot = load_snapshot
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._events: List[dict] = []
+        self._snapshot_signature: FileSignature = None
+        self._snapshot_loaded = False
+        self._journal_offset = 0
+        self.event_type_counts: Counter = Counter()
+        self.agent_counts: Counter = Counter()
+
+    def refresh(self) -> "ContextReader":
+        """Bring the in-memory state up to date with the files on disk."""
+        with self._lock:
+            if self.journal.journal_path.exists():
+                # Shared lock: a compaction cannot move events between the two reads
+                with self.journal.locked(exclusive=False):
+                    self._refresh_locked()
+            else:
+                self._refresh_locked()
+        return self
+
+    def _refresh_locked(self) -> None:
+        signature = _file_signature(self.context_path)
+        if not self._snapshot_loaded or signature != self._snapshot_signature:
+            self._reset()
+            self._ingest(self._load_snapshot().get("events", []))
+            # Loading may have restored a backup, so take the signature afterwards
+            self._snapshot_signature = _file_signature(self.context_path)
+            self._snapshot_loaded = True
+
+        journal_size = self.journal.size()
+        if journal_size < self._journal_offset:
+            # Journal truncated without a snapshot change: start over
+            self._reset()
+            self._refresh_locked()
+            return
+        if journal_size > self._journal_offset:
+            new_events, self._journal_offset = self.journal.read_from(self._journal_offset)
+            self._ingest(new_events)
+
+    def _ingest(self, events: List[dict]) -> None:
+        self._events.extend(events)
+        for event_obj in events:
+            self.event_type_counts[event_obj.get("event", "unknown")] += 1
+            self.agent_counts[event_agent(event_obj)] += 1
+
+    @property
+    def events(self) -> List[dict]:
+        """Events seen at the last refresh (a copy, safe to filter or mutate)."""
+        with self._lock:
+            return list(self._events)
+
+    @property
+    def total_events(self) -> int:
+        return len(self._events)
+
+    def get_counts(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                "event_types": dict(self.event_type_counts),
+                "agents": dict(self.agent_counts),
+            }
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Incremental Event Journal
+Append-only journal naast shared_context.json zodat publish geen volledige rewrite meer kost
+"""
+
+import contextlib
+import fcntl
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Iterator, List, Tuple
+
+JOURNAL_SUFFIX = ".journal"
+
+
+class EventJournal:
+    """
+    Newline-delimited journal of events that have not been compacted yet.
+
+    Every publish appends one compact JSON line while holding an exclusive
+    ``flock`` on the journal for the duration of a single ``write``. The full
+    event list is the snapshot (``shared_context.json``) followed by the
+    journal; ``compact`` periodically folds the journal into the snapshot so
+    the expensive validated rewrite (with backup) happens once per batch
+    instead of once per event.
+    """
+
+    def __init__(self, context_path: Path, compaction_threshold_bytes: int = 1024 * 1024):
+        self.context_path = Path(context_path)
+        self.journal_path = Path(f"{self.context_path}{JOURNAL_SUFFIX}")
+        self.compaction_threshold_bytes = compaction_threshold_bytes
+
+    @contextlib.contextmanager
+    def locked(self, exclusive: bool = True) -> Iterator[int]:
+        """Hold a lock on the journal file; yields its file descriptor"""
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield fd
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def append(self, event_obj: dict) -> int:
+        """
+        Append one event to the journal
+
+        Returns:
+            int: Journal size in bytes after the append
+        """
+        line = json.dumps(event_obj, separators=(",", ":"), default=str).encode("utf-8") + b"\n"
+        with self.locked() as fd:
+            os.write(fd, line)
+            return os.fstat(fd).st_size
+
+    def needs_compaction(self, journal_size: int) -> bool:
+        return journal_size >= self.compaction_threshold_bytes
+
+    def size(self) -> int:
+        try:
+            return self.journal_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def read_from(self, offset: int = 0) -> Tuple[List[dict], int]:
+        """
+        Read complete journal records starting at a byte offset
+
+        A trailing partial line (a write in progress elsewhere) is left for the
+        next read.
+
+        Returns:
+            Tuple[List[dict], int]: Decoded events and the offset just past them
+        """
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = chunk.rfind(b"\n") + 1
+        events: List[dict] = []
+        for raw in chunk[:end].splitlines():
+            if not raw.strip():
+                continue
+            try:
+                events.append(json.loads(raw))
+            except json.JSONDecodeError as e:
+                logging.error(f"[EventJournal] Skipping corrupt journal record: {e}")
+        return events, offset + end
+
+    def compact(self, load_context: Callable[[], dict], write_context: Callable[[dict], bool]) -> int:
+        """
+        Fold journaled events into the snapshot and truncate the journal
+
+        The caller must hold the snapshot's file lock. Appends are blocked only
+        while the snapshot is rewritten.
+
+        Returns:
+            int: Number of events compacted (-1 if the snapshot write failed)
+        """
+        with self.locked() as fd:
+            events, _ = self.read_from(0)
+            if not events:
+                os.ftruncate(fd, 0)
+                return 0
+
+            context = load_context()
+            context.setdefault("events", []).extend(events)
+            if not write_context(context):
+                logging.error("[EventJournal] Compaction failed, journal kept")
+                return -1
+
+            os.ftruncate(fd, 0)
+            logging.info(f"[EventJournal] Compacted {len(events)} events into {self.context_path.name}")
+            return len(events)
+
+    def clear(self) -> None:
+        with self.locked() as fd:
+            os.ftruncate(fd, 0)
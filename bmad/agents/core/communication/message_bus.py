@@ -16,12 +16,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Callable, Dict, List, Optional, Tuple
 
+from .context_reader import ContextReader
+from .event_journal import EventJournal
+
 SHARED_CONTEXT_PATH = Path(__file__).parent.parent / "shared_context.json"
 LOCK = threading.Lock()
 
+# "snapshot" rewrites shared_context.json per event; "incremental" appends to a
+# journal and compacts it into the snapshot once it exceeds the threshold.
+BACKENDS = ("snapshot", "incremental")
+BACKEND = os.getenv("BMAD_MESSAGE_BUS_BACKEND", "snapshot")
+COMPACTION_THRESHOLD_BYTES = int(os.getenv("BMAD_MESSAGE_BUS_COMPACTION_BYTES", str(1024 * 1024)))
+
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 
 _subscribers: Dict[str, List[Callable]] = {}
+_readers: Dict[Path, ContextReader] = {}
 
 @contextlib.contextmanager
 def file_lock(filepath: Path):
@@ -109,13 +119,17 @@ def validate_json_data(data: dict) -> bool:
 
 def validate_json_file(filepath: str) -> bool:
     """Validate JSON file integrity."""
+    return load_valid_json(filepath) is not None
+
+def load_valid_json(filepath) -> Optional[dict]:
+    """Parse a JSON file once and return it only if it is a valid context."""
     try:
         with open(filepath, 'r') as f:
             data = json.load(f)
-        return validate_json_data(data)
+        return data if validate_json_data(data) else None
     except (json.JSONDecodeError, FileNotFoundError, Exception) as e:
         logging.error(f"[RobustMessageBus] JSON validation failed: {e}")
-        return False
+        return None
 
 def create_backup(filepath: Path) -> Optional[Path]:
     """Create automatic backup before writing."""
@@ -147,17 +161,17 @@ def load_context_safely() -> dict:
             return {"events": []}
         
         # Try to load the file
-        if validate_json_file(str(SHARED_CONTEXT_PATH)):
-            with open(SHARED_CONTEXT_PATH, 'r') as f:
-                return json.load(f)
+        context = load_valid_json(SHARED_CONTEXT_PATH)
+        if context is not None:
+            return context
         else:
             # Try to recover from backup
             backup_path = Path(f"{SHARED_CONTEXT_PATH}.backup")
-            if backup_path.exists() and validate_json_file(str(backup_path)):
+            backup = load_valid_json(backup_path) if backup_path.exists() else None
+            if backup is not None:
                 logging.warning(f"[RobustMessageBus] Restoring from backup due to corruption")
                 restore_backup(SHARED_CONTEXT_PATH, backup_path)
-                with open(SHARED_CONTEXT_PATH, 'r') as f:
-                    return json.load(f)
+                return backup
             else:
                 logging.error(f"[RobustMessageBus] Both main file and backup are corrupted")
                 return {"events": []}
@@ -166,42 +180,84 @@ def load_context_safely() -> dict:
         logging.error(f"[RobustMessageBus] Error loading context: {e}")
         return {"events": []}
 
+def configure_backend(backend: str = "incremental", compaction_threshold_bytes: Optional[int] = None) -> None:
+    """Kies de persistence backend ("snapshot" of "incremental")."""
+    global BACKEND, COMPACTION_THRESHOLD_BYTES
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown message bus backend: {backend}")
+    BACKEND = backend
+    if compaction_threshold_bytes is not None:
+        COMPACTION_THRESHOLD_BYTES = compaction_threshold_bytes
+    logging.info(f"[RobustMessageBus] Backend ingesteld op: {backend}")
+
+def _get_journal() -> EventJournal:
+    return EventJournal(SHARED_CONTEXT_PATH, COMPACTION_THRESHOLD_BYTES)
+
+def _get_reader() -> ContextReader:
+    """Cached incremental reader for the current context path."""
+    path = Path(SHARED_CONTEXT_PATH)
+    reader = _readers.get(path)
+    if reader is None:
+        reader = _readers[path] = ContextReader(path, load_context_safely)
+    return reader.refresh()
+
+def compact_events() -> int:
+    """Fold journaled events into shared_context.json (with backup and validation)."""
+    try:
+        journal = _get_journal()
+        if journal.size() == 0:
+            return 0
+        with file_lock(SHARED_CONTEXT_PATH):
+            return journal.compact(load_context_safely,
+                                   lambda context: safe_write_json(context, SHARED_CONTEXT_PATH))
+    except Exception as e:
+        logging.error(f"[RobustMessageBus] Error compacting events: {e}")
+        return -1
+
+def _notify_subscribers(event: str, event_obj: dict) -> None:
+    for callback in _subscribers.get(event, []):
+        try:
+            callback(event_obj)
+        except Exception as e:
+            logging.exception(f"[RobustMessageBus] Fout in subscriber callback: {e}")
+
 def publish(event: str, data: dict) -> bool:
     """Publiceer een event met data naar de shared context met robuuste error handling."""
+    # Create event object
+    event_obj = {
+        "timestamp": datetime.now().isoformat(),
+        "event": event,
+        "data": data
+    }
+    
     try:
-        with file_lock(SHARED_CONTEXT_PATH):
-            # Load context safely
-            context = load_context_safely()
-            
-            # Create event object
-            event_obj = {
-                "timestamp": datetime.now().isoformat(),
-                "event": event,
-                "data": data
-            }
-            
-            # Add event to context
-            context["events"].append(event_obj)
-            
-            # Write context safely
-            if not safe_write_json(context, SHARED_CONTEXT_PATH):
-                logging.error(f"[RobustMessageBus] Failed to write event: {event}")
-                return False
-            
-            logging.info(f"[RobustMessageBus] Event gepubliceerd: {event}")
-            
-            # Notify subscribers
-            for callback in _subscribers.get(event, []):
-                try:
-                    callback(event_obj)
-                except Exception as e:
-                    logging.exception(f"[RobustMessageBus] Fout in subscriber callback: {e}")
-            
-            return True
-            
+        if BACKEND == "incremental":
+            # Single-record append under a short-lived journal lock
+            journal = _get_journal()
+            if journal.needs_compaction(journal.append(event_obj)):
+                compact_events()
+        else:
+            with file_lock(SHARED_CONTEXT_PATH):
+                # Load context safely
+                context = load_context_safely()
+                
+                # Add event to context
+                context["events"].append(event_obj)
+                
+                # Write context safely
+                if not safe_write_json(context, SHARED_CONTEXT_PATH):
+                    logging.error(f"[RobustMessageBus] Failed to write event: {event}")
+                    return False
+        
+        logging.info(f"[RobustMessageBus] Event gepubliceerd: {event}")
+        
     except Exception as e:
         logging.error(f"[RobustMessageBus] Error publishing event {event}: {e}")
         return False
+    
+    # Notify subscribers outside the lock
+    _notify_subscribers(event, event_obj)
+    return True
 
 def subscribe(event_type: str, callback: Callable) -> None:
     """Abonneer een callback op een specifiek event_type."""
@@ -219,8 +275,7 @@ def unsubscribe(event_type: str, callback: Callable) -> None:
 def get_events(event_type: Optional[str] = None, since: Optional[str] = None) -> List[dict]:
     """Haal events op, optioneel gefilterd op type en tijd."""
     try:
-        context = load_context_safely()
-        events = context.get("events", [])
+        events = _get_reader().events
         
         if event_type:
             events = [e for e in events if e["event"] == event_type]
@@ -238,6 +293,9 @@ def clear_events() -> bool:
         with file_lock(SHARED_CONTEXT_PATH):
             if not safe_write_json({"events": []}, SHARED_CONTEXT_PATH):
                 return False
+            journal = _get_journal()
+            if journal.journal_path.exists():
+                journal.clear()
             
             logging.info("[RobustMessageBus] Alle events gewist.")
             return True
@@ -248,19 +306,17 @@ def clear_events() -> bool:
 def get_statistics() -> dict:
     """Get statistics about the message bus."""
     try:
-        context = load_context_safely()
-        events = context.get("events", [])
-        
-        event_types = {}
-        for event in events:
-            event_type = event.get("event", "unknown")
-            event_types[event_type] = event_types.get(event_type, 0) + 1
+        reader = _get_reader()
+        counts = reader.get_counts()
         
         return {
-            "total_events": len(events),
-            "event_types": event_types,
+            "total_events": reader.total_events,
+            "event_types": counts["event_types"],
+            "agents": counts["agents"],
             "file_size": SHARED_CONTEXT_PATH.stat().st_size if SHARED_CONTEXT_PATH.exists() else 0,
-            "backup_exists": Path(f"{SHARED_CONTEXT_PATH}.backup").exists()
+            "backup_exists": Path(f"{SHARED_CONTEXT_PATH}.backup").exists(),
+            "backend": BACKEND,
+            "journal_size": _get_journal().size()
         }
     except Exception as e:
         logging.error(f"[RobustMessageBus] Error getting statistics: {e}")
@@ -0,0 +1,347 @@
+"""
+BMAD Cache Codec
+
+Compacte binaire encoding voor cache waarden: een serializer (msgpack, JSON,
+str, bytes) plus optionele compressie (zstd of zlib) achter een header van
+twee bytes, zodat lezen nooit hoeft te raden welk formaat er is opgeslagen.
+
+Header: ``MAGIC`` gevolgd door één tag byte; de hoge nibble is de serializer
+id, de lage nibble de compressor id. Waarden zonder header zijn legacy
+(plain JSON/tekst of gzip+JSON) en worden nog gelezen; pickle niet meer.
+datetime, set, Decimal en UUID worden opgeslagen als ISO string, lijst en
+string en komen zo ook terug.
+"""
+
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+import uuid
+import zlib
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Optional fast paths
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ormsgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    ormsgpack = None
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\xbc"
+GZIP_MAGIC = b"\x1f\x8b"
+
+COMPRESS_MIN_BYTES = int(os.getenv("REDIS_CACHE_COMPRESS_MIN_BYTES", "1024"))
+COMPRESSION = os.getenv("REDIS_CACHE_COMPRESSION", "auto")
+COMPRESSION_LEVEL = os.getenv("REDIS_CACHE_COMPRESSION_LEVEL")
+
+
+class CodecError(ValueError):
+    """Raised when a value cannot be encoded or a payload cannot be decoded."""
+
+
+def _to_serializable(obj: Any) -> Any:
+    # Common value types that pickle used to round-trip; they come back in
+    # their plain form (ISO string, list, str)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        try:
+            return sorted(obj)
+        except TypeError:
+            return list(obj)
+    if isinstance(obj, (Decimal, uuid.UUID)):
+        return str(obj)
+    # Objects are stored by their attributes, as the cache always did
+    if hasattr(obj, "__dict__") and not callable(obj):
+        return obj.__dict__
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+class Serializer:
+    """Value <-> bytes; ``tag`` (1-15) identifies it in the header."""
+    tag = 0
+    name = ""
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class BytesSerializer(Serializer):
+    tag, name = 1, "bytes"
+
+    def dumps(self, value: Any) -> bytes:
+        return bytes(value)
+
+    def loads(self, data: bytes) -> Any:
+        return data
+
+
+class StrSerializer(Serializer):
+    tag, name = 2, "str"
+
+    def dumps(self, value: Any) -> bytes:
+        return value.encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return data.decode("utf-8")
+
+
+class JsonSerializer(Serializer):
+    """JSON via orjson when installed, otherwise the standard library."""
+    tag, name = 3, "json"
+
+    def dumps(self, value: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(value, default=_to_serializable, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(value, default=_to_serializable, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+
+class StdJsonSerializer(Serializer):
+    """Standard library JSON: last resort for values orjson and msgpack reject (e.g. huge ints)."""
+    tag, name = 5, "json-std"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_to_serializable, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """MessagePack via ormsgpack or msgpack."""
+    tag, name = 4, "msgpack"
+
+    @staticmethod
+    def available() -> bool:
+        return ormsgpack is not None or msgpack is not None
+
+    def dumps(self, value: Any) -> bytes:
+        if ormsgpack is not None:
+            return ormsgpack.packb(value, default=_to_serializable, option=ormsgpack.OPT_NON_STR_KEYS)
+        return msgpack.packb(value, default=_to_serializable, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        if ormsgpack is not None:
+            return ormsgpack.unpackb(data, option=ormsgpack.OPT_NON_STR_KEYS)
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class Compressor:
+    """Bytes <-> compressed bytes; ``tag`` (1-15) identifies it in the header."""
+    tag = 0
+    name = ""
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZlibCompressor(Compressor):
+    tag, name = 1, "zlib"
+
+    def __init__(self, level: Optional[int] = None):
+        self.level = 6 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    tag, name = 2, "zstd"
+
+    def __init__(self, level: Optional[int] = None):
+        # Level 3 is zstd's default trade-off: faster than zlib-6 at a better ratio
+        self.level = 3 if level is None else level
+        # zstd contexts must not be shared between threads
+        self._local = threading.local()
+
+    @staticmethod
+    def available() -> bool:
+        return zstandard is not None
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = getattr(self._local, "compressor", None)
+        if compressor is None:
+            compressor = self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+        return compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = getattr(self._local, "decompressor", None)
+        if decompressor is None:
+            decompressor = self._local.decompressor = zstandard.ZstdDecompressor()
+        # Frames written by compress() carry their content size
+        return decompressor.decompress(data)
+
+
+_SERIALIZERS: Dict[int, Serializer] = {}
+# tag -> (name, factory taking an optional level)
+_COMPRESSORS: Dict[int, Tuple[str, Callable[[Optional[int]], Compressor]]] = {}
+# Decompression does not depend on the level: one shared instance per tag
+_DECOMPRESSORS: Dict[int, Compressor] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    """Make a serializer available for decoding (and for ``CacheCodec(serializer=...)``)."""
+    if not 1 <= serializer.tag <= 15:
+        raise ValueError("Serializer tag must be between 1 and 15")
+    _SERIALIZERS[serializer.tag] = serializer
+
+
+def register_compressor(tag: int, name: str, factory: Callable[[Optional[int]], Compressor]) -> None:
+    """Register a compressor factory taking an optional level."""
+    if not 1 <= tag <= 15:
+        raise ValueError("Compressor tag must be between 1 and 15")
+    _COMPRESSORS[tag] = (name, factory)
+    _DECOMPRESSORS.pop(tag, None)
+
+
+def _decompressor(tag: int) -> Compressor:
+    decompressor = _DECOMPRESSORS.get(tag)
+    if decompressor is None:
+        if tag not in _COMPRESSORS:
+            raise CodecError(f"Unknown compressor tag {tag}")
+        decompressor = _DECOMPRESSORS[tag] = _COMPRESSORS[tag][1](None)
+    return decompressor
+
+
+register_serializer(BytesSerializer())
+register_serializer(StrSerializer())
+register_serializer(JsonSerializer())
+register_serializer(StdJsonSerializer())
+if MsgpackSerializer.available():
+    register_serializer(MsgpackSerializer())
+register_compressor(ZlibCompressor.tag, ZlibCompressor.name, ZlibCompressor)
+if ZstdCompressor.available():
+    register_compressor(ZstdCompressor.tag, ZstdCompressor.name, ZstdCompressor)
+
+
+def _serializer_by_name(name: str) -> Serializer:
+    for serializer in _SERIALIZERS.values():
+        if serializer.name == name:
+            return serializer
+    raise CodecError(f"Unknown or unavailable serializer: {name}")
+
+
+def _make_compressor(name: str, level: Optional[int]) -> Optional[Compressor]:
+    if name == "none":
+        return None
+    if name == "auto":
+        name = "zstd" if ZstdCompressor.tag in _COMPRESSORS else "zlib"
+    for registered_name, factory in _COMPRESSORS.values():
+        if registered_name == name:
+            return factory(level)
+    raise CodecError(f"Unknown or unavailable compressor: {name}")
+
+
+class CacheCodec:
+    """
+    Encodes cache values to tagged bytes and back.
+
+    ``str`` and ``bytes`` are stored as-is; other values use ``serializer``
+    (``"auto"``: msgpack when installed, otherwise JSON), falling back to
+    JSON for values msgpack cannot hold. Payloads of at least
+    ``compress_min_bytes`` are compressed when that actually saves space.
+    """
+
+    def __init__(self, serializer: str = "auto", compressor: str = COMPRESSION,
+                 level: Optional[int] = None, compress_min_bytes: int = COMPRESS_MIN_BYTES):
+        if serializer == "auto":
+            serializer = "msgpack" if MsgpackSerializer.tag in _SERIALIZERS else "json"
+        self.serializer = _serializer_by_name(serializer)
+        if level is None and COMPRESSION_LEVEL:
+            level = int(COMPRESSION_LEVEL)
+        self.compressor = _make_compressor(compressor, level)
+        self.compress_min_bytes = compress_min_bytes
+        self._fallbacks = [self.serializer] + [
+            _SERIALIZERS[tag] for tag in (JsonSerializer.tag, StdJsonSerializer.tag)
+            if _SERIALIZERS[tag] is not self.serializer]
+
+    def _serialize(self, value: Any):
+        if isinstance(value, str):
+            return _SERIALIZERS[StrSerializer.tag], value.encode("utf-8")
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return _SERIALIZERS[BytesSerializer.tag], bytes(value)
+        if callable(value):
+            raise CodecError("Cannot serialize function object")
+        error: Optional[Exception] = None
+        for serializer in self._fallbacks:
+            try:
+                return serializer, serializer.dumps(value)
+            except (TypeError, ValueError, OverflowError) as e:
+                error = e
+        raise CodecError(str(error)) from error
+
+    def encode(self, value: Any) -> bytes:
+        serializer, payload = self._serialize(value)
+        compressor_tag = 0
+        if self.compressor is not None and len(payload) >= self.compress_min_bytes:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < len(payload):
+                payload, compressor_tag = compressed, self.compressor.tag
+        return MAGIC + bytes([(serializer.tag << 4) | compressor_tag]) + payload
+
+    def decode(self, data: Any) -> Any:
+        if isinstance(data, str):
+            return _decode_legacy(data.encode("utf-8"))
+        if not data.startswith(MAGIC) or len(data) < 2:
+            return _decode_legacy(data)
+
+        tag = data[1]
+        serializer = _SERIALIZERS.get(tag >> 4)
+        if serializer is None:
+            raise CodecError(f"Unknown serializer tag {tag >> 4}")
+        payload = data[2:]
+        if tag & 0x0F:
+            payload = _decompressor(tag & 0x0F).decompress(payload)
+        return serializer.loads(payload)
+
+
+def _decode_legacy(data: bytes) -> Any:
+    """Values written before the codec: JSON or plain text, optionally gzipped."""
+    if data.startswith(GZIP_MAGIC):
+        data = gzip.decompress(data)
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        # Old pickled objects are not loaded: treat as a miss
+        raise CodecError("Undecodable legacy payload")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+# Shared default codec
+default_codec = CacheCodec()
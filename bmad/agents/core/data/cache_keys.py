@@ -0,0 +1,168 @@
+"""
+BMAD Cache Keys
+
+Canonieke cache keys voor gecachte functies: argumenten worden structureel
+geëncodeerd (mappings en sets gesorteerd, types expliciet) in plaats van via
+``str()``, en gehasht met een snelle niet-cryptografische hash.
+
+Gelijke aanroepen geven dezelfde key, ongeacht dict volgorde of of een
+argument positioneel of als keyword is meegegeven.
+"""
+
+import dataclasses
+import hashlib
+import inspect
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# Optional fast path
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+
+def _type_name(obj: Any) -> bytes:
+    cls = obj if isinstance(obj, type) else type(obj)
+    return f"{cls.__module__}.{cls.__qualname__}".encode("utf-8")
+
+
+def _encode_sized(out: bytearray, tag: bytes, data: bytes) -> None:
+    out += tag
+    out += str(len(data)).encode()
+    out += b":"
+    out += data
+
+
+def _encode(obj: Any, out: bytearray, seen: set) -> None:
+    # bool before int: True == 1 but must not share a key
+    if obj is None:
+        out += b"N"
+    elif obj is True:
+        out += b"T"
+    elif obj is False:
+        out += b"F"
+    elif isinstance(obj, Enum):
+        _encode_sized(out, b"e", _type_name(obj))
+        _encode(obj.value, out, seen)
+    elif isinstance(obj, int):
+        out += b"i" + str(int(obj)).encode() + b";"
+    elif isinstance(obj, float):
+        out += b"f" + repr(float(obj)).encode() + b";"
+    elif isinstance(obj, str):
+        _encode_sized(out, b"s", obj.encode("utf-8", "surrogatepass"))
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        _encode_sized(out, b"b", bytes(obj))
+    elif isinstance(obj, (list, tuple, dict, set, frozenset)):
+        if id(obj) in seen:
+            out += b"R"
+            return
+        seen.add(id(obj))
+        if isinstance(obj, dict):
+            _encode_unordered(out, b"d", (_encode_pair(k, v, seen) for k, v in obj.items()), len(obj))
+        elif isinstance(obj, (set, frozenset)):
+            _encode_unordered(out, b"S", (_encode_one(item, seen) for item in obj), len(obj))
+        else:
+            out += (b"l" if isinstance(obj, list) else b"t") + str(len(obj)).encode() + b":"
+            for item in obj:
+                _encode(item, out, seen)
+        seen.discard(id(obj))
+    elif hasattr(obj, "__cache_key__"):
+        # Objects can define their own identity for caching
+        _encode_sized(out, b"o", _type_name(obj))
+        _encode(obj.__cache_key__(), out, seen)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        _encode_sized(out, b"o", _type_name(obj))
+        _encode({f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}, out, seen)
+    elif callable(obj):
+        name = getattr(obj, "__qualname__", None) or getattr(obj, "__name__", "unknown")
+        _encode_sized(out, b"c", f"{getattr(obj, '__module__', '')}.{name}".encode("utf-8"))
+    elif hasattr(obj, "__dict__"):
+        # Stateful objects (e.g. ``self``) are keyed by type only, as before
+        _encode_sized(out, b"O", _type_name(obj))
+    else:
+        # Value types without __dict__ (datetime, Decimal, UUID, Path): str() is stable
+        _encode_sized(out, b"v", _type_name(obj))
+        _encode_sized(out, b"", str(obj).encode("utf-8", "surrogatepass"))
+
+
+def _encode_one(obj: Any, seen: set) -> bytes:
+    out = bytearray()
+    _encode(obj, out, seen)
+    return bytes(out)
+
+
+def _encode_pair(key: Any, value: Any, seen: set) -> bytes:
+    out = bytearray()
+    _encode(key, out, seen)
+    _encode(value, out, seen)
+    return bytes(out)
+
+
+def _encode_unordered(out: bytearray, tag: bytes, items: Iterable[bytes], count: int) -> None:
+    # Sorted on the encoded bytes: independent of insertion and hash order
+    out += tag + str(count).encode() + b":"
+    for item in sorted(items):
+        out += item
+
+
+def encode_key(*parts: Any) -> bytes:
+    """Deterministic structural encoding of the parts."""
+    out = bytearray()
+    seen: set = set()
+    for part in parts:
+        _encode(part, out, seen)
+    return bytes(out)
+
+
+def hash_key(data: bytes) -> str:
+    """128-bit hex digest: xxh3 when installed, otherwise BLAKE2b."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def make_key(func_name: str, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> str:
+    """Cache key for a call of ``func_name`` with ``args`` and ``kwargs``."""
+    return hash_key(encode_key(func_name, tuple(args), kwargs or {}))
+
+
+class KeyBuilder:
+    """
+    Normaliseert de argumenten van een gecachte functie voor de key.
+
+    Argumenten worden aan de signature gebonden (defaults ingevuld), zodat
+    ``f(1, y=2)`` en ``f(1, 2)`` dezelfde key krijgen. ``include`` beperkt de
+    key tot de genoemde parameters, ``exclude`` laat parameters weg (bijv.
+    ``self`` of een logger).
+    """
+
+    def __init__(self, func: Callable, include: Optional[Iterable[str]] = None,
+                 exclude: Optional[Iterable[str]] = None):
+        self.include = frozenset(include) if include is not None else None
+        self.exclude = frozenset(exclude or ())
+        try:
+            self.signature: Optional[inspect.Signature] = inspect.signature(func)
+        except (TypeError, ValueError):
+            self.signature = None
+        if self.signature is not None:
+            unknown = ((self.include or frozenset()) | self.exclude) - set(self.signature.parameters)
+            if unknown:
+                raise ValueError(f"Unknown parameters for cache key of {func.__name__}: {sorted(unknown)}")
+
+    def arguments(self, args: Tuple, kwargs: Dict[str, Any]) -> Tuple[Tuple, Dict[str, Any]]:
+        """(args, kwargs) to hash: all arguments by name when the call binds."""
+        if self.signature is None:
+            return args, kwargs
+        try:
+            bound = self.signature.bind(*args, **kwargs)
+        except TypeError:
+            # Invalid call: key on the raw arguments and let the function raise
+            return args, kwargs
+        bound.apply_defaults()
+        arguments = bound.arguments
+        if self.include is not None:
+            arguments = {name: value for name, value in arguments.items() if name in self.include}
+        if self.exclude:
+            arguments = {name: value for name, value in arguments.items() if name not in self.exclude}
+        return (), dict(arguments)
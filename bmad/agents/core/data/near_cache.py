@@ -0,0 +1,136 @@
+"""
+BMAD Near Cache
+
+Begrensde in-process L1 cache voor RedisCache. Houdt kleine, vaak gelezen
+waarden (project configs, agent confidence) gedecodeerd lokaal vast, zodat
+herhaalde reads geen Redis round-trip en geen decode kosten.
+
+Coherentie: writes via RedisCache publiceren de key op een invalidatie
+kanaal (of Redis keyspace notifications worden gevolgd) en elke instantie
+verwijdert de key uit zijn L1. De L1 TTL per cache type is een fractie van
+de Redis TTL, zodat een gemist bericht hooguit kort oude data geeft.
+"""
+
+import copy
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+INVALIDATION_CHANNEL = "bmad:cache:invalidate"
+
+# Returned as-is; everything else is copied so callers cannot mutate the entry
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+class NearCache:
+    """
+    Thread-safe LRU van key -> gedecodeerde waarde met expiry per entry.
+
+    Begrensd op aantal entries en totale (gecodeerde) bytes; waarden groter
+    dan ``max_value_bytes`` worden niet lokaal bewaard. ``get`` geeft een kopie
+    van mutable waarden terug.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 max_value_bytes: int = 64 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_value_bytes = max_value_bytes
+        # key -> (value, encoded size, expiry)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; see set()
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[2] <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        if isinstance(value, _IMMUTABLE_TYPES):
+            return value
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float, version: Optional[int] = None,
+            size: Optional[int] = None) -> bool:
+        """
+        Bewaar ``value`` voor ``ttl`` seconden.
+
+        ``size`` is de gecodeerde grootte voor de byte limieten (default
+        ``len(value)`` voor bytes). Met ``version`` (gelezen vóór de Redis
+        read) wordt niets opgeslagen als er intussen een invalidatie
+        binnenkwam: die read kan al verouderd zijn.
+        """
+        if size is None:
+            size = len(value)
+        if ttl <= 0 or size > min(self.max_value_bytes, self.max_bytes):
+            return False
+        with self._lock:
+            if version is not None and version != self.version:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_pattern(self, pattern: str) -> None:
+        """Verwijder alle keys die matchen met een Redis glob pattern."""
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            for key in [k for k in self._entries if fnmatch.fnmatchcase(k, pattern)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key: str) -> None:
+        self._size -= self._entries.pop(key)[1]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def derive_l1_ttls(default_ttls: Dict[str, int], fraction: float, max_ttl: float) -> Dict[str, float]:
+    """L1 TTL per cache type: ``fraction`` van de Redis TTL, hooguit ``max_ttl``."""
+    return {cache_type: min(ttl * fraction, max_ttl) for cache_type, ttl in default_ttls.items()}
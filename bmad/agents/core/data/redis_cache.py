@@ -6,18 +6,33 @@ Implementeert intelligent caching met TTL, cache invalidation en fallback strate
 """
 
 import os
-import json
-import gzip
-import pickle
 import logging
+import math
+import random
 import time
-from typing import Any, Dict, Optional, Callable
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Callable
 from functools import wraps
 import redis
 from redis.connection import ConnectionPool
 
+from .cache_codec import CacheCodec, CodecError, default_codec
+from .cache_keys import KeyBuilder, make_key
+from .near_cache import INVALIDATION_CHANNEL, NearCache, derive_l1_ttls
+
 logger = logging.getLogger(__name__)
 
+# Optional in-process L1 in front of Redis (0 = uit)
+L1_CACHE_SIZE = int(os.getenv("REDIS_L1_CACHE_SIZE", "0"))
+L1_TTL_FRACTION = float(os.getenv("REDIS_L1_TTL_FRACTION", "0.1"))
+L1_MAX_TTL = float(os.getenv("REDIS_L1_MAX_TTL", "300"))
+# "channel": writes publiceren op INVALIDATION_CHANNEL; "keyspace": Redis
+# keyspace notifications (vereist notify-keyspace-events met K en g$x)
+L1_INVALIDATION = os.getenv("REDIS_L1_INVALIDATION", "channel")
+# Distinguishes an L1 miss from a cached None
+_L1_MISS = object()
+
 # Global connection pool for better performance
 _redis_pool = None
 _redis_client = None
@@ -54,64 +69,67 @@ def get_redis_client():
     return _redis_client
 
 def _compress_data(data: Any) -> bytes:
-    """Compress data for storage with security measures."""
+    """Encode data for storage: tagged msgpack/JSON, compressed when large."""
     try:
-        # Handle function objects and other non-serializable types
-        if callable(data):
-            return json.dumps({"error": "Cannot serialize function object"}).encode('utf-8')
-        
-        # Use JSON for security instead of pickle when possible
-        if isinstance(data, (dict, list, str, int, float, bool, type(None))):
-            return json.dumps(data).encode('utf-8')
-        
-        # For other objects, try to convert to dict first
-        if hasattr(data, '__dict__'):
-            try:
-                return json.dumps(data.__dict__).encode('utf-8')
-            except (TypeError, ValueError):
-                pass
-        
-        # Fallback to pickle only for complex objects, with security measures
-        import pickle
-        serialized = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
-        if len(serialized) > 1024:  # Only compress if > 1KB
-            return gzip.compress(serialized)
-        return serialized
-    except Exception as e:
-        # Final fallback to JSON string representation
-        return json.dumps({"error": f"Serialization failed: {str(e)}"}).encode('utf-8')
+        return default_codec.encode(data)
+    except CodecError as e:
+        # Keep the old contract: store an error marker instead of failing
+        return default_codec.encode({"error": f"Serialization failed: {str(e)}"})
 
 def _decompress_data(data: bytes) -> Any:
-    """Decompress data from storage with security measures."""
+    """Decode data from storage; legacy JSON/gzip values are still readable."""
     try:
-        if data.startswith(b'\x1f\x8b'):  # Gzip header
-            decompressed = gzip.decompress(data)
-            # Try JSON first
-            try:
-                return json.loads(decompressed.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # Fallback to pickle with security check
-                import pickle
-                return pickle.loads(decompressed)
-        else:
-            # Try JSON first
-            try:
-                return json.loads(data.decode('utf-8'))
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                # Fallback to pickle with security check
-                import pickle
-                return pickle.loads(data)
+        return default_codec.decode(data)
     except Exception as e:
         logger.warning(f"Data decompression failed: {e}")
         # Return safe fallback
         return None
 
+# --- Distributed single-flight locks ---
+LOCK_PREFIX = "bmad:lock:"
+# Token for callers that run without Redis: proceed without coordination
+NO_LOCK = "no-lock"
+_RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) else return 0 end"
+)
+
+def _acquire_lock(client, key: str, ttl: float) -> Optional[str]:
+    """SET NX PX lock; returns the owner token, or None if another worker holds it."""
+    token = uuid.uuid4().hex
+    if client.set(LOCK_PREFIX + key, token, nx=True, px=max(1, int(ttl * 1000))):
+        return token
+    return None
+
+def _release_lock(client, key: str, token: str) -> None:
+    """Release the lock only if we still own it."""
+    if token == NO_LOCK:
+        return
+    lock_key = LOCK_PREFIX + key
+    try:
+        client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+    except redis.ResponseError:
+        # No scripting available: compare-and-delete without atomicity
+        current = client.get(lock_key)
+        if current is not None and (current.decode() if isinstance(current, bytes) else current) == token:
+            client.delete(lock_key)
+
 class RedisCache:
     """Advanced Redis caching layer with intelligent fallback strategies."""
     
-    def __init__(self, redis_url: Optional[str] = None):
+    def __init__(self, redis_url: Optional[str] = None, codec: Optional[CacheCodec] = None,
+                 l1_size: Optional[int] = None, l1_invalidation: str = L1_INVALIDATION):
         self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
         self.redis_client = None
+        # Values go over a client without decode_responses; see _connect
+        self.binary_client = None
+        self.codec = codec or default_codec
+        self.l1_size = L1_CACHE_SIZE if l1_size is None else l1_size
+        self.l1_invalidation = l1_invalidation
+        # Near cache; only active while invalidations are received
+        self.near_cache: Optional[NearCache] = None
+        self._invalidation_thread = None
+        self._instance_id = uuid.uuid4().hex
         self.enabled = True
         self.stats = {
             "hits": 0,
@@ -130,6 +148,7 @@ class RedisCache:
             "workflow_state": 7200,    # 2 uur
             "metrics": 60,             # 1 minuut
         }
+        self.l1_ttls = derive_l1_ttls(self.default_ttls, L1_TTL_FRACTION, L1_MAX_TTL)
         self._connect()
 
     def cache(self, *args, **kwargs):
@@ -145,25 +164,9 @@ class RedisCache:
         """Backward compatibility property for tests."""
         return self.redis_client
 
-    def _generate_key(self, func_name: str, *args, **kwargs) -> str:
-        """Generate cache key with secure hashing."""
-        import hashlib
-        
-        # Filter out non-serializable objects (like functions)
-        def filter_serializable(obj):
-            if callable(obj):
-                return f"<function:{getattr(obj, '__name__', 'unknown')}>"
-            elif hasattr(obj, '__dict__'):
-                return f"<object:{type(obj).__name__}>"
-            else:
-                return str(obj)
-        
-        # Filter args and kwargs
-        filtered_args = [filter_serializable(arg) for arg in args]
-        filtered_kwargs = {k: filter_serializable(v) for k, v in kwargs.items()}
-        
-        key_data = f"{func_name}:{str(filtered_args)}:{str(sorted(filtered_kwargs.items()))}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+    def _generate_key(self, func_name: str, /, *args, **kwargs) -> str:
+        """Generate a canonical cache key for a call."""
+        return make_key(func_name, args, kwargs)
 
     def _connect(self):
         """Maak verbinding met Redis."""
@@ -171,34 +174,118 @@ class RedisCache:
             self.redis_client = redis.from_url(self.redis_url, decode_responses=True)
             # Test connection
             self.redis_client.ping()
+            # Cached values are binary (codec header, compression)
+            self.binary_client = redis.from_url(self.redis_url)
             logger.info("✅ Redis cache verbonden")
         except (redis.RedisError, redis.ConnectionError) as e:
             logger.warning(f"⚠️ Redis niet beschikbaar: {e}")
             self.enabled = False
             self.redis_client = None
+            self.binary_client = None
+            return
+
+        if self.l1_size > 0:
+            self._start_near_cache()
+
+    def _start_near_cache(self):
+        """Start de L1 cache en de listener voor invalidaties."""
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            if self.l1_invalidation == "keyspace":
+                pubsub.psubscribe(**{"__keyspace@*__:*": self._on_keyspace_event})
+            else:
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._on_invalidation})
+            self._invalidation_thread = pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True, exception_handler=self._on_invalidation_error)
+        except redis.RedisError as e:
+            logger.warning(f"L1 cache uitgeschakeld, geen invalidatie kanaal: {e}")
+            return
+        self.near_cache = NearCache(max_entries=self.l1_size)
+        logger.info(f"L1 cache actief ({self.l1_size} entries, invalidatie via {self.l1_invalidation})")
+
+    def close_near_cache(self):
+        """Stop de L1 cache en de invalidatie listener."""
+        near_cache, self.near_cache = self.near_cache, None
+        if near_cache is not None:
+            near_cache.clear()
+        thread, self._invalidation_thread = self._invalidation_thread, None
+        if thread is not None:
+            thread.stop()
+
+    def _on_invalidation(self, message):
+        parts = message["data"].split("|", 2)
+        near_cache = self.near_cache
+        # Own writes already updated the local L1
+        if near_cache is None or len(parts) != 3 or parts[0] == self._instance_id:
+            return
+        _, kind, target = parts
+        if kind == "p":
+            near_cache.invalidate_pattern(target)
+        else:
+            near_cache.invalidate(target)
+
+    def _on_keyspace_event(self, message):
+        near_cache = self.near_cache
+        if near_cache is not None:
+            # Channel is "__keyspace@<db>__:<key>"
+            near_cache.invalidate(message["channel"].split(":", 1)[1])
+
+    def _on_invalidation_error(self, error, pubsub, thread):
+        # Without invalidations the L1 could serve stale data: fall back to Redis only
+        logger.warning(f"L1 cache uitgeschakeld, invalidatie listener gestopt: {error}")
+        thread.stop()
+        pubsub.close()
+        self._invalidation_thread = None
+        self.close_near_cache()
+
+    def _publish_invalidation(self, kind: str, target: str):
+        if self.near_cache is None or self.l1_invalidation != "channel":
+            return
+        try:
+            self.redis_client.publish(INVALIDATION_CHANNEL, f"{self._instance_id}|{kind}|{target}")
+        except redis.RedisError as e:
+            logger.warning(f"Redis publish error: {e}")
+
+    def _l1_ttl(self, cache_type: str) -> float:
+        ttl = self.l1_ttls.get(cache_type)
+        if ttl is None:
+            ttl = min(self.default_ttls.get(cache_type, 3600) * L1_TTL_FRACTION, L1_MAX_TTL)
+        return ttl
 
-    def get(self, key: str, default: Any = None) -> Any:
+    def get(self, key: str, default: Any = None, cache_type: str = "default") -> Any:
         """
         Haal waarde op uit cache.
         
         :param key: Cache key
         :param default: Default waarde als key niet bestaat
+        :param cache_type: Type cache voor de L1 TTL
         :return: Gecachte waarde of default
         """
-        if not self.enabled or not self.redis_client:
+        if not self.enabled or not self.binary_client:
             return default
 
         try:
-            value = self.redis_client.get(key)
-            if value is None:
+            near_cache = self.near_cache
+            if near_cache is not None:
+                value = near_cache.get(key, _L1_MISS)
+                if value is not _L1_MISS:
+                    return value
+                version = near_cache.version
+
+            data = self.binary_client.get(key)
+            if data is None:
                 return default
 
-            # Probeer JSON deserialisatie
-            try:
-                return json.loads(value)
-            except json.JSONDecodeError:
-                return value
+            # Header zegt welk formaat; waarden zonder header zijn legacy JSON/tekst
+            value = self.codec.decode(data)
+            if near_cache is not None:
+                # Stored decoded; the L1 hands out copies of mutable values
+                near_cache.set(key, value, self._l1_ttl(cache_type), version, size=len(data))
+            return value
 
+        except CodecError as e:
+            logger.warning(f"Cache decode error for {key}: {e}")
+            return default
         except redis.RedisError as e:
             logger.warning(f"Redis get error: {e}")
             return default
@@ -214,7 +301,7 @@ class RedisCache:
         :param cache_type: Type cache voor default TTL
         :return: True bij succes
         """
-        if not self.enabled or not self.redis_client:
+        if not self.enabled or not self.binary_client:
             return False
 
         try:
@@ -223,16 +310,24 @@ class RedisCache:
                 ttl = self.default_ttls.get(cache_type, 3600)
 
             # Serialiseer waarde
-            if isinstance(value, (dict, list)):
-                serialized_value = json.dumps(value)
-            else:
-                serialized_value = str(value)
+            serialized_value = self.codec.encode(value)
 
             # Sla op in Redis
-            self.redis_client.setex(key, ttl, serialized_value)
-            logger.debug(f"Cache set: {key} (TTL: {ttl}s)")
+            self.binary_client.setex(key, ttl, serialized_value)
+            logger.debug(f"Cache set: {key} (TTL: {ttl}s, {len(serialized_value)} bytes)")
+            near_cache = self.near_cache
+            if near_cache is not None:
+                # Bump the version first so concurrent reads of the old value are not stored
+                near_cache.invalidate(key)
+                # Decoded form, so local reads match what other instances read from Redis
+                near_cache.set(key, self.codec.decode(serialized_value),
+                               min(self._l1_ttl(cache_type), ttl), size=len(serialized_value))
+                self._publish_invalidation("k", key)
             return True
 
+        except CodecError as e:
+            logger.warning(f"Cache encode error for {key}: {e}")
+            return False
         except redis.RedisError as e:
             logger.warning(f"Redis set error: {e}")
             return False
@@ -250,11 +345,46 @@ class RedisCache:
         try:
             result = self.redis_client.delete(key)
             logger.debug(f"Cache delete: {key}")
+            if self.near_cache is not None:
+                self.near_cache.invalidate(key)
+                self._publish_invalidation("k", key)
             return result > 0
         except redis.RedisError as e:
             logger.warning(f"Redis delete error: {e}")
             return False
 
+    def acquire_lock(self, key: str, ttl: float = 30) -> Optional[str]:
+        """
+        Probeer de single-flight lock voor een key te krijgen.
+        
+        :param key: Cache key
+        :param ttl: Maximale lock duur in seconden
+        :return: Token bij succes, None als een andere worker de lock heeft
+        """
+        if not self.enabled or not self.binary_client:
+            return NO_LOCK
+
+        try:
+            return _acquire_lock(self.binary_client, key, ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Redis lock error: {e}")
+            return NO_LOCK
+
+    def release_lock(self, key: str, token: str) -> None:
+        """
+        Geef een lock vrij die met acquire_lock is verkregen.
+        
+        :param key: Cache key
+        :param token: Token van acquire_lock
+        """
+        if not self.enabled or not self.binary_client:
+            return
+
+        try:
+            _release_lock(self.binary_client, key, token)
+        except redis.RedisError as e:
+            logger.warning(f"Redis unlock error: {e}")
+
     def exists(self, key: str) -> bool:
         """
         Controleer of key bestaat in cache.
@@ -282,6 +412,9 @@ class RedisCache:
             return 0
 
         try:
+            if self.near_cache is not None:
+                self.near_cache.invalidate_pattern(pattern)
+                self._publish_invalidation("p", pattern)
             keys = self.redis_client.keys(pattern)
             if keys:
                 deleted = self.redis_client.delete(*keys)
@@ -310,6 +443,7 @@ class RedisCache:
                 "keyspace_hits": info.get("keyspace_hits", 0),
                 "keyspace_misses": info.get("keyspace_misses", 0),
                 "total_commands_processed": info.get("total_commands_processed", 0),
+                **({"l1": self.near_cache.stats()} if self.near_cache is not None else {}),
             }
         except redis.RedisError as e:
             logger.warning(f"Redis stats error: {e}")
@@ -318,73 +452,202 @@ class RedisCache:
 # Global cache instance
 cache = RedisCache()
 
-def _generate_key(func_name: str, *args, **kwargs) -> str:
-    """Generate cache key with secure hashing."""
-    import hashlib
+def _generate_key(func_name: str, /, *args, **kwargs) -> str:
+    """Generate a canonical cache key for a call."""
+    return make_key(func_name, args, kwargs)
+
+# --- Stampede protection ---
+# Marker of entries written by the decorators: value plus refresh metadata
+ENTRY_MARKER = "__bmad_cache__"
+LOCK_TIMEOUT = 30.0
+# Waiters back off exponentially from the first to the max interval (with
+# jitter), so a 30s wait costs a few dozen reads instead of hundreds
+LOCK_POLL_INTERVAL = 0.05
+LOCK_POLL_MAX_INTERVAL = 1.0
+EARLY_REFRESH_BETA = 1.0
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    global _refresh_executor
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bmad-cache-refresh")
+    return _refresh_executor
+
+def _make_entry(value: Any, ttl: float, compute_time: float) -> Dict[str, Any]:
+    return {ENTRY_MARKER: 1, "value": value, "expires": time.time() + ttl, "delta": compute_time}
+
+def _is_entry(data: Any) -> bool:
+    return isinstance(data, dict) and data.get(ENTRY_MARKER) == 1
+
+def _should_refresh(entry: Dict[str, Any], beta: float) -> bool:
+    """
+    Probabilistic early expiration (XFetch).
     
-    # Filter out non-serializable objects (like functions)
-    def filter_serializable(obj):
-        if callable(obj):
-            return f"<function:{getattr(obj, '__name__', 'unknown')}>"
-        elif hasattr(obj, '__dict__'):
-            return f"<object:{type(obj).__name__}>"
-        else:
-            return str(obj)
+    Refreshes before the soft expiry with a probability that grows as expiry
+    nears and with how long the value took to compute, so one caller of a
+    hot key refreshes it instead of all callers at the moment it expires.
+    """
+    gap = entry["delta"] * beta * -math.log(1.0 - random.random())
+    return time.time() + gap >= entry["expires"]
+
+class _StampedeGuard:
+    """
+    Single-flight cache fill around one cache backend.
     
-    # Filter args and kwargs
-    filtered_args = [filter_serializable(arg) for arg in args]
-    filtered_kwargs = {k: filter_serializable(v) for k, v in kwargs.items()}
+    - Miss: one worker takes the distributed lock and computes; the others
+      poll the cache with exponential backoff until the value appears, take
+      over when the lock is released, or compute locally once
+      ``lock_timeout`` (the lock TTL) has passed.
+    - Hit close to or past the soft TTL: the value is returned immediately
+      and one worker refreshes it in the background (stale-while-revalidate
+      for up to ``stale_ttl`` seconds after expiry).
+    """
+    
+    def __init__(self, read: Callable[[str], Any], write: Callable[[str, Any, int], Any],
+                 acquire: Callable[[str, float], Optional[str]], release: Callable[[str, str], Any],
+                 ttl: int, stale_ttl: int = 0, beta: float = EARLY_REFRESH_BETA,
+                 lock_timeout: float = LOCK_TIMEOUT):
+        self.read = read
+        self.write = write
+        self.acquire = acquire
+        self.release = release
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+    
+    def get(self, key: str, compute: Callable[[], Any]) -> Any:
+        data = self.read(key)
+        if data is not None:
+            if not _is_entry(data):
+                # Written before stampede protection: plain value
+                return data
+            if _should_refresh(data, self.beta):
+                token = self.acquire(key, self.lock_timeout)
+                if token:
+                    _get_refresh_executor().submit(self._refresh, key, compute, token)
+            return data["value"]
+        
+        token = self.acquire(key, self.lock_timeout)
+        if not token:
+            data, token = self._wait_for_fill(key)
+            if data is not None:
+                logger.debug(f"Cache filled by another worker: {key}")
+                return data["value"] if _is_entry(data) else data
+        try:
+            return self._compute_and_store(key, compute)
+        finally:
+            if token:
+                self.release(key, token)
     
-    key_data = f"{func_name}:{str(filtered_args)}:{str(sorted(filtered_kwargs.items()))}"
-    return hashlib.md5(key_data.encode()).hexdigest()
+    def _wait_for_fill(self, key: str):
+        deadline = time.time() + self.lock_timeout
+        interval = LOCK_POLL_INTERVAL
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, interval * random.uniform(0.5, 1.0)))
+            interval = min(interval * 2, LOCK_POLL_MAX_INTERVAL)
+            data = self.read(key)
+            if data is not None:
+                return data, None
+            # The lock expired or was released without a value: take over
+            token = self.acquire(key, self.lock_timeout)
+            if token:
+                return None, token
+        logger.warning(f"Cache lock wait timed out, computing anyway: {key}")
+        return None, None
+    
+    def _compute_and_store(self, key: str, compute: Callable[[], Any]) -> Any:
+        start_time = time.time()
+        result = compute()
+        entry = _make_entry(result, self.ttl, time.time() - start_time)
+        self.write(key, entry, self.ttl + self.stale_ttl)
+        return result
+    
+    def _refresh(self, key: str, compute: Callable[[], Any], token: str):
+        try:
+            self._compute_and_store(key, compute)
+            logger.debug(f"Cache refreshed in background: {key}")
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed for {key}: {e}")
+        finally:
+            self.release(key, token)
+
+def _resolve_ttl(redis_cache: Any, ttl: Optional[int], cache_type: str) -> int:
+    if ttl is not None:
+        return ttl
+    default_ttls = getattr(redis_cache, "default_ttls", None)
+    if isinstance(default_ttls, dict):
+        return default_ttls.get(cache_type, 3600)
+    return 3600
 
 def cached(ttl: Optional[int] = None, cache_type: str = "default",
-           key_prefix: str = "function", expire: Optional[int] = None):
+           key_prefix: str = "function", expire: Optional[int] = None,
+           stale_ttl: int = 0, early_refresh_beta: float = EARLY_REFRESH_BETA,
+           lock_timeout: float = LOCK_TIMEOUT, key_include: Optional[List[str]] = None,
+           key_exclude: Optional[List[str]] = None):
     """
-    Decorator voor function caching.
+    Decorator voor function caching met stampede protection.
     
     :param ttl: Time-to-live in seconden
     :param cache_type: Type cache voor default TTL
     :param key_prefix: Prefix voor cache key
     :param expire: Alias for ttl (backward compatibility)
+    :param stale_ttl: Grace period waarin een verlopen waarde nog geserveerd
+        wordt terwijl één worker hem ververst (stale-while-revalidate)
+    :param early_refresh_beta: Hoe vroeg hot keys probabilistisch ververst
+        worden (0 = pas na verlopen)
+    :param lock_timeout: Maximale duur van de single-flight lock in seconden
+    :param key_include: Alleen deze parameters bepalen de cache key
+    :param key_exclude: Parameters die niet in de cache key meetellen
     """
     # Use expire if provided, otherwise use ttl
     actual_ttl = expire if expire is not None else ttl
     
     def decorator(func):
+        key_builder = KeyBuilder(func, include=key_include, exclude=key_exclude)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Import here to get the current cache instance (allows for patching)
             from .redis_cache import cache
             
             # Genereer cache key using the standalone function
-            cache_key = _generate_key(f"{key_prefix}_{func.__name__}", *args, **kwargs)
-
-            # Probeer cache hit
-            cached_result = cache.get(cache_key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit: {cache_key}")
-                return cached_result
-
-            # Cache miss - voer functie uit
-            logger.debug(f"Cache miss: {cache_key}")
-            result = func(*args, **kwargs)
-
-            # Cache resultaat
-            cache.set(cache_key, result, actual_ttl, cache_type)
-
-            return result
+            key_args, key_kwargs = key_builder.arguments(args, kwargs)
+            cache_key = _generate_key(f"{key_prefix}_{func.__name__}", *key_args, **key_kwargs)
+
+            guard = _StampedeGuard(
+                read=lambda key: cache.get(key, cache_type=cache_type),
+                write=lambda key, entry, physical_ttl: cache.set(key, entry, physical_ttl, cache_type),
+                acquire=cache.acquire_lock,
+                release=cache.release_lock,
+                ttl=_resolve_ttl(cache, actual_ttl, cache_type),
+                stale_ttl=stale_ttl,
+                beta=early_refresh_beta,
+                lock_timeout=lock_timeout
+            )
+            return guard.get(cache_key, lambda: func(*args, **kwargs))
         return wrapper
     return decorator
 
-def cache_llm_response(ttl: int = 3600):
+def cache_llm_response(ttl: int = 3600, stale_ttl: int = 0):
     """
     Cache decorator voor LLM responses met verbeterde performance.
     
+    Concurrent callers met dezelfde prompt wachten op één upstream call.
+    Met ``stale_ttl`` wordt een verlopen response nog zo lang geserveerd
+    terwijl hij op de achtergrond ververst wordt.
+    
     Args:
         ttl: Time to live in seconds (default: 1 hour)
+        stale_ttl: Stale-while-revalidate grace period in seconds (default: off)
     """
     def decorator(func: Callable) -> Callable:
+        key_builder = KeyBuilder(func)
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
             start_time = time.time()
@@ -395,41 +658,48 @@ def cache_llm_response(ttl: int = 3600):
                 # Fallback to function execution
                 return func(*args, **kwargs)
             
-            try:
-                # Generate cache key
-                cache_key = _generate_key(func.__name__, *args, **kwargs)
-                
-                # Try to get from cache
-                cached_data = redis_client.get(cache_key)
-                if cached_data is not None:
-                    result = _decompress_data(cached_data)
-                    cache_time = time.time() - start_time
-                    logger.debug(f"Cache hit for {func.__name__} in {cache_time*1000:.2f}ms")
-                    return result
-                
-                # Execute function
-                result = func(*args, **kwargs)
-                
-                # Cache result
-                compressed_data = _compress_data(result)
-                redis_client.setex(cache_key, ttl, compressed_data)
-                
-                execution_time = time.time() - start_time
-                logger.debug(f"Cache miss for {func.__name__}, executed in {execution_time*1000:.2f}ms")
-                
-                return result
-                
-            except Exception as e:
-                logger.warning(f"Cache error for {func.__name__}: {e}")
-                # Fallback to function execution
-                return func(*args, **kwargs)
+            # Cache failures degrade to plain execution; errors of func propagate
+            def read(key):
+                try:
+                    data = redis_client.get(key)
+                    return None if data is None else _decompress_data(data)
+                except Exception as e:
+                    logger.warning(f"Cache read error for {func.__name__}: {e}")
+                    return None
+            
+            def write(key, entry, physical_ttl):
+                try:
+                    redis_client.setex(key, physical_ttl, _compress_data(entry))
+                except Exception as e:
+                    logger.warning(f"Cache write error for {func.__name__}: {e}")
+            
+            def acquire(key, lock_ttl):
+                try:
+                    return _acquire_lock(redis_client, key, lock_ttl)
+                except Exception as e:
+                    logger.warning(f"Cache lock error for {func.__name__}: {e}")
+                    return NO_LOCK
+            
+            def release(key, token):
+                try:
+                    _release_lock(redis_client, key, token)
+                except Exception as e:
+                    logger.warning(f"Cache unlock error for {func.__name__}: {e}")
+            
+            guard = _StampedeGuard(read, write, acquire, release, ttl=ttl, stale_ttl=stale_ttl)
+            key_args, key_kwargs = key_builder.arguments(args, kwargs)
+            cache_key = _generate_key(func.__name__, *key_args, **key_kwargs)
+            result = guard.get(cache_key, lambda: func(*args, **kwargs))
+            logger.debug(f"Cache lookup for {func.__name__} took {(time.time() - start_time)*1000:.2f}ms")
+            return result
                 
         return wrapper
     
     # Handle both @cache_llm_response and @cache_llm_response(ttl=3600) usage
     if callable(ttl):
         # Called without parameters: @cache_llm_response
-        return decorator(ttl)
+        func, ttl = ttl, 3600
+        return decorator(func)
     else:
         # Called with parameters: @cache_llm_response(ttl=3600)
         return decorator
@@ -444,4 +714,4 @@ def cache_project_config(func):
 
 def cache_clickup_api(func):
     """Decorator specifiek voor ClickUp API response caching."""
-    return cached(ttl=300, cache_type="clickup_api", key_prefix="clickup")(func)
+    return cached(ttl=300, cache_type="clickup_api", key_prefix="clickup", stale_ttl=60)(func)
@@ -20,82 +20,133 @@ T = TypeVar('T')
 
 class IntelligentCache:
     """
-    Intelligent cache met adaptive TTL en memory management.
+    Intelligent cache met per-entry TTL en O(1) eviction.
+    
+    Segmented LRU: nieuwe entries komen in het probation segment, een hit
+    promoveert ze naar het protected segment (``protected_ratio`` van de
+    capaciteit). Eviction haalt de oudste probation entry weg, zodat een scan
+    van eenmalige keys de vaak gebruikte entries niet verdringt. Verlopen
+    entries worden lazy opgeruimd bij een ``get`` of via ``purge_expired``.
     """
     
-    def __init__(self, max_size: int = 1000, default_ttl: int = 3600):
+    def __init__(self, max_size: int = 1000, default_ttl: Optional[int] = None, protected_ratio: float = 0.8):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: OrderedDict = OrderedDict()
+        # Keep at least one probation slot so a new entry is not evicted on insert
+        self.protected_size = max(1, min(int(max_size * protected_ratio), max_size - 1))
+        self.cache: Dict[str, Any] = {}
         self.access_count: Dict[str, int] = defaultdict(int)
         self.creation_time: Dict[str, float] = {}
+        self.expiry_time: Dict[str, float] = {}
+        # Recency order per segment; values unused
+        self._probation: OrderedDict = OrderedDict()
+        self._protected: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
         self.lock = threading.RLock()
         
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache with access tracking."""
         with self.lock:
-            if key in self.cache:
-                # Update access count and move to end (LRU)
-                self.access_count[key] += 1
-                self.cache.move_to_end(key)
-                return self.cache[key]
-            return None
+            if key not in self.cache:
+                self.misses += 1
+                return None
+            
+            expires = self.expiry_time.get(key)
+            if expires is not None and expires <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self.access_count[key] += 1
+            if key in self._protected:
+                self._protected.move_to_end(key)
+            else:
+                # Second access: promote, demoting the coldest protected entry if full
+                del self._probation[key]
+                self._protected[key] = None
+                if len(self._protected) > self.protected_size:
+                    demoted, _ = self._protected.popitem(last=False)
+                    self._probation[demoted] = None
+            return self.cache[key]
     
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Set item in cache with adaptive TTL."""
+        """Set item in cache; ``ttl`` overrides ``default_ttl``, None, 0 or less never expires."""
         with self.lock:
-            # Remove if exists
+            now = time.time()
+            ttl = self.default_ttl if ttl is None else ttl
+            
             if key in self.cache:
-                del self.cache[key]
-                # Reset access count for updated key
-                if key in self.access_count:
-                    del self.access_count[key]
+                # Update in place; the access count starts over
+                self.access_count.pop(key, None)
+                segment = self._protected if key in self._protected else self._probation
+                segment.move_to_end(key)
+            else:
+                self._probation[key] = None
             
-            # Add new item
             self.cache[key] = value
-            self.creation_time[key] = time.time()
-            
-            # Move to end (LRU)
-            self.cache.move_to_end(key)
+            self.creation_time[key] = now
+            if ttl and ttl > 0:
+                self.expiry_time[key] = now + ttl
+            else:
+                self.expiry_time.pop(key, None)
             
-            # Evict if necessary
-            if len(self.cache) > self.max_size:
-                self._evict_least_valuable()
+            while len(self.cache) > self.max_size:
+                self._evict_one(keep=key)
     
-    def _evict_least_valuable(self) -> None:
-        """Evict least valuable items based on access count and age."""
-        if not self.cache:
-            return
-        
-        # Calculate value score for each item
-        current_time = time.time()
-        item_scores = {}
-        
-        for key in self.cache.keys():
-            age = current_time - self.creation_time.get(key, current_time)
-            access_count = self.access_count.get(key, 0)
-            
-            # Score = access_count / (age + 1) to avoid division by zero
-            score = access_count / (age + 1)
-            item_scores[key] = score
-        
-        # Remove items with lowest scores
-        items_to_remove = len(self.cache) - self.max_size + 1
-        sorted_items = sorted(item_scores.items(), key=lambda x: x[1])
-        
-        for key, _ in sorted_items[:items_to_remove]:
-            del self.cache[key]
-            if key in self.access_count:
-                del self.access_count[key]
-            if key in self.creation_time:
-                del self.creation_time[key]
+    def delete(self, key: str) -> bool:
+        """Remove an entry; returns whether it was present."""
+        with self.lock:
+            if key not in self.cache:
+                return False
+            self._remove(key)
+            return True
+    
+    def _evict_one(self, keep: Optional[str] = None) -> None:
+        """Evict the least recently used probation entry (protected if probation only holds ``keep``)."""
+        if self._probation and not (len(self._probation) == 1 and keep in self._probation):
+            segment = self._probation
+        else:
+            segment = self._protected
+        key = next(iter(segment))
+        self._remove(key)
+        self.evictions += 1
+    
+    def _remove(self, key: str) -> None:
+        del self.cache[key]
+        self._probation.pop(key, None)
+        self._protected.pop(key, None)
+        self.access_count.pop(key, None)
+        self.creation_time.pop(key, None)
+        self.expiry_time.pop(key, None)
+    
+    def purge_expired(self) -> int:
+        """Remove all expired entries (O(n)); returns how many were removed."""
+        with self.lock:
+            now = time.time()
+            expired = [key for key, expires in self.expiry_time.items() if expires <= now]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
     
     def clear(self) -> None:
-        """Clear all cache entries."""
+        """Clear all cache entries and reset the statistics counters."""
         with self.lock:
             self.cache.clear()
             self.access_count.clear()
             self.creation_time.clear()
+            self.expiry_time.clear()
+            self._probation.clear()
+            self._protected.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -104,15 +155,21 @@ class IntelligentCache:
                 "size": len(self.cache),
                 "max_size": self.max_size,
                 "hit_rate": self._calculate_hit_rate(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "protected_size": len(self._protected),
+                "probation_size": len(self._probation),
                 "avg_access_count": sum(self.access_count.values()) / len(self.access_count) if self.access_count else 0
             }
     
     def _calculate_hit_rate(self) -> float:
-        """Calculate cache hit rate."""
-        total_accesses = sum(self.access_count.values())
-        if total_accesses == 0:
+        """Calculate cache hit rate: hits / lookups."""
+        lookups = self.hits + self.misses
+        if lookups == 0:
             return 0.0
-        return len(self.cache) / total_accesses
+        return self.hits / lookups
 
 class ConnectionPool:
     """
@@ -9,13 +9,18 @@ import aiohttp
 import json
 import time
 import hashlib
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 import logging
-import redis
+import redis.asyncio as aioredis
 from functools import wraps
 
+from bmad.core.ai.context_compaction import ContextCompactor
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -26,6 +31,15 @@ class LLMRequest:
     max_tokens: int = 1000
     temperature: float = 0.7
     timeout: int = 30
+    messages: Optional[List[Dict[str, Any]]] = None
+    tools: Optional[List[Dict[str, Any]]] = None
+    agent: Optional[str] = None  # metrics label only, not part of the cache key
+    
+    def get_messages(self) -> List[Dict[str, Any]]:
+        """Chat messages to send; defaults to the prompt as a single user message."""
+        if self.messages is not None:
+            return self.messages
+        return [{'role': 'user', 'content': self.prompt}]
 
 @dataclass
 class LLMResponse:
@@ -36,28 +50,255 @@ class LLMResponse:
     response_time: float
     cached: bool = False
     error: Optional[str] = None
+    coalesced: bool = False
+
+# Status codes that mean the provider is overloaded: back off and retry
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limiter with AIMD (additive increase, multiplicative decrease).
+    
+    The limit grows by one after a full window of successful calls and is
+    halved whenever the provider signals overload (429/5xx), so concurrency
+    settles just below the rate the upstream actually accepts.
+    """
+    
+    def __init__(self, max_concurrency: int = 5, min_concurrency: int = 1,
+                 initial_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = initial_concurrency or max_concurrency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttle_events = 0
+        self._successes = 0
+        self._condition: Optional[asyncio.Condition] = None
+    
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+    
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self._successes = 0
+    
+    def on_throttle(self):
+        self.throttle_events += 1
+        self._successes = 0
+        self.limit = max(self.min_concurrency, self.limit // 2)
+        logger.warning(f"LLM provider throttling, concurrency limit lowered to {self.limit}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'limit': self.limit,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'throttle_events': self.throttle_events
+        }
+
+CACHE_KEY_PREFIX = "bmad:llm:"
+
+def canonical_cache_key(request: LLMRequest) -> str:
+    """
+    Stable cache key over model, sampling parameters, messages and tools.
+    
+    Serialised with sorted keys and fixed separators, so dict ordering or
+    int/float spelling of the temperature never changes the key.
+    """
+    canonical = {
+        'model': request.model,
+        'temperature': float(request.temperature),
+        'max_tokens': int(request.max_tokens),
+        'messages': request.get_messages(),
+        'tools': request.tools or []
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return CACHE_KEY_PREFIX + hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class TwoTierResponseCache:
+    """
+    In-process LRU with TTL in front of ``redis.asyncio``.
+    
+    L1 hits cost a dict lookup; L1 misses go to Redis without blocking the
+    event loop, and batch lookups fetch all misses in one MGET round trip.
+    Redis hits are promoted into L1. If Redis fails the cache works L1-only
+    for a backoff window (``retry_after`` seconds, doubling on every
+    consecutive failure up to ``max_retry_after``) and then tries again.
+    """
+    
+    def __init__(self, redis_url: Optional[str] = "redis://localhost:6379/0",
+                 ttl: int = 3600, max_entries: int = 1024,
+                 redis_client: Optional[aioredis.Redis] = None,
+                 retry_after: float = 30.0, max_retry_after: float = 600.0):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._redis: Optional[aioredis.Redis] = redis_client
+        self._redis_disabled = redis_client is None and not redis_url
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self._redis_failures = 0
+        self._redis_retry_at = 0.0
+        self.stats = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0}
+    
+    def _get_redis(self) -> Optional[aioredis.Redis]:
+        if self._redis_disabled or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+        return self._redis
+    
+    def _redis_failed(self, error: Exception):
+        # The client reconnects by itself; only skip Redis until the window ends
+        backoff = min(self.retry_after * 2 ** self._redis_failures, self.max_retry_after)
+        self._redis_failures += 1
+        self._redis_retry_at = time.monotonic() + backoff
+        logger.warning(f"Redis cache not available, retrying in {backoff:.0f}s: {error}")
+    
+    def _redis_ok(self):
+        if self._redis_failures:
+            logger.info("Redis cache available again")
+            self._redis_failures = 0
+    
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return data
+    
+    def _set_local(self, key: str, data: Dict[str, Any], ttl: int):
+        self._local[key] = (time.monotonic() + ttl, data)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return (await self.get_many([key]))[key]
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Look up several keys: L1 first, remaining misses in one Redis MGET."""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing: List[str] = []
+        for key in keys:
+            if key in results:
+                continue
+            data = self._get_local(key)
+            results[key] = data
+            if data is not None:
+                self.stats['l1_hits'] += 1
+            else:
+                missing.append(key)
+        
+        client = self._get_redis() if missing else None
+        if client is not None:
+            try:
+                values = await client.mget(missing)
+                self._redis_ok()
+            except Exception as e:
+                self._redis_failed(e)
+                values = [None] * len(missing)
+            for key, raw in zip(missing, values):
+                if raw is None:
+                    continue
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    continue
+                results[key] = data
+                self.stats['l2_hits'] += 1
+                self._set_local(key, data, self.ttl)
+        
+        self.stats['misses'] += sum(1 for key in missing if results[key] is None)
+        return results
+    
+    async def set(self, key: str, data: Dict[str, Any], ttl: Optional[int] = None):
+        await self.set_many({key: data}, ttl)
+    
+    async def set_many(self, items: Dict[str, Dict[str, Any]], ttl: Optional[int] = None):
+        """Store entries in L1 and write them to Redis in one pipeline."""
+        ttl = ttl or self.ttl
+        for key, data in items.items():
+            self._set_local(key, data, ttl)
+        
+        client = self._get_redis() if items else None
+        if client is None:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, data in items.items():
+                    pipe.setex(key, ttl, json.dumps(data))
+                await pipe.execute()
+            self._redis_ok()
+        except Exception as e:
+            self._redis_failed(e)
+    
+    def clear_local(self):
+        self._local.clear()
+    
+    async def close(self):
+        if self._redis is not None:
+            close = getattr(self._redis, "aclose", None) or self._redis.close
+            await close()
+            self._redis = None
 
 class AsyncLLMClient:
     """Async LLM client with caching and connection pooling."""
     
-    def __init__(self, api_key: Optional[str] = None, cache_ttl: int = 3600):
+    def __init__(self, api_key: Optional[str] = None, cache_ttl: int = 3600,
+                 base_url: str = "https://api.openai.com/v1",
+                 redis_url: Optional[str] = "redis://localhost:6379/0",
+                 local_cache_size: int = 1024,
+                 max_concurrency: int = 5, min_concurrency: int = 1,
+                 max_retries: int = 3, backoff_base: float = 0.5,
+                 compact_context: bool = True, context_token_budget: Optional[int] = None,
+                 monitor: Optional["LLMPerformanceMonitor"] = None):
         self.api_key = api_key
         self.cache_ttl = cache_ttl
+        self.base_url = base_url.rstrip('/')
         self.session: Optional[aiohttp.ClientSession] = None
-        self.redis_client: Optional[redis.Redis] = None
+        self.cache = TwoTierResponseCache(redis_url=redis_url, ttl=cache_ttl, max_entries=local_cache_size)
         self.connection_pool = []
         self.max_connections = 10
-        self._setup_redis()
-    
-    def _setup_redis(self):
-        """Setup Redis connection for caching."""
-        try:
-            self.redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
-            self.redis_client.ping()
-            logger.info("Redis cache connected successfully")
-        except Exception as e:
-            logger.warning(f"Redis cache not available: {e}")
-            self.redis_client = None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.limiter = AdaptiveConcurrencyLimiter(max_concurrency, min_concurrency)
+        # Stable system prefixes on every request; conversation content only changes over the budget
+        self.compactor = ContextCompactor(context_token_budget) if compact_context else None
+        # Single-flight: identical requests in progress share one upstream call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.upstream_calls = 0
+        self.coalesced_requests = 0
+        self.monitor = monitor if monitor is not None else _llm_performance_monitor
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create HTTP session with connection pooling."""
@@ -77,31 +318,24 @@ class AsyncLLMClient:
     
     def _generate_cache_key(self, request: LLMRequest) -> str:
         """Generate cache key for request."""
-        request_data = {
-            'prompt': request.prompt,
-            'model': request.model,
-            'max_tokens': request.max_tokens,
-            'temperature': request.temperature
-        }
-        request_str = json.dumps(request_data, sort_keys=True)
-        return hashlib.md5(request_str.encode()).hexdigest()
+        return canonical_cache_key(request)
+    
+    @staticmethod
+    def _response_from_cache(data: Dict[str, Any]) -> LLMResponse:
+        return LLMResponse(
+            content=data['content'],
+            model=data['model'],
+            usage=data['usage'],
+            response_time=0.0,
+            cached=True
+        )
     
     async def _get_cached_response(self, cache_key: str) -> Optional[LLMResponse]:
         """Get cached response if available."""
-        if not self.redis_client:
-            return None
-        
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                data = json.loads(cached_data)
-                return LLMResponse(
-                    content=data['content'],
-                    model=data['model'],
-                    usage=data['usage'],
-                    response_time=0.0,
-                    cached=True
-                )
+            data = await self.cache.get(cache_key)
+            if data:
+                return self._response_from_cache(data)
         except Exception as e:
             logger.warning(f"Cache retrieval error: {e}")
         
@@ -109,9 +343,6 @@ class AsyncLLMClient:
     
     async def _cache_response(self, cache_key: str, response: LLMResponse):
         """Cache response for future use."""
-        if not self.redis_client:
-            return
-        
         try:
             cache_data = {
                 'content': response.content,
@@ -119,55 +350,99 @@ class AsyncLLMClient:
                 'usage': response.usage,
                 'timestamp': datetime.now().isoformat()
             }
-            self.redis_client.setex(
-                cache_key,
-                self.cache_ttl,
-                json.dumps(cache_data)
-            )
+            await self.cache.set(cache_key, cache_data)
         except Exception as e:
             logger.warning(f"Cache storage error: {e}")
     
+    def _record(self, request: LLMRequest, response: LLMResponse, response_time: float):
+        usage = response.usage if isinstance(response.usage, dict) else {}
+        self.monitor.record_request(
+            response_time,
+            cached=response.cached,
+            error=response.error is not None,
+            model=request.model,
+            agent=request.agent,
+            prompt_tokens=int(usage.get('prompt_tokens') or 0),
+            completion_tokens=int(usage.get('completion_tokens') or 0)
+        )
+    
+    def _prepare_request(self, request: LLMRequest) -> LLMRequest:
+        """Compact the request context before it is keyed and sent."""
+        if self.compactor is None:
+            return request
+        messages = request.get_messages()
+        compacted = self.compactor.compact(messages)
+        if compacted == messages:
+            return request
+        return replace(request, messages=compacted)
+    
     async def ask_async(self, request: LLMRequest) -> LLMResponse:
         """Send async LLM request with caching."""
         start_time = time.time()
+        request = self._prepare_request(request)
         
         # Check cache first
         cache_key = self._generate_cache_key(request)
         cached_response = await self._get_cached_response(cache_key)
         if cached_response:
-            logger.info(f"Cache hit for request: {cache_key[:8]}...")
+            logger.info(f"Cache hit for request: {cache_key[len(CACHE_KEY_PREFIX):][:8]}...")
+            self._record(request, cached_response, time.time() - start_time)
             return cached_response
         
-        # Make actual request
+        return await self._ask_uncached(request, cache_key)
+    
+    async def _ask_uncached(self, request: LLMRequest, cache_key: str) -> LLMResponse:
+        # Join an identical request that is already in flight
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self.coalesced_requests += 1
+            try:
+                response = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading request was cancelled; issue our own
+                return await self.ask_async(request)
+            return replace(response, coalesced=True)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
-            session = await self._get_session()
-            
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'model': request.model,
-                'messages': [{'role': 'user', 'content': request.prompt}],
-                'max_tokens': request.max_tokens,
-                'temperature': request.temperature
-            }
-            
-            async with session.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    content = data['choices'][0]['message']['content']
-                    usage = data['usage']
-                    
+            response = await self._request_upstream(request, cache_key)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved: the leader re-raises it, so an unawaited future must not log it again
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
+    
+    async def _request_upstream(self, request: LLMRequest, cache_key: str) -> LLMResponse:
+        response = await self._call_upstream(request, cache_key)
+        self._record(request, response, response.response_time)
+        return response
+    
+    async def _call_upstream(self, request: LLMRequest, cache_key: str) -> LLMResponse:
+        """Make the actual request within the concurrency limit, backing off on overload."""
+        start_time = time.time()
+        
+        try:
+            for attempt in range(self.max_retries + 1):
+                async with self.limiter:
+                    self.upstream_calls += 1
+                    status, data, retry_after = await self._post_completion(request)
+                
+                if status == 200:
+                    self.limiter.on_success()
                     llm_response = LLMResponse(
-                        content=content,
+                        content=data['choices'][0]['message']['content'],
                         model=request.model,
-                        usage=usage,
+                        usage=data.get('usage', {}),
                         response_time=time.time() - start_time
                     )
                     
@@ -176,16 +451,22 @@ class AsyncLLMClient:
                     
                     logger.info(f"LLM request completed in {llm_response.response_time:.2f}s")
                     return llm_response
-                else:
-                    error_text = await response.text()
-                    logger.error(f"LLM API error: {response.status} - {error_text}")
-                    return LLMResponse(
-                        content="",
-                        model=request.model,
-                        usage={},
-                        response_time=time.time() - start_time,
-                        error=f"API error: {response.status}"
-                    )
+                
+                if status in RETRYABLE_STATUS:
+                    self.limiter.on_throttle()
+                    if attempt < self.max_retries:
+                        delay = retry_after if retry_after is not None else self.backoff_base * (2 ** attempt)
+                        await asyncio.sleep(delay)
+                        continue
+                
+                logger.error(f"LLM API error: {status} - {data}")
+                return LLMResponse(
+                    content="",
+                    model=request.model,
+                    usage={},
+                    response_time=time.time() - start_time,
+                    error=f"API error: {status}"
+                )
         
         except asyncio.TimeoutError:
             logger.error("LLM request timeout")
@@ -206,18 +487,84 @@ class AsyncLLMClient:
                 error=str(e)
             )
     
+    async def _post_completion(self, request: LLMRequest):
+        """POST one chat completion; returns (status, body, retry_after seconds)."""
+        session = await self._get_session()
+        
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        payload = {
+            'model': request.model,
+            'messages': request.get_messages(),
+            'max_tokens': request.max_tokens,
+            'temperature': request.temperature
+        }
+        if request.tools:
+            payload['tools'] = request.tools
+        
+        async with session.post(
+            f'{self.base_url}/chat/completions',
+            headers=headers,
+            json=payload
+        ) as response:
+            if response.status == 200:
+                return response.status, await response.json(), None
+            
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                pass
+            return response.status, await response.text(), retry_after
+    
     async def ask_batch(self, requests: List[LLMRequest]) -> List[LLMResponse]:
-        """Send multiple LLM requests concurrently."""
-        tasks = [self.ask_async(request) for request in requests]
+        """
+        Send multiple LLM requests concurrently.
+        
+        Cached responses for the whole batch are fetched in one lookup, upstream
+        calls are bounded by the adaptive concurrency limiter and identical
+        prompts in the batch share a single call.
+        """
+        start_time = time.time()
+        requests = [self._prepare_request(request) for request in requests]
+        keys = [self._generate_cache_key(request) for request in requests]
+        try:
+            cached = await self.cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Cache retrieval error: {e}")
+            cached = {}
+        lookup_time = time.time() - start_time
+        
+        async def resolve(request: LLMRequest, cache_key: str) -> LLMResponse:
+            data = cached.get(cache_key)
+            if data:
+                response = self._response_from_cache(data)
+                self._record(request, response, lookup_time)
+                return response
+            return await self._ask_uncached(request, cache_key)
+        
+        tasks = [resolve(request, key) for request, key in zip(requests, keys)]
         return await asyncio.gather(*tasks, return_exceptions=True)
     
+    def get_stats(self) -> Dict[str, Any]:
+        """Get concurrency and coalescing statistics."""
+        return {
+            'upstream_calls': self.upstream_calls,
+            'coalesced_requests': self.coalesced_requests,
+            'in_flight_keys': len(self._inflight),
+            'concurrency': self.limiter.get_stats(),
+            'cache': dict(self.cache.stats)
+        }
+    
     async def close(self):
         """Close HTTP session and connections."""
         if self.session and not self.session.closed:
             await self.session.close()
         
-        if self.redis_client:
-            self.redis_client.close()
+        await self.cache.close()
 
 def async_llm_call(func):
     """Decorator to convert sync LLM calls to async."""
@@ -250,48 +597,232 @@ async def ask_openai_async(prompt: str, **kwargs) -> str:
     return response.content
 
 # Performance monitoring
-class LLMPerformanceMonitor:
-    """Monitor LLM performance metrics."""
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmic buckets.
+    
+    Bucket ``i`` holds values in ``(min_value * g**(i-1), min_value * g**i]``
+    with ``g = 2 ** (1 / buckets_per_octave)``; bucket 0 collects everything up
+    to ``min_value`` and the last bucket everything above ``max_value``. With
+    the defaults (1 ms .. 10 min, 4 buckets per octave) that is 79 counters and
+    percentiles are accurate to within ~19%.
+    """
+    
+    def __init__(self, min_value: float = 0.001, max_value: float = 600.0,
+                 buckets_per_octave: int = 4):
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_growth = math.log(2) / buckets_per_octave
+        self._bucket_count = math.ceil(math.log(max_value / min_value) / self._log_growth)
+        self.counts = [0] * (self._bucket_count + 2)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+    
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        index = math.ceil(math.log(value / self.min_value) / self._log_growth)
+        return min(index, self._bucket_count + 1)
+    
+    def upper_bound(self, index: int) -> float:
+        if index > self._bucket_count:
+            return math.inf
+        return self.min_value * math.exp(index * self._log_growth)
+    
+    def _json_bound(self, index: int) -> Any:
+        bound = self.upper_bound(index)
+        return "+Inf" if math.isinf(bound) else bound
+    
+    def record(self, value: float):
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, clamped to the observed range."""
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= rank:
+                return max(self.min, min(self.upper_bound(index), self.max))
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(0.50),
+            'p90': self.percentile(0.90),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            # Non-empty buckets only, as (upper bound, count) pairs; the
+            # overflow bound is "+Inf" so the dict stays valid JSON
+            'buckets': [[self._json_bound(i), n] for i, n in enumerate(self.counts) if n],
+        }
+
+class LLMMetrics:
+    """Counters and histograms for one slice of traffic (all, one model or one agent)."""
     
     def __init__(self):
-        self.request_count = 0
+        self.requests = 0
+        self.errors = 0
         self.cache_hits = 0
-        self.total_response_time = 0.0
-        self.error_count = 0
-        self.start_time = time.time()
-    
-    def record_request(self, response_time: float, cached: bool = False, error: bool = False):
-        """Record request metrics."""
-        self.request_count += 1
-        self.total_response_time += response_time
-        
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.upstream_time = 0.0
+        self.latency = LatencyHistogram()
+        self.time_to_first_token = LatencyHistogram()
+    
+    def record(self, response_time: float, cached: bool, error: bool,
+               prompt_tokens: int, completion_tokens: int, ttft: Optional[float]):
+        self.requests += 1
+        self.latency.record(response_time)
+        if error:
+            self.errors += 1
         if cached:
             self.cache_hits += 1
-        
-        if error:
-            self.error_count += 1
+        else:
+            self.upstream_time += response_time
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        if ttft is not None:
+            self.time_to_first_token.record(ttft)
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get performance statistics."""
-        uptime = time.time() - self.start_time
-        avg_response_time = self.total_response_time / max(self.request_count, 1)
-        cache_hit_rate = self.cache_hits / max(self.request_count, 1) * 100
-        error_rate = self.error_count / max(self.request_count, 1) * 100
-        
+    def to_dict(self) -> Dict[str, Any]:
+        requests = max(self.requests, 1)
         return {
-            'total_requests': self.request_count,
+            'requests': self.requests,
+            'errors': self.errors,
+            'error_rate': self.errors / requests,
             'cache_hits': self.cache_hits,
-            'cache_hit_rate': cache_hit_rate,
-            'avg_response_time': avg_response_time,
-            'error_count': self.error_count,
-            'error_rate': error_rate,
-            'uptime': uptime,
-            'requests_per_second': self.request_count / max(uptime, 1)
+            'cache_misses': self.requests - self.cache_hits,
+            'cache_hit_ratio': self.cache_hits / requests,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            # Generation throughput while waiting on the provider
+            'completion_tokens_per_second': self.completion_tokens / self.upstream_time if self.upstream_time else 0.0,
+            'latency': self.latency.to_dict(),
+            'time_to_first_token': self.time_to_first_token.to_dict(),
         }
 
+class LLMPerformanceMonitor:
+    """
+    Monitor LLM performance metrics.
+    
+    Keeps totals plus a per-model and per-agent breakdown in fixed memory: no
+    individual samples are stored, and at most ``max_labels`` distinct models
+    or agents are tracked before new ones are folded into ``"other"``.
+    """
+    
+    OTHER_LABEL = "other"
+    
+    def __init__(self, max_labels: int = 100):
+        self.max_labels = max_labels
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.request_count = 0
+            self.cache_hits = 0
+            self.total_response_time = 0.0
+            self.error_count = 0
+            self.start_time = time.time()
+            self.totals = LLMMetrics()
+            self.models: Dict[str, LLMMetrics] = {}
+            self.agents: Dict[str, LLMMetrics] = {}
+    
+    def _slice(self, slices: Dict[str, LLMMetrics], label: str) -> LLMMetrics:
+        metrics = slices.get(label)
+        if metrics is None:
+            if len(slices) >= self.max_labels:
+                label = self.OTHER_LABEL
+                metrics = slices.get(label)
+            if metrics is None:
+                metrics = slices[label] = LLMMetrics()
+        return metrics
+    
+    def record_request(self, response_time: float, cached: bool = False, error: bool = False,
+                       model: Optional[str] = None, agent: Optional[str] = None,
+                       prompt_tokens: int = 0, completion_tokens: int = 0,
+                       ttft: Optional[float] = None):
+        """Record request metrics; ``ttft`` is the time to the first streamed token."""
+        with self._lock:
+            self.request_count += 1
+            self.total_response_time += response_time
+            
+            if cached:
+                self.cache_hits += 1
+            
+            if error:
+                self.error_count += 1
+            
+            targets = [self.totals]
+            if model:
+                targets.append(self._slice(self.models, model))
+            if agent:
+                targets.append(self._slice(self.agents, agent))
+            for metrics in targets:
+                metrics.record(response_time, cached, error, prompt_tokens, completion_tokens, ttft)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get performance statistics."""
+        with self._lock:
+            uptime = time.time() - self.start_time
+            avg_response_time = self.total_response_time / max(self.request_count, 1)
+            cache_hit_rate = self.cache_hits / max(self.request_count, 1) * 100
+            error_rate = self.error_count / max(self.request_count, 1) * 100
+            latency = self.totals.latency
+            
+            return {
+                'total_requests': self.request_count,
+                'cache_hits': self.cache_hits,
+                'cache_misses': self.request_count - self.cache_hits,
+                'cache_hit_rate': cache_hit_rate,
+                'avg_response_time': avg_response_time,
+                'p50_response_time': latency.percentile(0.50),
+                'p95_response_time': latency.percentile(0.95),
+                'p99_response_time': latency.percentile(0.99),
+                'p95_time_to_first_token': self.totals.time_to_first_token.percentile(0.95),
+                'error_count': self.error_count,
+                'error_rate': error_rate,
+                'uptime': uptime,
+                'requests_per_second': self.request_count / max(uptime, 1),
+                'tokens_per_second': (self.totals.prompt_tokens + self.totals.completion_tokens) / max(uptime, 1)
+            }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serialisable copy of all totals, histograms and per-model/per-agent slices."""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime': time.time() - self.start_time,
+                'totals': self.totals.to_dict(),
+                'models': {label: metrics.to_dict() for label, metrics in self.models.items()},
+                'agents': {label: metrics.to_dict() for label, metrics in self.agents.items()},
+            }
+
 # Global performance monitor
 _llm_performance_monitor = LLMPerformanceMonitor()
 
+def get_llm_performance_monitor() -> LLMPerformanceMonitor:
+    """Get the global LLM performance monitor."""
+    return _llm_performance_monitor
+
 def get_llm_performance_stats() -> Dict[str, Any]:
     """Get LLM performance statistics."""
-    return _llm_performance_monitor.get_stats() 
\ No newline at end of file
+    return _llm_performance_monitor.get_stats()
+
+def get_llm_performance_snapshot() -> Dict[str, Any]:
+    """Get totals, latency histograms and per-model/per-agent breakdown."""
+    return _llm_performance_monitor.snapshot()
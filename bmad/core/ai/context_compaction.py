@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Context Compaction for LLM Requests
+Keeps system prompt prefixes byte-stable, removes repeated context and enforces a token budget
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Optional exact tokenizer; falls back to a character-based estimate
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+REPEATED_MARKER = "[... repeated context omitted ...]"
+_SECTION_SPLIT = re.compile(r"\n\s*\n")
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    # Loaded on first use: tiktoken may need to fetch its vocabulary
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.debug("tiktoken unavailable, using character estimate: %s", e)
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of a text: exact with tiktoken, otherwise ~4 characters per token."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(_content(m)) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def _content(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    return content if isinstance(content, str) else ""
+
+
+def _normalize(text: str) -> str:
+    # Stable bytes for identical prefixes: unified newlines, no trailing whitespace
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+@dataclass
+class CompactionStats:
+    """Running totals of what compaction saved."""
+    requests: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    sections_deduplicated: int = 0
+    messages_dropped: int = 0
+    messages_truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class ContextCompactor:
+    """
+    Shrinks chat messages while keeping prompt prefixes stable.
+
+    On every request, without reordering messages:
+
+    1. System messages are normalized (unified newlines, no trailing
+       whitespace), so identical system prompts are byte-identical and
+       provider-side prefix caching can hit.
+    2. Context sections (blank-line separated blocks of at least
+       ``min_section_chars``) that exactly repeat a section of an earlier
+       system message are removed from later user/assistant messages.
+
+    User and assistant content is otherwise left as sent. Only over
+    ``token_budget``, in this order until the estimate fits:
+
+    3. Sections repeated anywhere earlier in the conversation are removed from
+       later user/assistant messages; the first copy is kept, so a message
+       only depends on the messages before it. Messages are never dropped
+       here, so role alternation stays.
+    4. The oldest conversation turns (a user message and the replies up to
+       the next user message) are dropped.
+    5. The longest earlier message, and as a last resort the final one, is
+       cut in the middle.
+
+    System messages are never deduplicated or dropped; the final message is
+    only cut as a last resort.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, min_section_chars: int = 200):
+        self.token_budget = token_budget
+        self.min_section_chars = min_section_chars
+        self.stats = CompactionStats()
+
+    def compact(self, messages: List[Dict[str, Any]], token_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+        if not messages:
+            return messages
+        budget = token_budget if token_budget is not None else self.token_budget
+
+        compacted = self._deduplicate(self._normalize_system(messages), across_conversation=False)
+        if budget and estimate_message_tokens(compacted) > budget:
+            compacted = self._deduplicate(compacted, across_conversation=True)
+            if estimate_message_tokens(compacted) > budget:
+                compacted = self._fit_budget(compacted, budget)
+        if compacted == messages:
+            return messages
+
+        before = estimate_message_tokens(messages)
+        after = estimate_message_tokens(compacted)
+        self.stats.requests += 1
+        self.stats.tokens_before += before
+        self.stats.tokens_after += after
+        logger.debug("Context compacted from %d to %d tokens (budget %s)", before, after, budget)
+        return compacted
+
+    def _normalize_system(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        result = list(messages)
+        for index, message in enumerate(messages):
+            content = message.get("content")
+            if message.get("role") == "system" and isinstance(content, str):
+                normalized = _normalize(content)
+                if normalized != content:
+                    result[index] = {**message, "content": normalized}
+        return result
+
+    def _deduplicate(self, messages: List[Dict[str, Any]], across_conversation: bool) -> List[Dict[str, Any]]:
+        # Without a budget only exact copies of system context go; over it, whitespace-insensitive repeats
+        section_key = _normalize if across_conversation else str.strip
+        last = len(messages) - 1
+        # Oldest first: the first copy survives, so earlier messages never change
+        seen_sections = set()
+        result = list(messages)
+
+        for index, message in enumerate(messages[:last]):
+            content = message.get("content")
+            if not isinstance(content, str):
+                continue
+
+            sections = _SECTION_SPLIT.split(content)
+            if message.get("role") == "system":
+                seen_sections.update(key for key in map(section_key, sections) if len(key) >= self.min_section_chars)
+                continue
+
+            kept = []
+            for section in sections:
+                key = section_key(section)
+                if len(key) >= self.min_section_chars:
+                    if key in seen_sections:
+                        self.stats.sections_deduplicated += 1
+                        continue
+                    if across_conversation:
+                        seen_sections.add(key)
+                kept.append(section)
+
+            if len(kept) != len(sections):
+                result[index] = {**message, "content": "\n\n".join(kept) if kept else REPEATED_MARKER}
+        return result
+
+    def _fit_budget(self, messages: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+        messages = list(messages)
+        total = estimate_message_tokens(messages)
+
+        # Drop the oldest conversation turn (up to the next user message) first
+        while total > budget:
+            start = next((i for i in range(len(messages) - 1) if messages[i].get("role") != "system"), None)
+            if start is None:
+                break
+            end = start + 1
+            while end < len(messages) - 1 and messages[end].get("role") not in ("user", "system"):
+                end += 1
+            total -= estimate_message_tokens(messages[start:end])
+            self.stats.messages_dropped += end - start
+            del messages[start:end]
+
+        # Then cut messages in the middle: the longest first, the final message last
+        while total > budget:
+            earlier = [i for i in range(len(messages) - 1) if messages[i].get("role") != "system"]
+            earlier.sort(key=lambda i: estimate_tokens(_content(messages[i])), reverse=True)
+            for index in earlier + [len(messages) - 1]:
+                cut = _cut(messages[index], total - budget)
+                if cut is not None:
+                    messages[index] = cut
+                    self.stats.messages_truncated += 1
+                    break
+            else:
+                break
+            total = estimate_message_tokens(messages)
+        return messages
+
+
+def _cut(message: Dict[str, Any], excess: int) -> Optional[Dict[str, Any]]:
+    """The message cut in the middle by about ``excess`` tokens, or None if it cannot shrink."""
+    content = _content(message)
+    tokens = estimate_tokens(content)
+    keep_tokens = max(tokens - excess - estimate_tokens(TRUNCATION_MARKER), 0)
+    truncated = _truncate_middle(content, keep_tokens)
+    if not content or estimate_tokens(truncated) >= tokens:
+        return None
+    return {**message, "content": truncated}
+
+
+def _truncate_middle(text: str, keep_tokens: int) -> str:
+    """Keep the head and tail of a text within roughly ``keep_tokens`` tokens."""
+    ratio = keep_tokens / max(estimate_tokens(text), 1)
+    keep_chars = max(int(len(text) * ratio), 0)
+    head = keep_chars // 2
+    tail = keep_chars - head
+    return text[:head] + TRUNCATION_MARKER + (text[-tail:] if tail else "")
+
+
+# Shared default instance
+_default_compactor = ContextCompactor()
+
+
+def compact_messages(messages: List[Dict[str, Any]], token_budget: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Compact chat messages with the shared compactor."""
+    return _default_compactor.compact(messages, token_budget)
+
+
+def get_compaction_stats() -> CompactionStats:
+    return _default_compactor.stats
@@ -7,15 +7,25 @@ Centrale message bus voor inter-agent communicatie
 from .message_bus import (
     MessageBus,
     get_message_bus,
+    close_message_bus,
     publish_event,
     subscribe_to_event
 )
 
+from .dispatcher import SubscriberDispatcher, OverflowPolicy
+from .event_history import EventHistory
+from .event_log import SegmentedEventLog
+from .topics import TopicTrie, is_topic_pattern, topics_for_event_type
+from .redis_streams import RedisStreamsTransport
+
 from .events import (
     EventTypes,
     get_events_by_category,
     get_all_event_types,
     is_valid_event_type,
+    get_event_categories,
+    intern_event_type,
+    VALID_EVENT_TYPES,
     EVENT_CATEGORIES
 )
 
@@ -28,14 +38,26 @@ __all__ = [
     # Message bus core
     "MessageBus",
     "get_message_bus",
+    "close_message_bus",
     "publish_event",
     "subscribe_to_event",
+    "SubscriberDispatcher",
+    "OverflowPolicy",
+    "EventHistory",
+    "SegmentedEventLog",
+    "TopicTrie",
+    "is_topic_pattern",
+    "topics_for_event_type",
+    "RedisStreamsTransport",
     
     # Events
     "EventTypes",
     "get_events_by_category",
     "get_all_event_types",
     "is_valid_event_type",
+    "get_event_categories",
+    "intern_event_type",
+    "VALID_EVENT_TYPES",
     "EVENT_CATEGORIES",
     
     # Agent integration
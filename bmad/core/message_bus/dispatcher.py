@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+BMAD Subscriber Dispatcher
+Geïsoleerde, concurrente aflevering van events aan subscribers met backpressure
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What to do when a subscriber queue is full"""
+    BLOCK = "block"              # publisher waits for room (backpressure)
+    DROP_OLDEST = "drop_oldest"  # discard the oldest queued event
+    DROP_NEWEST = "drop_newest"  # discard the incoming event
+
+
+@dataclass
+class SubscriberMetrics:
+    """Delivery metrics for a single subscriber"""
+    enqueued: int = 0
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+    def to_dict(self, queue_depth: int) -> Dict[str, Any]:
+        handled = self.delivered + self.failed
+        return {
+            "queue_depth": queue_depth,
+            "enqueued": self.enqueued,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "avg_latency": self.total_latency / handled if handled else 0.0,
+            "max_latency": self.max_latency,
+            "avg_lag": self.total_lag / handled if handled else 0.0,
+            "max_lag": self.max_lag,
+        }
+
+
+class _SubscriberQueue:
+    """Bounded queue plus worker tasks serving one subscriber callback"""
+
+    def __init__(self, callback: Callable, max_queue_size: int, concurrency: int,
+                 overflow_policy: OverflowPolicy):
+        self.callback = callback
+        self.concurrency = max(1, concurrency)
+        self.overflow_policy = overflow_policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.metrics = SubscriberMetrics()
+        self.workers: List[asyncio.Task] = []
+        self._is_async = asyncio.iscoroutinefunction(callback)
+
+    def start(self) -> None:
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def put(self, event: Any) -> None:
+        item = (time.perf_counter(), event)
+        if self.overflow_policy is OverflowPolicy.BLOCK:
+            await self.queue.put(item)
+        elif self.queue.full() and self.overflow_policy is OverflowPolicy.DROP_NEWEST:
+            self.metrics.dropped += 1
+            return
+        else:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.metrics.dropped += 1
+            self.queue.put_nowait(item)
+        self.metrics.enqueued += 1
+
+    async def _worker(self) -> None:
+        while True:
+            enqueued_at, event = await self.queue.get()
+            started = time.perf_counter()
+            lag = started - enqueued_at
+            try:
+                if self._is_async:
+                    await self.callback(event)
+                else:
+                    self.callback(event)
+                self.metrics.delivered += 1
+            except Exception as e:
+                self.metrics.failed += 1
+                logger.error(f"❌ Subscriber callback failed: {e}")
+            finally:
+                latency = time.perf_counter() - started
+                self.metrics.total_latency += latency
+                self.metrics.max_latency = max(self.metrics.max_latency, latency)
+                self.metrics.total_lag += lag
+                self.metrics.max_lag = max(self.metrics.max_lag, lag)
+                self.queue.task_done()
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+
+class SubscriberDispatcher:
+    """
+    Dispatches events to subscribers through per-subscriber bounded queues.
+
+    Every subscriber callback gets its own queue and worker task(s), so a slow
+    handler only delays its own events. Publishing only enqueues, which makes
+    publish latency independent of handler cost; the overflow policy decides
+    whether a full queue applies backpressure or drops events.
+    """
+
+    def __init__(self, max_queue_size: int = 1000, concurrency: int = 1,
+                 overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK):
+        self.max_queue_size = max_queue_size
+        self.concurrency = concurrency
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self._queues: Dict[Callable, _SubscriberQueue] = {}
+        self._overrides: Dict[Callable, Dict[str, Any]] = {}
+
+    def configure_subscriber(self, callback: Callable, max_queue_size: Optional[int] = None,
+                             concurrency: Optional[int] = None,
+                             overflow_policy: Optional[OverflowPolicy] = None) -> None:
+        """
+        Override dispatch settings for one subscriber
+
+        Takes effect the next time the subscriber's queue is created.
+        """
+        overrides = {
+            "max_queue_size": max_queue_size,
+            "concurrency": concurrency,
+            "overflow_policy": OverflowPolicy(overflow_policy) if overflow_policy else None,
+        }
+        self._overrides[callback] = {k: v for k, v in overrides.items() if v is not None}
+
+    async def dispatch(self, event: Any, callbacks: List[Callable]) -> None:
+        """Enqueue an event for each of the given subscribers"""
+        for callback in callbacks:
+            await self._get_queue(callback).put(event)
+
+    async def remove(self, callback: Callable) -> None:
+        """Stop the worker(s) of a subscriber and discard its queue"""
+        subscriber = self._queues.pop(callback, None)
+        self._overrides.pop(callback, None)
+        if subscriber is not None:
+            await subscriber.stop()
+
+    async def drain(self) -> None:
+        """Wait until every queued event has been handled"""
+        await asyncio.gather(*(s.queue.join() for s in list(self._queues.values())))
+
+    async def shutdown(self, drain: bool = True) -> None:
+        """Stop all workers, optionally after draining the queues"""
+        if drain:
+            await self.drain()
+        for callback in list(self._queues):
+            await self.remove(callback)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-subscriber lag and latency metrics"""
+        return {
+            _subscriber_name(callback): subscriber.metrics.to_dict(subscriber.queue.qsize())
+            for callback, subscriber in self._queues.items()
+        }
+
+    def _get_queue(self, callback: Callable) -> _SubscriberQueue:
+        subscriber = self._queues.get(callback)
+        if subscriber is None:
+            settings = {
+                "max_queue_size": self.max_queue_size,
+                "concurrency": self.concurrency,
+                "overflow_policy": self.overflow_policy,
+                **self._overrides.get(callback, {}),
+            }
+            subscriber = _SubscriberQueue(callback, **settings)
+            subscriber.start()
+            self._queues[callback] = subscriber
+        return subscriber
+
+
+def _subscriber_name(callback: Callable) -> str:
+    name = getattr(callback, "__qualname__", None) or repr(callback)
+    return f"{name}@{id(callback):x}"
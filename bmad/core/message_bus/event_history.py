@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+BMAD Event History
+Begrensde, geïndexeerde in-memory event history voor de message bus
+"""
+
+import bisect
+import heapq
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+
+class EventHistory:
+    """
+    Fixed-capacity ring buffer of events with secondary indexes.
+
+    Events are stored by sequence number in a preallocated buffer; the oldest
+    event is overwritten once ``maxlen`` is reached, so memory stays flat under
+    sustained load. Indexes by event type, source agent and time bucket hold
+    ascending sequence numbers and are trimmed in O(1) on eviction, which keeps
+    filtered queries proportional to the number of matching events rather than
+    the size of the history.
+
+    The class also behaves like a read-only sequence (``len``, iteration,
+    indexing, slicing) for callers that treated the history as a list.
+    """
+
+    def __init__(self, maxlen: int = 10000, bucket_seconds: int = 60):
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self.maxlen = maxlen
+        self.bucket_seconds = bucket_seconds
+        self._buffer: List[Any] = [None] * maxlen
+        self._next_seq = 0
+        self._by_type: Dict[str, Deque[int]] = {}
+        self._by_source: Dict[str, Deque[int]] = {}
+        self._by_bucket: Dict[int, Deque[int]] = {}
+        # Sorted bucket keys, so time ranges are found by bisection
+        self._bucket_keys: List[int] = []
+
+    # ------------------------------------------------------------------ #
+    # Mutation
+    # ------------------------------------------------------------------ #
+
+    def append(self, event: Any) -> int:
+        """Add an event, evicting the oldest one when full; returns its sequence number"""
+        seq = self._next_seq
+        if seq >= self.maxlen:
+            self._evict(self._buffer[seq % self.maxlen])
+
+        self._buffer[seq % self.maxlen] = event
+        self._index(self._by_type, event.event_type, seq)
+        self._index(self._by_source, event.source_agent, seq)
+        bucket = self._bucket(event.timestamp)
+        if bucket not in self._by_bucket:
+            bisect.insort(self._bucket_keys, bucket)
+        self._index(self._by_bucket, bucket, seq)
+        self._next_seq += 1
+        return seq
+
+    def extend(self, events: Iterable[Any]) -> None:
+        for event in events:
+            self.append(event)
+
+    def clear(self) -> None:
+        self._buffer = [None] * self.maxlen
+        self._next_seq = 0
+        self._by_type.clear()
+        self._by_source.clear()
+        self._by_bucket.clear()
+        self._bucket_keys.clear()
+
+    def _evict(self, event: Any) -> None:
+        # The evicted event is always the oldest, so it sits at the left of every index
+        self._unindex(self._by_type, event.event_type)
+        self._unindex(self._by_source, event.source_agent)
+        bucket = self._bucket(event.timestamp)
+        self._unindex(self._by_bucket, bucket)
+        if bucket not in self._by_bucket:
+            position = bisect.bisect_left(self._bucket_keys, bucket)
+            if position < len(self._bucket_keys) and self._bucket_keys[position] == bucket:
+                del self._bucket_keys[position]
+
+    @staticmethod
+    def _index(index: Dict[Hashable, Deque[int]], key: Hashable, seq: int) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            bucket = index[key] = deque()
+        bucket.append(seq)
+
+    def _unindex(self, index: Dict[Hashable, Deque[int]], key: Hashable) -> None:
+        bucket = index.get(key)
+        if not bucket:
+            return
+        if bucket[0] == self._first_seq:
+            bucket.popleft()
+        if not bucket:
+            del index[key]
+
+    def _bucket(self, timestamp: datetime) -> int:
+        return int(timestamp.timestamp() // self.bucket_seconds)
+
+    # ------------------------------------------------------------------ #
+    # Queries
+    # ------------------------------------------------------------------ #
+
+    @property
+    def _first_seq(self) -> int:
+        return max(0, self._next_seq - self.maxlen)
+
+    @property
+    def total_appended(self) -> int:
+        """Number of events ever appended, including evicted ones"""
+        return self._next_seq
+
+    def query(self, event_type: Optional[str] = None, source_agent: Optional[str] = None,
+              since: Optional[datetime] = None, until: Optional[datetime] = None,
+              limit: Optional[int] = 100) -> List[Any]:
+        """
+        Get the most recent events matching all given filters
+
+        Args:
+            event_type: Filter by event type
+            source_agent: Filter by source agent
+            since: Only events at or after this time
+            until: Only events at or before this time
+            limit: Maximum number of events to return (None or <= 0 for all)
+
+        Returns:
+            List: Matching events in chronological order
+        """
+        # (estimated size, newest-first sequence numbers) per usable index
+        candidates: List[Tuple[int, Iterable[int]]] = []
+        if event_type is not None:
+            by_type = self._by_type.get(event_type, ())
+            candidates.append((len(by_type), reversed(by_type)))
+        if source_agent is not None:
+            by_source = self._by_source.get(source_agent, ())
+            candidates.append((len(by_source), reversed(by_source)))
+        if since is not None or until is not None:
+            candidates.append(self._time_candidates(since, until))
+
+        seqs: Iterable[int]
+        if not candidates:
+            seqs = range(self._next_seq - 1, self._first_seq - 1, -1)
+        else:
+            # Walk the most selective index lazily; the other filters are checked per event
+            seqs = min(candidates, key=lambda candidate: candidate[0])[1]
+
+        results: List[Any] = []
+        for seq in seqs:
+            event = self._buffer[seq % self.maxlen]
+            if event_type is not None and event.event_type != event_type:
+                continue
+            if source_agent is not None and event.source_agent != source_agent:
+                continue
+            if since is not None and event.timestamp < since:
+                continue
+            if until is not None and event.timestamp > until:
+                continue
+            results.append(event)
+            if limit and limit > 0 and len(results) >= limit:
+                break
+
+        results.reverse()
+        return results
+
+    def _time_candidates(self, since: Optional[datetime],
+                         until: Optional[datetime]) -> Tuple[int, Iterator[int]]:
+        """Size of the buckets in range and a lazy newest-first walk over them"""
+        low = bisect.bisect_left(self._bucket_keys, self._bucket(since)) if since is not None else 0
+        high = (bisect.bisect_right(self._bucket_keys, self._bucket(until)) if until is not None
+                else len(self._bucket_keys))
+        buckets = [self._by_bucket[key] for key in self._bucket_keys[low:high]]
+        size = sum(len(bucket) for bucket in buckets)
+        return size, heapq.merge(*(reversed(bucket) for bucket in buckets), reverse=True)
+
+    def count_by_type(self) -> Dict[str, int]:
+        return {key: len(seqs) for key, seqs in self._by_type.items()}
+
+    def count_by_source(self) -> Dict[str, int]:
+        return {key: len(seqs) for key, seqs in self._by_source.items()}
+
+    # ------------------------------------------------------------------ #
+    # Sequence protocol
+    # ------------------------------------------------------------------ #
+
+    def __len__(self) -> int:
+        return self._next_seq - self._first_seq
+
+    def __iter__(self) -> Iterator[Any]:
+        for seq in range(self._first_seq, self._next_seq):
+            yield self._buffer[seq % self.maxlen]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        size = len(self)
+        if item < 0:
+            item += size
+        if not 0 <= item < size:
+            raise IndexError("event history index out of range")
+        return self._buffer[(self._first_seq + item) % self.maxlen]
+
+    def __bool__(self) -> bool:
+        return self._next_seq > 0
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+BMAD Segmented Event Log
+Append-only, gesegmenteerde event log als persistence backend voor de message bus
+"""
+
+import bisect
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Index entry: offset, byte position, record length, timestamp, crc32(event_id)
+_INDEX_ENTRY = struct.Struct(">QQIdI")
+_SEGMENT_SUFFIX = ".log"
+_INDEX_SUFFIX = ".idx"
+
+
+@dataclass
+class IndexEntry:
+    """Single entry in a segment offset index"""
+    offset: int
+    position: int
+    length: int
+    timestamp: float
+    id_hash: int
+
+
+class _Segment:
+    """One segment of the log: a newline-delimited data file plus its offset index"""
+
+    def __init__(self, directory: Path, base_offset: int):
+        self.base_offset = base_offset
+        self.log_path = directory / f"{base_offset:020d}{_SEGMENT_SUFFIX}"
+        self.index_path = directory / f"{base_offset:020d}{_INDEX_SUFFIX}"
+        self.created_at = time.time()
+        self._entries: Optional[List[IndexEntry]] = None
+
+    @property
+    def size(self) -> int:
+        return self.log_path.stat().st_size if self.log_path.exists() else 0
+
+    def load_index(self) -> List[IndexEntry]:
+        """Load (and cache) the index entries of this segment"""
+        if self._entries is None:
+            entries: List[IndexEntry] = []
+            if self.index_path.exists():
+                raw = self.index_path.read_bytes()
+                usable = len(raw) - (len(raw) % _INDEX_ENTRY.size)
+                entries = [IndexEntry(*fields) for fields in _INDEX_ENTRY.iter_unpack(raw[:usable])]
+            self._entries = entries
+        return self._entries
+
+    def append_entry(self, entry: IndexEntry) -> None:
+        if self._entries is not None:
+            self._entries.append(entry)
+
+    @property
+    def next_offset(self) -> int:
+        return self.base_offset + len(self.load_index())
+
+
+class SegmentedEventLog:
+    """
+    Append-only event log split into size/time bounded segments.
+
+    Records are written as compact newline-delimited JSON. Every segment has a
+    binary offset index (offset, position, length, timestamp, event-id hash) so
+    replay from an offset, event id or timestamp only touches the segments and
+    records that are actually needed. Appends are O(1); fsync is batched by
+    record count and elapsed time.
+    """
+
+    def __init__(self, directory: str,
+                 segment_max_bytes: int = 16 * 1024 * 1024,
+                 segment_max_age: Optional[float] = 3600.0,
+                 fsync_every: int = 100,
+                 fsync_interval: float = 1.0,
+                 max_segments: Optional[int] = None):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = segment_max_age
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.max_segments = max_segments
+
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._log_file = None
+        self._index_file = None
+        self._active_size = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+
+    def _open(self) -> None:
+        """Discover existing segments and open the newest one for appending"""
+        base_offsets = sorted(
+            int(path.stem) for path in self.directory.glob(f"*{_SEGMENT_SUFFIX}")
+            if path.stem.isdigit()
+        )
+        self._segments = [_Segment(self.directory, base) for base in base_offsets]
+
+        if not self._segments:
+            self._segments.append(_Segment(self.directory, 0))
+        else:
+            active = self._segments[-1]
+            active.created_at = active.log_path.stat().st_mtime
+            self._recover(active)
+
+        self._open_active()
+        logger.info(f"✅ Event log opened at {self.directory} ({len(self._segments)} segment(s))")
+
+    def _recover(self, segment: _Segment) -> None:
+        """Truncate a torn tail left behind by an interrupted write"""
+        entries = segment.load_index()
+        valid_log_size = entries[-1].position + entries[-1].length if entries else 0
+        valid_index_size = len(entries) * _INDEX_ENTRY.size
+
+        if segment.log_path.exists() and segment.log_path.stat().st_size != valid_log_size:
+            logger.warning(f"Truncating torn tail of event log segment {segment.log_path.name}")
+            os.truncate(segment.log_path, valid_log_size)
+        if segment.index_path.exists() and segment.index_path.stat().st_size != valid_index_size:
+            os.truncate(segment.index_path, valid_index_size)
+
+    def _open_active(self) -> None:
+        active = self._segments[-1]
+        self._log_file = open(active.log_path, "ab")
+        self._index_file = open(active.index_path, "ab")
+        self._active_size = active.size
+
+    def _close_active(self) -> None:
+        for handle in (self._log_file, self._index_file):
+            if handle is not None:
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+        self._log_file = None
+        self._index_file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Flush, fsync and close the active segment"""
+        with self._lock:
+            self._close_active()
+
+    # ------------------------------------------------------------------ #
+    # Writing
+    # ------------------------------------------------------------------ #
+
+    @property
+    def next_offset(self) -> int:
+        return self._segments[-1].next_offset
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        Append a record to the log
+
+        Args:
+            record: JSON-serialisable event record; ``event_id`` and ``timestamp``
+                (ISO string or epoch seconds) are indexed when present
+
+        Returns:
+            int: Offset assigned to the record
+        """
+        with self._lock:
+            offset = self._append_locked(record)
+            self._maybe_sync()
+            return offset
+
+    def append_many(self, records: List[Dict[str, Any]]) -> List[int]:
+        """
+        Append several records with a single flush
+
+        Returns:
+            List[int]: Offsets assigned to the records
+        """
+        with self._lock:
+            offsets = [self._append_locked(record) for record in records]
+            self._maybe_sync()
+            return offsets
+
+    def _append_locked(self, record: Dict[str, Any]) -> int:
+        if self._log_file is None:
+            self._open_active()
+        if self._should_roll():
+            self._roll()
+
+        segment = self._segments[-1]
+        offset = segment.next_offset
+        line = json.dumps({**record, "offset": offset}, separators=(",", ":"),
+                          default=str).encode("utf-8") + b"\n"
+
+        entry = IndexEntry(
+            offset=offset,
+            position=self._active_size,
+            length=len(line),
+            timestamp=_record_timestamp(record),
+            id_hash=_hash_event_id(record.get("event_id")),
+        )
+        self._log_file.write(line)
+        self._index_file.write(_INDEX_ENTRY.pack(entry.offset, entry.position, entry.length,
+                                                 entry.timestamp, entry.id_hash))
+        segment.append_entry(entry)
+        self._active_size += len(line)
+        self._unsynced += 1
+        return offset
+
+    def flush(self) -> None:
+        """Force buffered records to disk"""
+        with self._lock:
+            self._sync()
+
+    def _maybe_sync(self) -> None:
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self._sync()
+        else:
+            # Hand data to the OS so readers in this process see it immediately
+            self._log_file.flush()
+            self._index_file.flush()
+
+    def _sync(self) -> None:
+        if self._log_file is None:
+            return
+        self._log_file.flush()
+        self._index_file.flush()
+        os.fsync(self._log_file.fileno())
+        os.fsync(self._index_file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _should_roll(self) -> bool:
+        if self._active_size == 0:
+            return False
+        if self._active_size >= self.segment_max_bytes:
+            return True
+        if self.segment_max_age is not None:
+            return time.time() - self._segments[-1].created_at >= self.segment_max_age
+        return False
+
+    def _roll(self) -> None:
+        """Close the active segment and start a new one"""
+        next_offset = self._segments[-1].next_offset
+        self._close_active()
+        self._segments.append(_Segment(self.directory, next_offset))
+        self._open_active()
+        self._apply_retention()
+        logger.debug(f"Event log rolled to segment {next_offset}")
+
+    def _apply_retention(self) -> None:
+        if not self.max_segments:
+            return
+        while len(self._segments) > self.max_segments:
+            expired = self._segments.pop(0)
+            for path in (expired.log_path, expired.index_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    # ------------------------------------------------------------------ #
+    # Reading
+    # ------------------------------------------------------------------ #
+
+    @property
+    def first_offset(self) -> int:
+        return self._segments[0].base_offset
+
+    def read(self, from_offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Read records starting at an offset
+
+        Args:
+            from_offset: First offset to return
+            limit: Maximum number of records to return
+
+        Yields:
+            Dict[str, Any]: Decoded records in log order
+        """
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.flush()
+                self._index_file.flush()
+            segments = list(self._segments)
+
+        remaining = limit
+        start = max(from_offset, segments[0].base_offset)
+        for i, segment in enumerate(segments):
+            upper = segments[i + 1].base_offset if i + 1 < len(segments) else None
+            if upper is not None and start >= upper:
+                continue
+
+            entries = segment.load_index()
+            first = start - segment.base_offset
+            if first >= len(entries):
+                continue
+
+            with open(segment.log_path, "rb") as handle:
+                handle.seek(entries[first].position)
+                for entry in entries[first:]:
+                    if remaining is not None and remaining <= 0:
+                        return
+                    line = handle.read(entry.length)
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping corrupt record at offset {entry.offset}")
+                        continue
+                    if remaining is not None:
+                        remaining -= 1
+            start = upper if upper is not None else start
+
+    def offset_for_event_id(self, event_id: str) -> Optional[int]:
+        """Locate the offset of an event id via the index, newest segments first"""
+        target = _hash_event_id(event_id)
+        with self._lock:
+            segments = list(self._segments)
+
+        for segment in reversed(segments):
+            entries = segment.load_index()
+            for entry in reversed(entries):
+                if entry.id_hash != target:
+                    continue
+                record = self._read_entry(segment, entry)
+                if record is not None and record.get("event_id") == event_id:
+                    return entry.offset
+        return None
+
+    def offset_for_timestamp(self, since: float) -> int:
+        """Return the first offset with a timestamp >= ``since`` (epoch seconds)"""
+        with self._lock:
+            segments = list(self._segments)
+
+        for segment in segments:
+            entries = segment.load_index()
+            if not entries or entries[-1].timestamp < since:
+                continue
+            timestamps = [entry.timestamp for entry in entries]
+            return entries[bisect.bisect_left(timestamps, since)].offset
+        return self.next_offset
+
+    def replay(self, from_event_id: Optional[str] = None, since: Optional[float] = None,
+               limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Replay records after an event id and/or from a point in time
+
+        Args:
+            from_event_id: Replay records published after this event
+            since: Replay records with a timestamp >= this epoch time
+            limit: Maximum number of records to return
+        """
+        start = self.first_offset
+        if from_event_id is not None:
+            offset = self.offset_for_event_id(from_event_id)
+            if offset is None:
+                return iter(())
+            start = max(start, offset + 1)
+        if since is not None:
+            start = max(start, self.offset_for_timestamp(since))
+        return self.read(start, limit)
+
+    def _read_entry(self, segment: _Segment, entry: IndexEntry) -> Optional[Dict[str, Any]]:
+        try:
+            with open(segment.log_path, "rb") as handle:
+                handle.seek(entry.position)
+                return json.loads(handle.read(entry.length))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get log statistics"""
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "segments": len(self._segments),
+                "first_offset": self.first_offset,
+                "next_offset": self.next_offset,
+                "active_segment_bytes": self._active_size,
+                "unsynced_records": self._unsynced,
+            }
+
+
+def _hash_event_id(event_id: Optional[str]) -> int:
+    return zlib.crc32(event_id.encode("utf-8")) if event_id else 0
+
+
+def _record_timestamp(record: Dict[str, Any]) -> float:
+    value = record.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
@@ -4,6 +4,9 @@ BMAD Event Types
 Definitie van alle event types voor inter-agent communicatie
 """
 
+import sys
+from typing import Dict, FrozenSet, Tuple
+
 class EventTypes:
     """Event types for BMAD message bus"""
     
@@ -554,15 +557,52 @@ EVENT_CATEGORIES = {
     ]
 }
 
+# ---------------------------------------------------------------------------
+# Compiled registry (built once at import time)
+# ---------------------------------------------------------------------------
+
+def _compile_event_types() -> Tuple[str, ...]:
+    """Intern every EventTypes constant and return them in attribute-name order"""
+    event_types = []
+    for attr in sorted(vars(EventTypes)):
+        value = getattr(EventTypes, attr)
+        if attr.startswith('_') or not isinstance(value, str):
+            continue
+        value = sys.intern(value)
+        setattr(EventTypes, attr, value)
+        event_types.append(value)
+    return tuple(event_types)
+
+def _compile_category_index() -> Dict[str, Tuple[str, ...]]:
+    """Map every event type to the categories it belongs to"""
+    index: Dict[str, Tuple[str, ...]] = {}
+    for category, events in EVENT_CATEGORIES.items():
+        events[:] = [sys.intern(event_type) for event_type in events]
+        for event_type in events:
+            index[event_type] = index.get(event_type, ()) + (category,)
+    return index
+
+_ALL_EVENT_TYPES: Tuple[str, ...] = _compile_event_types()
+VALID_EVENT_TYPES: FrozenSet[str] = frozenset(_ALL_EVENT_TYPES)
+_EVENT_TYPE_LOOKUP: Dict[str, str] = {event_type: event_type for event_type in _ALL_EVENT_TYPES}
+_CATEGORIES_BY_EVENT_TYPE: Dict[str, Tuple[str, ...]] = _compile_category_index()
+
 def get_events_by_category(category: str) -> list:
     """Get all events for a specific category"""
     return EVENT_CATEGORIES.get(category, [])
 
+def get_event_categories(event_type: str) -> Tuple[str, ...]:
+    """Get the categories an event type belongs to"""
+    return _CATEGORIES_BY_EVENT_TYPE.get(event_type, ())
+
 def get_all_event_types() -> list:
     """Get all event types"""
-    return [getattr(EventTypes, attr) for attr in dir(EventTypes) 
-            if not attr.startswith('_') and isinstance(getattr(EventTypes, attr), str)]
+    return list(_ALL_EVENT_TYPES)
 
 def is_valid_event_type(event_type: str) -> bool:
     """Check if event type is valid"""
-    return event_type in get_all_event_types() 
\ No newline at end of file
+    return event_type in VALID_EVENT_TYPES
+
+def intern_event_type(event_type: str) -> str:
+    """Return the registered (interned) instance of an event type, or the input unchanged"""
+    return _EVENT_TYPE_LOOKUP.get(event_type, event_type)
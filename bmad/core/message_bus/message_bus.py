@@ -7,14 +7,25 @@ Centrale message bus voor inter-agent communicatie
 import asyncio
 import json
 import logging
-from typing import Dict, List, Callable, Any, Optional
+import os
+import uuid
+from typing import Dict, List, Callable, Any, Optional, Sequence, Tuple, Union
 from datetime import datetime
 from pathlib import Path
 import redis
 from dataclasses import dataclass, asdict
 
+from .dispatcher import SubscriberDispatcher
+from .event_history import EventHistory
+from .event_log import SegmentedEventLog
+from .events import intern_event_type, is_valid_event_type
+from .redis_streams import RedisStreamsTransport
+from .topics import TopicTrie, is_topic_pattern
+
 logger = logging.getLogger(__name__)
 
+BatchItem = Union[Tuple[str, Dict[str, Any]], Dict[str, Any]]
+
 @dataclass
 class Event:
     """Event data structure"""
@@ -25,19 +36,68 @@ class Event:
     event_id: str
     correlation_id: Optional[str] = None
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise event to a JSON-compatible dict"""
+        event_dict = asdict(self)
+        event_dict['timestamp'] = self.timestamp.isoformat()
+        return event_dict
+
+    @classmethod
+    def from_dict(cls, event_data: Dict[str, Any]) -> "Event":
+        """Create event from a serialised dict"""
+        return cls(
+            event_type=event_data['event_type'],
+            data=event_data['data'],
+            source_agent=event_data['source_agent'],
+            timestamp=datetime.fromisoformat(event_data['timestamp']),
+            event_id=event_data['event_id'],
+            correlation_id=event_data.get('correlation_id')
+        )
+
 class MessageBus:
     """
     Central message bus for inter-agent communication
-    Supports both Redis Pub/Sub and file-based fallback
+    Supports both Redis Pub/Sub and file-based fallback.
+    When ``event_log_dir`` is given, events are persisted to an append-only
+    segmented log instead of rewriting the JSON snapshot on every publish.
+    With ``use_streams`` the Redis transport switches from Pub/Sub to
+    non-blocking Redis Streams with consumer groups (at-least-once delivery).
+    Buses read through one stable group (``streams_options["group"]``, else
+    ``BMAD_STREAMS_GROUP``, else ``"bmad"``) and split its events, so events
+    published while no listener runs are delivered once one starts. With
+    ``streams_fan_out`` each bus gets its own short-lived group instead and
+    receives every event published after ``start()``.
+    With ``concurrent_dispatch`` every subscriber is served from its own
+    bounded queue, so publish no longer waits for handlers to finish.
+    In-memory history is a bounded ring buffer of ``history_size`` events.
+    With ``validate_event_types`` unknown event types are rejected on publish.
+    Subscriptions may use hierarchical topic patterns: ``*`` matches one level
+    and ``#`` any number of levels, against the event type and
+    ``<category>.<event_type>`` (e.g. ``workflow.*``).
     """
     
-    def __init__(self, redis_url: str = "redis://localhost:6379", use_redis: bool = True):
+    def __init__(self, redis_url: str = "redis://localhost:6379", use_redis: bool = True,
+                 event_log_dir: Optional[str] = None, event_log_options: Optional[Dict[str, Any]] = None,
+                 use_streams: bool = False, streams_options: Optional[Dict[str, Any]] = None,
+                 streams_fan_out: bool = False,
+                 concurrent_dispatch: bool = False, dispatch_options: Optional[Dict[str, Any]] = None,
+                 history_size: int = 10000, validate_event_types: bool = False):
         self.subscribers: Dict[str, List[Callable]] = {}
-        self.event_history: List[Event] = []
+        self.batch_subscribers: Dict[str, List[Callable]] = {}
+        self.pattern_subscribers: Dict[str, List[Callable]] = {}
+        self.topic_trie = TopicTrie()
+        self.event_history = EventHistory(maxlen=history_size)
         self.redis_client = None
         self.use_redis = use_redis
         self.redis_url = redis_url
         self.event_file = Path("bmad/shared_context.json")
+        self.event_log: Optional[SegmentedEventLog] = None
+        self.streams: Optional[RedisStreamsTransport] = None
+        self.dispatcher: Optional[SubscriberDispatcher] = (
+            SubscriberDispatcher(**(dispatch_options or {})) if concurrent_dispatch else None
+        )
+        self.instance_id = uuid.uuid4().hex
+        self.validate_event_types = validate_event_types
         
         # Initialize Redis if available
         if self.use_redis:
@@ -49,6 +109,21 @@ class MessageBus:
                 logger.warning(f"Redis connection failed, falling back to file-based: {e}")
                 self.use_redis = False
         
+        if self.use_redis and use_streams:
+            streams_options = dict(streams_options or {})
+            if streams_fan_out and "group" not in streams_options:
+                # Own group per bus: every instance receives every event
+                streams_options["group"] = f"bmad:bus:{self.instance_id}"
+                streams_options.setdefault("start_id", "$")
+                streams_options.setdefault("delete_group_on_close", True)
+            streams_options.setdefault("group", os.getenv("BMAD_STREAMS_GROUP", "bmad"))
+            self.streams = RedisStreamsTransport(redis_url, **streams_options)
+        
+        # Append-only event log persistence
+        if event_log_dir:
+            self.event_log = SegmentedEventLog(event_log_dir, **(event_log_options or {}))
+            return
+        
         # Ensure event file exists
         self.event_file.parent.mkdir(parents=True, exist_ok=True)
         if not self.event_file.exists():
@@ -70,6 +145,11 @@ class MessageBus:
             bool: Success status
         """
         try:
+            if self.validate_event_types and not is_valid_event_type(event_type):
+                logger.warning(f"Rejected unknown event type: {event_type}")
+                return False
+            event_type = intern_event_type(event_type)
+            
             # Create event
             event = Event(
                 event_type=event_type,
@@ -84,14 +164,17 @@ class MessageBus:
             self.event_history.append(event)
             
             # Publish to Redis if available
-            if self.use_redis and self.redis_client:
+            if self.streams is not None:
+                await self._publish_to_stream(event)
+            elif self.use_redis and self.redis_client:
                 await self._publish_to_redis(event)
             
             # Notify local subscribers
             await self._notify_subscribers(event)
+            await self._notify_batch_subscribers([event])
             
-            # Save to file for persistence
-            self._save_events_to_file()
+            # Persist event
+            self._persist_event(event)
             
             logger.info(f"✅ Event published: {event_type} from {source_agent}")
             return True
@@ -100,18 +183,95 @@ class MessageBus:
             logger.error(f"❌ Failed to publish event {event_type}: {e}")
             return False
     
+    async def publish_many(self, events: Sequence[BatchItem],
+                           source_agent: str = "unknown",
+                           correlation_id: Optional[str] = None) -> bool:
+        """
+        Publish a batch of events with one Redis round-trip and one persistence flush
+        
+        Args:
+            events: ``(event_type, data)`` tuples or dicts with ``event_type``,
+                ``data`` and optionally ``source_agent`` / ``correlation_id``
+            source_agent: Default agent for items that do not set one
+            correlation_id: Default correlation ID for items that do not set one
+            
+        Returns:
+            bool: Success status
+        """
+        if not events:
+            return True
+        
+        try:
+            batch = self._build_events(events, source_agent, correlation_id)
+            
+            for event in batch:
+                self.event_history.append(event)
+            
+            if self.streams is not None:
+                await self._publish_batch_to_stream(batch)
+            elif self.use_redis and self.redis_client:
+                await self._publish_batch_to_redis(batch)
+            
+            # Per-event subscribers in publish order, then batch-aware subscribers
+            for event in batch:
+                await self._notify_subscribers(event)
+            await self._notify_batch_subscribers(batch)
+            
+            self._persist_events(batch)
+            
+            logger.info(f"✅ Published batch of {len(batch)} events from {source_agent}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to publish batch of {len(events)} events: {e}")
+            return False
+    
+    def _build_events(self, items: Sequence[BatchItem], source_agent: str,
+                      correlation_id: Optional[str]) -> List[Event]:
+        """Create events for a batch with one clock read and sequence-suffixed ids"""
+        now = datetime.now()
+        stamp = now.timestamp()
+        batch = []
+        for index, item in enumerate(items):
+            if isinstance(item, dict):
+                event_type = item['event_type']
+                data = item.get('data', {})
+                item_source = item.get('source_agent', source_agent)
+                item_correlation = item.get('correlation_id', correlation_id)
+            else:
+                event_type, data = item
+                item_source, item_correlation = source_agent, correlation_id
+            if self.validate_event_types and not is_valid_event_type(event_type):
+                raise ValueError(f"Unknown event type: {event_type}")
+            event_type = intern_event_type(event_type)
+            batch.append(Event(
+                event_type=event_type,
+                data=data,
+                source_agent=item_source,
+                timestamp=now,
+                event_id=f"{event_type}_{stamp}_{index}",
+                correlation_id=item_correlation
+            ))
+        return batch
+    
     async def subscribe(self, event_type: str, callback: Callable) -> bool:
         """
         Subscribe to event type
         
         Args:
-            event_type: Type of event to subscribe to
+            event_type: Type of event or topic pattern (``workflow.*``, ``#``)
             callback: Function to call when event is received
             
         Returns:
             bool: Success status
         """
         try:
+            if is_topic_pattern(event_type):
+                self.pattern_subscribers.setdefault(event_type, []).append(callback)
+                self.topic_trie.add(event_type, callback)
+                logger.info(f"✅ Subscribed to topic pattern: {event_type}")
+                return True
+            
             if event_type not in self.subscribers:
                 self.subscribers[event_type] = []
             
@@ -135,9 +295,14 @@ class MessageBus:
             bool: Success status
         """
         try:
-            if event_type in self.subscribers:
-                if callback in self.subscribers[event_type]:
-                    self.subscribers[event_type].remove(callback)
+            registry = self.pattern_subscribers if is_topic_pattern(event_type) else self.subscribers
+            if event_type in registry:
+                if callback in registry[event_type]:
+                    registry[event_type].remove(callback)
+                    if registry is self.pattern_subscribers:
+                        self.topic_trie.remove(event_type, callback)
+                    if self.dispatcher is not None and not self._is_subscribed(callback):
+                        await self.dispatcher.remove(callback)
                     logger.info(f"✅ Unsubscribed from event: {event_type}")
                     return True
             
@@ -147,50 +312,196 @@ class MessageBus:
             logger.error(f"❌ Failed to unsubscribe from {event_type}: {e}")
             return False
     
+    async def subscribe_batch(self, event_type: str, callback: Callable) -> bool:
+        """
+        Subscribe a batch-aware callback to an event type
+        
+        The callback receives a list with all events of that type from one
+        ``publish_many`` call (or a single-item list for ``publish``).
+        
+        Args:
+            event_type: Type of event to subscribe to
+            callback: Function called with ``List[Event]``
+            
+        Returns:
+            bool: Success status
+        """
+        self.batch_subscribers.setdefault(event_type, []).append(callback)
+        logger.info(f"✅ Batch subscriber added for event: {event_type}")
+        return True
+    
+    async def unsubscribe_batch(self, event_type: str, callback: Callable) -> bool:
+        """Remove a batch-aware callback"""
+        callbacks = self.batch_subscribers.get(event_type, [])
+        if callback not in callbacks:
+            return False
+        callbacks.remove(callback)
+        if self.dispatcher is not None and not self._is_subscribed(callback):
+            await self.dispatcher.remove(callback)
+        return True
+    
+    def _is_subscribed(self, callback: Callable) -> bool:
+        """Check whether a callback still has any subscription"""
+        return any(
+            callback in callbacks
+            for registry in (self.subscribers, self.pattern_subscribers, self.batch_subscribers)
+            for callbacks in registry.values()
+        )
+    
+    def _callbacks_for(self, event_type: str) -> List[Callable]:
+        """Exact subscribers followed by matching pattern subscribers, without duplicates"""
+        callbacks = list(self.subscribers.get(event_type, []))
+        if len(self.topic_trie):
+            for callback in self.topic_trie.match_event_type(event_type):
+                if callback not in callbacks:
+                    callbacks.append(callback)
+        return callbacks
+    
     async def get_events(self, event_type: Optional[str] = None, 
-                        limit: int = 100) -> List[Event]:
+                        limit: int = 100,
+                        source_agent: Optional[str] = None,
+                        since: Optional[datetime] = None,
+                        until: Optional[datetime] = None) -> List[Event]:
         """
         Get recent events
         
         Args:
             event_type: Filter by event type (optional)
-            limit: Maximum number of events to return
+            limit: Maximum number of matching events to return
+            source_agent: Filter by source agent (optional)
+            since: Only events at or after this time (optional)
+            until: Only events at or before this time (optional)
             
         Returns:
             List[Event]: List of events
         """
         try:
-            events = self.event_history[-limit:] if limit > 0 else self.event_history
-            
-            if event_type:
-                events = [e for e in events if e.event_type == event_type]
-            
-            return events
+            return self.event_history.query(
+                event_type=event_type or None,
+                source_agent=source_agent,
+                since=since,
+                until=until,
+                limit=limit
+            )
             
         except Exception as e:
             logger.error(f"❌ Failed to get events: {e}")
             return []
     
-    async def _publish_to_redis(self, event: Event) -> None:
-        """Publish event to Redis"""
-        try:
-            event_data = asdict(event)
-            event_data['timestamp'] = event.timestamp.isoformat()
+    async def replay_events(self, from_event_id: Optional[str] = None,
+                            since: Optional[datetime] = None,
+                            limit: Optional[int] = None) -> List[Event]:
+        """
+        Replay persisted events from the event log
+        
+        Args:
+            from_event_id: Replay events published after this event id
+            since: Replay events published at or after this time
+            limit: Maximum number of events to return
             
-            # Publish to Redis channel
-            self.redis_client.publish(
-                f"bmad:events:{event.event_type}",
-                json.dumps(event_data)
+        Returns:
+            List[Event]: Replayed events in publish order
+        """
+        if self.event_log is None:
+            events = list(self.event_history)
+            if from_event_id is not None:
+                ids = [e.event_id for e in events]
+                events = events[ids.index(from_event_id) + 1:] if from_event_id in ids else []
+            if since is not None:
+                events = [e for e in events if e.timestamp >= since]
+            return events[:limit] if limit is not None else events
+        
+        try:
+            records = self.event_log.replay(
+                from_event_id=from_event_id,
+                since=since.timestamp() if since is not None else None,
+                limit=limit
             )
+            return [Event.from_dict(record) for record in records]
             
-            # Store in Redis for persistence
-            self.redis_client.lpush(
-                f"bmad:events:history:{event.event_type}",
-                json.dumps(event_data)
+        except Exception as e:
+            logger.error(f"❌ Failed to replay events: {e}")
+            return []
+    
+    async def drain(self) -> None:
+        """Wait until all queued subscriber deliveries have been handled"""
+        if self.dispatcher is not None:
+            await self.dispatcher.drain()
+    
+    def get_dispatch_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-subscriber queue lag and handler latency metrics"""
+        return self.dispatcher.get_metrics() if self.dispatcher is not None else {}
+    
+    async def start(self) -> None:
+        """Create the Redis Streams consumer group, so events are kept for it from now on"""
+        if self.streams is not None:
+            await self.streams.ensure_group()
+    
+    def close(self) -> None:
+        """Flush and close persistence resources; use ``aclose`` to also close the stream transport"""
+        if self.event_log is not None:
+            self.event_log.close()
+        if self.streams is not None:
+            self.streams.stop()
+    
+    async def aclose(self) -> None:
+        """Close persistence resources and the stream transport (deleting a fan-out group)"""
+        self.close()
+        if self.streams is not None:
+            await self.streams.close()
+    
+    async def _publish_to_stream(self, event: Event) -> None:
+        """Publish event to the Redis stream"""
+        try:
+            await self.streams.publish({**event.to_dict(), 'origin': self.instance_id})
+        except Exception as e:
+            logger.error(f"❌ Failed to publish to Redis stream: {e}")
+    
+    async def _handle_stream_event(self, event_data: Dict[str, Any]) -> None:
+        """Deliver an event consumed from the Redis stream to local subscribers"""
+        # Local subscribers were already notified when this instance published.
+        # Acking is safe: in a shared group this instance handled it for the
+        # group, with fan-out peers read from their own group.
+        if event_data.pop('origin', None) == self.instance_id:
+            return
+        event = Event.from_dict(event_data)
+        self.event_history.append(event)
+        await self._notify_subscribers(event)
+    
+    async def _publish_batch_to_stream(self, batch: List[Event]) -> None:
+        """Publish a batch of events to the Redis stream in one pipeline"""
+        try:
+            await self.streams.publish_batch(
+                [{**event.to_dict(), 'origin': self.instance_id} for event in batch]
             )
+        except Exception as e:
+            logger.error(f"❌ Failed to publish batch to Redis stream: {e}")
+    
+    async def _publish_to_redis(self, event: Event) -> None:
+        """Publish event to Redis"""
+        await self._publish_batch_to_redis([event])
+    
+    async def _publish_batch_to_redis(self, batch: List[Event]) -> None:
+        """Publish events to Redis channels and history lists in one round-trip"""
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            event_types = []
+            for event in batch:
+                payload = json.dumps(event.to_dict())
+                
+                # Publish to Redis channel
+                pipe.publish(f"bmad:events:{event.event_type}", payload)
+                
+                # Store in Redis for persistence
+                pipe.lpush(f"bmad:events:history:{event.event_type}", payload)
+                if event.event_type not in event_types:
+                    event_types.append(event.event_type)
             
             # Keep only last 1000 events per type
-            self.redis_client.ltrim(f"bmad:events:history:{event.event_type}", 0, 999)
+            for event_type in event_types:
+                pipe.ltrim(f"bmad:events:history:{event_type}", 0, 999)
+            
+            pipe.execute()
             
         except Exception as e:
             logger.error(f"❌ Failed to publish to Redis: {e}")
@@ -198,8 +509,13 @@ class MessageBus:
     async def _notify_subscribers(self, event: Event) -> None:
         """Notify all subscribers of an event"""
         try:
-            if event.event_type in self.subscribers:
-                for callback in self.subscribers[event.event_type]:
+            callbacks = self._callbacks_for(event.event_type)
+            if self.dispatcher is not None:
+                await self.dispatcher.dispatch(event, callbacks)
+                return
+            
+            if callbacks:
+                for callback in callbacks:
                     try:
                         # Call callback asynchronously if it's async
                         if asyncio.iscoroutinefunction(callback):
@@ -212,20 +528,64 @@ class MessageBus:
         except Exception as e:
             logger.error(f"❌ Failed to notify subscribers: {e}")
     
+    async def _notify_batch_subscribers(self, batch: List[Event]) -> None:
+        """Notify batch-aware subscribers with the events of their type, in order"""
+        if not self.batch_subscribers:
+            return
+        
+        by_type: Dict[str, List[Event]] = {}
+        for event in batch:
+            if event.event_type in self.batch_subscribers:
+                by_type.setdefault(event.event_type, []).append(event)
+        
+        for event_type, events in by_type.items():
+            callbacks = list(self.batch_subscribers[event_type])
+            if self.dispatcher is not None:
+                await self.dispatcher.dispatch(events, callbacks)
+                continue
+            for callback in callbacks:
+                try:
+                    if asyncio.iscoroutinefunction(callback):
+                        await callback(events)
+                    else:
+                        callback(events)
+                except Exception as e:
+                    logger.error(f"❌ Batch subscriber callback failed: {e}")
+    
+    def _persist_events(self, batch: List[Event]) -> None:
+        """Persist a batch of events with a single flush"""
+        if self.event_log is None:
+            self._save_events_to_file()
+            return
+        
+        try:
+            self.event_log.append_many([event.to_dict() for event in batch])
+        except Exception as e:
+            logger.error(f"❌ Failed to append batch to log: {e}")
+    
+    def _persist_event(self, event: Event) -> None:
+        """Persist a single event to the configured backend"""
+        if self.event_log is None:
+            self._save_events_to_file()
+            return
+        
+        try:
+            self.event_log.append(event.to_dict())
+        except Exception as e:
+            logger.error(f"❌ Failed to append event to log: {e}")
+    
     def _save_events_to_file(self) -> None:
         """Save events to file for persistence"""
         try:
             events_data = []
             for event in self.event_history[-1000:]:  # Keep last 1000 events
-                event_dict = asdict(event)
-                event_dict['timestamp'] = event.timestamp.isoformat()
-                events_data.append(event_dict)
+                events_data.append(event.to_dict())
             
             with open(self.event_file, 'w') as f:
                 json.dump({
                     'events': events_data,
                     'last_updated': datetime.now().isoformat(),
-                    'total_events': len(self.event_history)
+                    'total_events': self.event_history.total_appended
                 }, f, indent=2)
                 
         except Exception as e:
@@ -239,15 +599,7 @@ class MessageBus:
                     data = json.load(f)
                     
                 for event_data in data.get('events', []):
-                    event = Event(
-                        event_type=event_data['event_type'],
-                        data=event_data['data'],
-                        source_agent=event_data['source_agent'],
-                        timestamp=datetime.fromisoformat(event_data['timestamp']),
-                        event_id=event_data['event_id'],
-                        correlation_id=event_data.get('correlation_id')
-                    )
-                    self.event_history.append(event)
+                    self.event_history.append(Event.from_dict(event_data))
                     
                 logger.info(f"✅ Loaded {len(data.get('events', []))} events from file")
                 
@@ -259,6 +611,14 @@ class MessageBus:
         if not self.use_redis or not self.redis_client:
             return
         
+        if self.streams is not None:
+            try:
+                await self.start()
+                await self.streams.consume(self._handle_stream_event)
+            except Exception as e:
+                logger.error(f"❌ Redis stream consumer failed: {e}")
+            return
+        
         try:
             pubsub = self.redis_client.pubsub()
             
@@ -273,14 +633,7 @@ class MessageBus:
                         event_data = json.loads(message['data'])
                         
                         # Create event object
-                        event = Event(
-                            event_type=event_data['event_type'],
-                            data=event_data['data'],
-                            source_agent=event_data['source_agent'],
-                            timestamp=datetime.fromisoformat(event_data['timestamp']),
-                            event_id=event_data['event_id'],
-                            correlation_id=event_data.get('correlation_id')
-                        )
+                        event = Event.from_dict(event_data)
                         
                         # Add to history and notify subscribers
                         self.event_history.append(event)
@@ -302,6 +655,13 @@ def get_message_bus() -> MessageBus:
         _message_bus = MessageBus()
     return _message_bus
 
+async def close_message_bus() -> None:
+    """Close the global message bus instance, if one was created"""
+    global _message_bus
+    if _message_bus is not None:
+        bus, _message_bus = _message_bus, None
+        await bus.aclose()
+
 async def publish_event(event_type: str, data: Dict[str, Any], 
                        source_agent: str = "unknown",
                        correlation_id: Optional[str] = None) -> bool:
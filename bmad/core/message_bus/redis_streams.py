@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+BMAD Redis Streams Transport
+Asyncio Redis Streams transport met consumer groups voor de message bus
+"""
+
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+StreamMessage = Tuple[str, Dict[str, Any]]
+
+
+class RedisStreamsTransport:
+    """
+    Non-blocking Redis Streams transport (XADD/XREADGROUP/XACK).
+
+    All workers that share a consumer group split the stream between them;
+    every group sees every message. For fan-out give each reader its own
+    group; share a group only between workers that may handle each other's
+    events. Messages are acknowledged only after the handler succeeded, and
+    entries left pending by a crashed consumer are reclaimed after
+    ``claim_idle_ms``. Delivery is therefore at-least-once.
+
+    ``start_id`` is where a newly created group starts reading (``"0"``: the
+    whole stream, ``"$"``: only new messages). With ``delete_group_on_close``
+    the group is destroyed by ``close()``, for short-lived per-instance groups.
+    """
+
+    def __init__(self, redis_url: str = "redis://localhost:6379",
+                 stream: str = "bmad:stream:events",
+                 group: str = "bmad",
+                 consumer: Optional[str] = None,
+                 maxlen: Optional[int] = 100000,
+                 batch_size: int = 100,
+                 block_ms: int = 1000,
+                 claim_idle_ms: int = 60000,
+                 start_id: str = "0",
+                 delete_group_on_close: bool = False,
+                 client: Optional[aioredis.Redis] = None):
+        self.redis_url = redis_url
+        self.stream = stream
+        self.group = group
+        # Unique per transport: two instances in one process must not share a consumer
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.start_id = start_id
+        self.delete_group_on_close = delete_group_on_close
+        self.client = client or aioredis.from_url(redis_url, decode_responses=True)
+
+        self._group_ready = False
+        self._running = False
+        self.stats = {"published": 0, "delivered": 0, "acked": 0, "failed": 0, "reclaimed": 0}
+
+    async def ensure_group(self) -> None:
+        """Create the consumer group (and stream) if it does not exist yet"""
+        if self._group_ready:
+            return
+        try:
+            await self.client.xgroup_create(self.stream, self.group, id=self.start_id, mkstream=True)
+            logger.info(f"✅ Created consumer group {self.group} on {self.stream}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    async def publish(self, event_data: Dict[str, Any]) -> str:
+        """
+        Append a single event to the stream
+
+        Returns:
+            str: Stream message id
+        """
+        message_id = await self.client.xadd(self.stream, self._encode(event_data), **self._trim_args())
+        self.stats["published"] += 1
+        return message_id
+
+    async def publish_batch(self, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Append several events in one pipelined round-trip
+
+        Returns:
+            List[str]: Stream message ids in input order
+        """
+        if not events:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        trim_args = self._trim_args()
+        for event_data in events:
+            pipe.xadd(self.stream, self._encode(event_data), **trim_args)
+        message_ids = await pipe.execute()
+        self.stats["published"] += len(message_ids)
+        return message_ids
+
+    async def read(self, count: Optional[int] = None, block_ms: Optional[int] = None) -> List[StreamMessage]:
+        """Read new messages for this consumer from the group"""
+        await self.ensure_group()
+        response = await self.client.xreadgroup(
+            self.group, self.consumer, {self.stream: ">"},
+            count=count or self.batch_size,
+            block=self.block_ms if block_ms is None else block_ms
+        )
+        messages: List[StreamMessage] = []
+        for _stream, entries in response or []:
+            messages.extend(await self._decode_entries(entries))
+        return messages
+
+    async def reclaim(self, min_idle_ms: Optional[int] = None) -> List[StreamMessage]:
+        """Claim messages that stayed pending on other consumers for too long"""
+        await self.ensure_group()
+        response = await self.client.xautoclaim(
+            self.stream, self.group, self.consumer,
+            min_idle_time=self.claim_idle_ms if min_idle_ms is None else min_idle_ms,
+            start_id="0-0", count=self.batch_size
+        )
+        entries = response[1] if response else []
+        messages = await self._decode_entries(entries)
+        self.stats["reclaimed"] += len(messages)
+        return messages
+
+    async def ack(self, message_ids: List[str]) -> int:
+        """Acknowledge processed messages"""
+        if not message_ids:
+            return 0
+        acked = await self.client.xack(self.stream, self.group, *message_ids)
+        self.stats["acked"] += acked
+        return acked
+
+    async def consume(self, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """
+        Consume the stream until ``stop()`` is called
+
+        Args:
+            handler: Async callable invoked per event; a raised exception leaves
+                the message pending so it is redelivered via ``reclaim``
+        """
+        self._running = True
+        logger.info(f"✅ Redis Streams consumer {self.consumer} started on {self.stream}")
+        try:
+            await self._process(await self.reclaim(), handler)
+            while self._running:
+                messages = await self.read()
+                if not messages:
+                    await self._process(await self.reclaim(), handler)
+                    continue
+                await self._process(messages, handler)
+        finally:
+            self._running = False
+            logger.info(f"Redis Streams consumer {self.consumer} stopped")
+
+    def stop(self) -> None:
+        """Stop the consume loop after the current batch"""
+        self._running = False
+
+    async def close(self) -> None:
+        """Close the Redis connection"""
+        self.stop()
+        if self.delete_group_on_close and self._group_ready:
+            try:
+                await self.client.xgroup_destroy(self.stream, self.group)
+            except ResponseError as e:
+                logger.warning(f"Could not delete consumer group {self.group}: {e}")
+            self._group_ready = False
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+
+    async def _process(self, messages: List[StreamMessage],
+                       handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        processed: List[str] = []
+        for message_id, event_data in messages:
+            self.stats["delivered"] += 1
+            try:
+                await handler(event_data)
+                processed.append(message_id)
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"❌ Stream handler failed for {message_id}: {e}")
+        await self.ack(processed)
+
+    def _trim_args(self) -> Dict[str, Any]:
+        return {"maxlen": self.maxlen, "approximate": True} if self.maxlen else {}
+
+    @staticmethod
+    def _encode(event_data: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "event_type": event_data.get("event_type", ""),
+            "payload": json.dumps(event_data, separators=(",", ":"), default=str),
+        }
+
+    async def _decode_entries(self, entries) -> List[StreamMessage]:
+        messages: List[StreamMessage] = []
+        invalid: List[str] = []
+        for message_id, fields in entries:
+            if not fields:
+                continue  # entry was trimmed away while pending
+            try:
+                messages.append((message_id, json.loads(fields["payload"])))
+            except (KeyError, TypeError, json.JSONDecodeError) as e:
+                logger.error(f"❌ Invalid stream message {message_id}: {e}")
+                invalid.append(message_id)
+        # Poison messages would otherwise be reclaimed forever
+        await self.ack(invalid)
+        return messages
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport statistics"""
+        return {"stream": self.stream, "group": self.group, "consumer": self.consumer, **self.stats}
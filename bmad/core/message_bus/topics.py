@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+BMAD Topic Matching
+Hiërarchische topic patterns (``workflow.*``, ``agent.#``) met een trie matcher
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .events import get_event_categories
+
+SEPARATOR = "."
+SINGLE_LEVEL = "*"   # matches exactly one level
+MULTI_LEVEL = "#"    # matches zero or more levels
+
+
+def is_topic_pattern(topic: str) -> bool:
+    """Check whether a subscription topic contains wildcards"""
+    return SINGLE_LEVEL in topic or MULTI_LEVEL in topic
+
+
+def topics_for_event_type(event_type: str) -> Tuple[str, ...]:
+    """
+    Hierarchical topics an event type is published under
+
+    The event type itself (dotted names form their own hierarchy) plus
+    ``<category>.<event_type>`` for every category it belongs to, so
+    ``workflow.*`` matches all events of the workflow category.
+    """
+    return (event_type,) + tuple(
+        f"{category}{SEPARATOR}{event_type}" for category in get_event_categories(event_type)
+    )
+
+
+class _TrieNode:
+    __slots__ = ("children", "callbacks")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.callbacks: List[Callable] = []
+
+
+class TopicTrie:
+    """
+    Trie of subscription patterns keyed by topic level.
+
+    Matching walks the literal, ``*`` and ``#`` branches level by level, so the
+    cost depends on topic depth and the number of distinct patterns along the
+    path, not on the number of subscribers. Results are memoised per event
+    type until the subscriptions change.
+    """
+
+    def __init__(self, max_cache_size: int = 4096):
+        self._root = _TrieNode()
+        self._size = 0
+        self._cache: Dict[str, Tuple[Callable, ...]] = {}
+        self._max_cache_size = max_cache_size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, pattern: str, callback: Callable) -> None:
+        """Register a callback for a topic pattern"""
+        node = self._root
+        for level in pattern.split(SEPARATOR):
+            node = node.children.setdefault(level, _TrieNode())
+        node.callbacks.append(callback)
+        self._size += 1
+        self._cache.clear()
+
+    def remove(self, pattern: str, callback: Callable) -> bool:
+        """Remove a callback from a topic pattern; prunes empty branches"""
+        path: List[Tuple[_TrieNode, str]] = []
+        node: Optional[_TrieNode] = self._root
+        for level in pattern.split(SEPARATOR):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            path.append((node, level))
+            node = child
+        if callback not in node.callbacks:
+            return False
+
+        node.callbacks.remove(callback)
+        self._size -= 1
+        for parent, level in reversed(path):
+            child = parent.children[level]
+            if child.callbacks or child.children:
+                break
+            del parent.children[level]
+        self._cache.clear()
+        return True
+
+    def match_event_type(self, event_type: str) -> Tuple[Callable, ...]:
+        """Callbacks whose pattern matches any topic of an event type (deduplicated)"""
+        cached = self._cache.get(event_type)
+        if cached is not None:
+            return cached
+        if self._size == 0:
+            return ()
+
+        matched: Dict[Callable, None] = {}
+        for topic in topics_for_event_type(event_type):
+            for callback in self.match(topic):
+                matched.setdefault(callback, None)
+        result = tuple(matched)
+
+        if len(self._cache) >= self._max_cache_size:
+            self._cache.clear()
+        self._cache[event_type] = result
+        return result
+
+    def match(self, topic: str) -> List[Callable]:
+        """Callbacks whose pattern matches a single topic"""
+        results: List[Callable] = []
+        self._match(self._root, topic.split(SEPARATOR), 0, results)
+        return results
+
+    def _match(self, node: _TrieNode, levels: List[str], index: int, results: List[Callable]) -> None:
+        multi = node.children.get(MULTI_LEVEL)
+        if multi is not None:
+            # '#' absorbs the remaining levels (zero or more) ...
+            results.extend(multi.callbacks)
+            # ... or a prefix of them, with the rest of the pattern after it
+            if multi.children:
+                for skip in range(index, len(levels)):
+                    self._match_children(multi, levels, skip, results)
+
+        if index == len(levels):
+            results.extend(node.callbacks)
+            return
+
+        self._match_children(node, levels, index, results)
+
+    def _match_children(self, node: _TrieNode, levels: List[str], index: int,
+                        results: List[Callable]) -> None:
+        if index >= len(levels):
+            return
+        literal = node.children.get(levels[index])
+        if literal is not None:
+            self._match(literal, levels, index + 1, results)
+        single = node.children.get(SINGLE_LEVEL)
+        if single is not None:
+            self._match(single, levels, index + 1, results)
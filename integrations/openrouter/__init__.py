@@ -8,8 +8,12 @@ __version__ = "1.0.0"
 __author__ = "BMAD Team"
 
 # Import main integration components
+from .adaptive_router import AdaptiveRouter, ModelStats, RequestBudget
 from .openrouter_client import OpenRouterClient
 
 __all__ = [
-    "OpenRouterClient"
+    "AdaptiveRouter",
+    "ModelStats",
+    "OpenRouterClient",
+    "RequestBudget"
 ]
@@ -0,0 +1,171 @@
+"""
+BMAD OpenRouter Adaptive Router
+
+Online routing op basis van gemeten latency (EWMA en p95), error rate en kosten
+per provider/model, met budgetten per request en hedged requests.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rank of each tier for "best quality within budget"; keys are ModelTier values
+TIER_RANK = {"quality": 3, "balanced": 2, "fast": 1}
+
+
+@dataclass
+class RequestBudget:
+    """Per-request constraints for adaptive routing."""
+    max_latency: Optional[float] = None   # seconds, checked against p95
+    max_cost: Optional[float] = None      # currency units per call
+    expected_tokens: int = 1000           # used for cost estimates
+    hedge: bool = False                   # send a backup request when the primary is slow
+    hedge_delay: Optional[float] = None   # seconds; defaults to the primary's p95
+
+
+class ModelStats:
+    """
+    Online latency and error statistics for one provider/model.
+
+    Latency is tracked as an EWMA plus a sliding window of recent successful
+    calls for the p95; the error rate is an EWMA of failures, so a provider
+    that recovers is trusted again after a handful of good calls.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 200):
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.total_calls = 0
+        self.total_errors = 0
+        self.last_updated = 0.0
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def record_success(self, latency: float) -> None:
+        self.total_calls += 1
+        self._latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += self.alpha * (latency - self.ewma_latency)
+        self.error_rate *= (1 - self.alpha)
+        self.last_updated = time.time()
+
+    def record_failure(self) -> None:
+        self.total_calls += 1
+        self.total_errors += 1
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+        self.last_updated = time.time()
+
+    @property
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    @property
+    def p95_latency(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "ewma_latency": self.ewma_latency,
+            "p95_latency": self.p95_latency,
+            "error_rate": self.error_rate,
+            "total_calls": self.total_calls,
+            "total_errors": self.total_errors,
+            "samples": self.samples,
+        }
+
+
+class AdaptiveRouter:
+    """
+    Ranks candidate LLM configs against a request budget.
+
+    Candidates whose error rate exceeds ``max_error_rate`` go to the back of
+    the list. Of the rest, those whose predicted latency (p95 once
+    ``min_samples`` calls were seen, otherwise the EWMA, otherwise
+    ``default_latency``) and estimated cost fit the budget come first, best
+    tier first, then fastest. If nothing fits, candidates are ordered by how
+    far they overshoot the budget.
+    """
+
+    def __init__(self, cost_fn: Callable[..., float], alpha: float = 0.2, window: int = 200,
+                 min_samples: int = 5, max_error_rate: float = 0.5, default_latency: float = 1.0):
+        self.cost_fn = cost_fn
+        self.alpha = alpha
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.default_latency = default_latency
+        self.stats: Dict[str, ModelStats] = {}
+
+    @staticmethod
+    def key(config) -> str:
+        return f"{config.provider.value}/{config.model}"
+
+    def get_stats(self, config) -> ModelStats:
+        key = self.key(config)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = ModelStats(self.alpha, self.window)
+        return stats
+
+    def record(self, config, latency: float, success: bool) -> None:
+        stats = self.get_stats(config)
+        if success:
+            stats.record_success(latency)
+        else:
+            stats.record_failure()
+
+    def predicted_latency(self, config) -> float:
+        stats = self.stats.get(self.key(config))
+        if stats is None or stats.ewma_latency is None:
+            return self.default_latency
+        if stats.samples >= self.min_samples:
+            return stats.p95_latency
+        return stats.ewma_latency
+
+    def estimated_cost(self, config, budget: RequestBudget) -> float:
+        return self.cost_fn(config.provider, config.model, budget.expected_tokens)
+
+    def hedge_delay(self, config, budget: RequestBudget) -> float:
+        if budget.hedge_delay is not None:
+            return budget.hedge_delay
+        return self.predicted_latency(config)
+
+    def rank(self, candidates: List, budget: Optional[RequestBudget] = None) -> List:
+        """Order candidate configs from best to worst for this budget."""
+        budget = budget or RequestBudget()
+        scored: List[Tuple[tuple, int, object]] = []
+
+        for position, config in enumerate(candidates):
+            stats = self.stats.get(self.key(config))
+            unhealthy = stats is not None and stats.error_rate > self.max_error_rate
+            latency = self.predicted_latency(config)
+            cost = self.estimated_cost(config, budget)
+
+            overshoot = 0.0
+            if budget.max_latency is not None and latency > budget.max_latency:
+                overshoot += (latency - budget.max_latency) / budget.max_latency
+            if budget.max_cost is not None and cost > budget.max_cost:
+                overshoot += (cost - budget.max_cost) / max(budget.max_cost, 1e-12)
+
+            tier_rank = TIER_RANK.get(getattr(config.tier, "value", None), 0)
+            error_rate = stats.error_rate if stats else 0.0
+            # Expected latency including the cost of a failed attempt
+            effective_latency = latency * (1 + error_rate)
+            sort_key = (unhealthy, overshoot > 0, overshoot, -tier_rank, effective_latency, cost)
+            scored.append((sort_key, position, config))
+
+        scored.sort(key=lambda item: (item[0], item[1]))
+        return [config for _, _, config in scored]
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {key: stats.to_dict() for key, stats in self.stats.items()}
@@ -5,6 +5,7 @@ Dit module biedt multi-LLM routing en provider integratie via OpenRouter.
 Ondersteunt GPT, Claude, Gemini en andere LLM providers met automatische fallback en load balancing.
 """
 
+import asyncio
 import json
 import logging
 import time
@@ -16,6 +17,8 @@ from openai import AsyncOpenAI
 
 from bmad.agents.core.ai.confidence_scoring import confidence_scoring
 
+from .adaptive_router import AdaptiveRouter, RequestBudget
+
 logger = logging.getLogger(__name__)
 
 class LLMProvider(Enum):
@@ -91,6 +94,10 @@ class OpenRouterClient:
         # Routing strategies
         self.routing_strategies = self._initialize_routing_strategies()
 
+        # Online latency/error/cost router
+        self.router = AdaptiveRouter(self._calculate_cost)
+        self.hedge_stats = {"hedged_requests": 0, "hedge_wins": 0}
+
         logger.info("OpenRouter client geïnitialiseerd")
 
     def _initialize_provider_configs(self) -> Dict[LLMProvider, List[LLMConfig]]:
@@ -213,6 +220,116 @@ class OpenRouterClient:
             # All configs failed
             raise Exception(f"All LLM providers failed for strategy: {strategy_name}")
 
+    async def generate_adaptive_response(
+        self,
+        prompt: str,
+        budget: Optional[RequestBudget] = None,
+        candidates: Optional[List[LLMConfig]] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> LLMResponse:
+        """
+        Generate response with models chosen by measured latency, error rate and cost.
+        
+        Args:
+            prompt: The input prompt
+            budget: Latency/cost budget and hedging options for this request
+            candidates: Configs to choose from (defaults to all provider configs)
+            context: Additional context for the request
+            
+        Returns:
+            LLMResponse with content and metadata (including routing details)
+        """
+        budget = budget or RequestBudget()
+        ordered = self.router.rank(candidates or self._all_configs(), budget)
+        if not ordered:
+            raise ValueError("No LLM configs available for adaptive routing")
+
+        remaining = list(ordered)
+        while remaining:
+            if budget.hedge and len(remaining) > 1:
+                primary, backup = remaining[0], remaining[1]
+                remaining = remaining[2:]
+                attempt = self._hedged_call(primary, backup, prompt, context, budget)
+            else:
+                attempt = self._timed_call(remaining.pop(0), prompt, context)
+
+            try:
+                config, response = await attempt
+            except Exception as e:
+                logger.warning(f"Adaptive routing attempt failed: {e}")
+                continue
+
+            response.confidence_score = await self._calculate_confidence(response, prompt)
+            self._update_provider_stats(config.provider, response)
+            response.metadata["routing"] = {
+                "selected": self.router.key(config),
+                "ranked": [self.router.key(c) for c in ordered],
+            }
+            return response
+
+        raise Exception("All LLM providers failed for adaptive routing")
+
+    def _all_configs(self) -> List[LLMConfig]:
+        return [config for configs in self.provider_configs.values() for config in configs]
+
+    async def _timed_call(
+        self,
+        config: LLMConfig,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None
+    ):
+        """Call one config and feed the outcome to the router."""
+        start_time = time.perf_counter()
+        try:
+            response = await self._call_llm(config, prompt, context)
+        except Exception:
+            self.router.record(config, time.perf_counter() - start_time, success=False)
+            raise
+        self.router.record(config, time.perf_counter() - start_time, success=True)
+        return config, response
+
+    async def _hedged_call(
+        self,
+        primary: LLMConfig,
+        backup: LLMConfig,
+        prompt: str,
+        context: Optional[Dict[str, Any]],
+        budget: RequestBudget
+    ):
+        """
+        Start the primary; if it has not succeeded within the hedge delay, also
+        start the backup and return whichever succeeds first.
+        """
+        tasks = [asyncio.create_task(self._timed_call(primary, prompt, context))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.router.hedge_delay(primary, budget))
+            if done and tasks[0].exception() is None:
+                return tasks[0].result()
+
+            self.hedge_stats["hedged_requests"] += 1
+            tasks.append(asyncio.create_task(self._timed_call(backup, prompt, context)))
+
+            pending = {task for task in tasks if not task.done()}
+            last_error: Optional[BaseException] = tasks[0].exception() if tasks[0].done() else None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is tasks[1]:
+                            self.hedge_stats["hedge_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            # Losers are cancelled; a cancelled call is not counted as a failure
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """Get latency/error statistics used for adaptive routing."""
+        return {"models": self.router.snapshot(), **self.hedge_stats}
+
     async def _call_llm(
         self,
         config: LLMConfig,
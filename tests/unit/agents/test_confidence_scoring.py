@@ -136,7 +136,7 @@ def test_llm_confidence_integration():
         mock_get_redis_client.return_value = mock_redis_client
         
         # Mock the OpenAI API call
-        with patch('bmad.agents.core.ai.llm_client.requests.post') as mock_post:
+        with patch('bmad.agents.core.ai.llm_client.requests.Session.post') as mock_post:
             # Create a mock API response
             mock_response = MagicMock()
             mock_response.status_code = 200
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests for the architecture EventBus worker pools and history
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from bmad.agents.core.architecture.event_bus import EventBus, EventPriority
+
+
+class TestEventBusHistory:
+    """Test bounded event history"""
+
+    def test_history_is_bounded(self):
+        bus = EventBus(max_history=3)
+        for i in range(5):
+            bus.publish_sync("tick", i, "test")
+
+        history = bus.get_event_history(limit=10)
+        assert isinstance(history, list)
+        assert [e.data for e in history] == [2, 3, 4]
+
+    def test_history_filters(self):
+        bus = EventBus()
+        bus.publish_sync("a", 1, "test")
+        bus.publish_sync("b", 2, "test")
+        bus.publish_sync("a", 3, "test")
+
+        assert [e.data for e in bus.get_event_history(event_name="a")] == [1, 3]
+        assert [e.data for e in bus.get_event_history(limit=1)] == [3]
+
+
+class TestEventBusWorkers:
+    """Test per-priority worker pools"""
+
+    @pytest.mark.asyncio
+    async def test_publish_waits_for_handlers(self):
+        bus = EventBus()
+        received = []
+
+        async def async_handler(event):
+            await asyncio.sleep(0)
+            received.append(("async", event.data))
+
+        def sync_handler(event):
+            received.append(("sync", event.data))
+
+        bus.subscribe("job", async_handler)
+        bus.subscribe("job", sync_handler, priority=EventPriority.HIGH)
+        await bus.publish("job", 42, "test")
+
+        assert sorted(received) == [("async", 42), ("sync", 42)]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_high_priority_not_blocked_by_low(self):
+        bus = EventBus(workers_per_priority={EventPriority.LOW: 1})
+        release = asyncio.Event()
+        handled = []
+
+        async def slow_low(event):
+            await release.wait()
+
+        async def fast_high(event):
+            handled.append(event.data)
+
+        bus.subscribe("low", slow_low)
+        bus.subscribe("high", fast_high)
+
+        low_tasks = [asyncio.create_task(bus.publish("low", i, "test", priority=EventPriority.LOW))
+                     for i in range(3)]
+        await asyncio.sleep(0)
+        await asyncio.wait_for(bus.publish("high", "urgent", "test", priority=EventPriority.CRITICAL),
+                               timeout=1)
+        assert handled == ["urgent"]
+
+        release.set()
+        await asyncio.gather(*low_tasks)
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_nested_publish_does_not_deadlock(self):
+        bus = EventBus(workers_per_priority={EventPriority.NORMAL: 1})
+        received = []
+
+        async def outer(event):
+            await bus.publish("inner", event.data, "test")
+
+        async def inner(event):
+            received.append(event.data)
+
+        bus.subscribe("outer", outer)
+        bus.subscribe("inner", inner)
+        await asyncio.wait_for(bus.publish("outer", "x", "test"), timeout=1)
+
+        assert received == ["x"]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_handler_errors_are_isolated(self):
+        bus = EventBus()
+        received = []
+
+        async def failing(event):
+            raise RuntimeError("boom")
+
+        async def ok(event):
+            received.append(event.data)
+
+        bus.subscribe("job", failing)
+        bus.subscribe("job", ok)
+        await bus.publish("job", 1, "test")
+
+        assert received == [1]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_sync_handlers_use_dedicated_pool(self):
+        bus = EventBus(sync_handler_threads=2)
+        thread_names = []
+
+        def sync_handler(event):
+            thread_names.append(threading.current_thread().name)
+
+        bus.subscribe("job", sync_handler)
+        await bus.publish("job", 1, "test")
+
+        assert thread_names[0].startswith("bmad-event-bus")
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_fails_publishes_in_flight(self):
+        bus = EventBus(workers_per_priority={EventPriority.NORMAL: 1})
+        started = asyncio.Event()
+
+        async def slow(event):
+            started.set()
+            await asyncio.sleep(10)
+
+        bus.subscribe("job", slow)
+        running = asyncio.create_task(bus.publish("job", 1, "test"))
+        await started.wait()
+        queued = asyncio.create_task(bus.publish("job", 2, "test"))
+        await asyncio.sleep(0)
+
+        await bus.stop()
+        for task in (running, queued):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(task, timeout=1)
+
+    def test_restart_on_new_loop_cancels_old_workers(self):
+        bus = EventBus()
+        first_loop, second_loop = asyncio.new_event_loop(), asyncio.new_event_loop()
+        try:
+            first_loop.run_until_complete(bus.start())
+            old_workers = list(bus._workers)
+            second_loop.run_until_complete(bus.start())
+            first_loop.run_until_complete(asyncio.sleep(0))
+
+            assert all(worker.cancelled() for worker in old_workers)
+            assert not any(worker in bus._workers for worker in old_workers)
+            second_loop.run_until_complete(bus.stop())
+        finally:
+            first_loop.close()
+            second_loop.close()
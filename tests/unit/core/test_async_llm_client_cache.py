@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for the AsyncLLMClient two-tier response cache
+"""
+
+import json
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from bmad.core.ai.async_llm_client import (
+    AsyncLLMClient,
+    LLMRequest,
+    TwoTierResponseCache,
+    canonical_cache_key,
+)
+
+RESPONSE = {"content": "hi", "model": "gpt-4", "usage": {"total_tokens": 1}}
+
+
+class TestCanonicalCacheKey:
+    """Test canonical cache keys"""
+
+    def test_key_ignores_dict_order_and_number_spelling(self):
+        a = LLMRequest(prompt="", temperature=1, messages=[{"role": "user", "content": "x"}],
+                       tools=[{"type": "function", "name": "f"}])
+        b = LLMRequest(prompt="", temperature=1.0, messages=[{"content": "x", "role": "user"}],
+                       tools=[{"name": "f", "type": "function"}])
+        assert canonical_cache_key(a) == canonical_cache_key(b)
+
+    def test_prompt_equals_single_user_message(self):
+        a = LLMRequest(prompt="x")
+        b = LLMRequest(prompt="ignored", messages=[{"role": "user", "content": "x"}])
+        assert canonical_cache_key(a) == canonical_cache_key(b)
+
+    def test_key_covers_model_and_tools(self):
+        base = LLMRequest(prompt="x")
+        assert canonical_cache_key(base) != canonical_cache_key(LLMRequest(prompt="x", model="gpt-4o"))
+        assert canonical_cache_key(base) != canonical_cache_key(
+            LLMRequest(prompt="x", tools=[{"type": "function", "name": "f"}]))
+
+
+class TestTwoTierResponseCache:
+    """Test L1 / L2 behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_l1_only_roundtrip_and_lru_eviction(self):
+        cache = TwoTierResponseCache(redis_url=None, max_entries=2)
+        await cache.set("a", RESPONSE)
+        await cache.set("b", RESPONSE)
+        assert await cache.get("a") == RESPONSE
+        await cache.set("c", RESPONSE)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == RESPONSE
+        assert await cache.get("c") == RESPONSE
+
+    @pytest.mark.asyncio
+    async def test_l1_entries_expire(self, monkeypatch):
+        cache = TwoTierResponseCache(redis_url=None, ttl=10)
+        now = [1000.0]
+        monkeypatch.setattr("bmad.core.ai.async_llm_client.time.monotonic", lambda: now[0])
+        await cache.set("a", RESPONSE)
+        now[0] += 11
+        assert await cache.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_hits_are_promoted_to_l1(self):
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        writer = TwoTierResponseCache(redis_client=redis)
+        await writer.set_many({"a": RESPONSE, "b": RESPONSE})
+        assert await redis.ttl("a") > 0
+
+        reader = TwoTierResponseCache(redis_client=redis)
+        result = await reader.get_many(["a", "b", "missing"])
+        assert result == {"a": RESPONSE, "b": RESPONSE, "missing": None}
+        assert reader.stats == {"l1_hits": 0, "l2_hits": 2, "misses": 1}
+
+        await reader.get("a")
+        assert reader.stats["l1_hits"] == 1
+        await redis.aclose()
+
+    @pytest.mark.asyncio
+    async def test_batch_lookup_uses_single_round_trip(self):
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        cache = TwoTierResponseCache(redis_client=redis)
+        calls = []
+        original_mget = redis.mget
+
+        async def counting_mget(keys):
+            calls.append(list(keys))
+            return await original_mget(keys)
+
+        redis.mget = counting_mget
+        await cache.set("a", RESPONSE)
+        await cache.get_many(["a", "b", "c", "b"])
+
+        assert calls == [["b", "c"]]
+        await redis.aclose()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_redis_falls_back_to_l1(self):
+        cache = TwoTierResponseCache(redis_url="redis://127.0.0.1:1/0")
+        await cache.set("a", RESPONSE)
+        assert await cache.get("a") == RESPONSE
+        assert await cache.get("b") is None
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_is_retried_after_backoff(self):
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        cache = TwoTierResponseCache(redis_client=redis, retry_after=30)
+
+        async def broken_mget(keys):
+            raise ConnectionError("redis restarting")
+
+        real_mget = redis.mget
+        redis.mget = broken_mget
+        assert await cache.get("a") is None
+        redis.mget = real_mget
+        await redis.set("a", json.dumps(RESPONSE))
+
+        # Inside the backoff window Redis is skipped
+        assert await cache.get("a") is None
+        # Once the window has passed it is used again
+        cache._redis_retry_at = 0.0
+        assert await cache.get("a") == RESPONSE
+        assert cache._redis_failures == 0
+        await redis.aclose()
+
+    @pytest.mark.asyncio
+    async def test_backoff_grows_on_repeated_failures(self):
+        cache = TwoTierResponseCache(redis_url="redis://127.0.0.1:1/0", retry_after=30, max_retry_after=100)
+        windows = []
+        for _ in range(4):
+            await cache.get("a")
+            windows.append(round(cache._redis_retry_at - time.monotonic()))
+            cache._redis_retry_at = 0.0
+        assert windows == [30, 60, 100, 100]
+        await cache.close()
+
+
+class TestAsyncLLMClientCache:
+    """Test client integration"""
+
+    @pytest.mark.asyncio
+    async def test_batch_served_from_cache_without_upstream(self):
+        # Nothing listens on this port: any upstream call would return an error
+        client = AsyncLLMClient(api_key="test", base_url="http://127.0.0.1:1/v1",
+                                redis_url=None, max_retries=0)
+        requests = [LLMRequest(prompt="a"), LLMRequest(prompt="b")]
+        for request in requests:
+            await client.cache.set(client._generate_cache_key(request), RESPONSE)
+
+        responses = await client.ask_batch(requests)
+        await client.close()
+
+        assert all(r.cached and r.content == "hi" for r in responses)
+        assert client.upstream_calls == 0
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for AsyncLLMClient bounded concurrency and request coalescing
+against a local stub HTTP server
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from bmad.core.ai.async_llm_client import (
+    AdaptiveConcurrencyLimiter,
+    AsyncLLMClient,
+    LLMRequest,
+)
+
+
+class StubProvider:
+    """Minimal chat completions endpoint that records concurrency"""
+
+    def __init__(self, delay: float = 0.02, throttle_first: int = 0):
+        self.delay = delay
+        self.throttle_first = throttle_first
+        self.calls = 0
+        self.active = 0
+        self.peak_active = 0
+
+    async def handle(self, request):
+        self.calls += 1
+        if self.calls <= self.throttle_first:
+            return web.Response(status=429, text="slow down", headers={"Retry-After": "0"})
+
+        payload = await request.json()
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        prompt = payload["messages"][0]["content"]
+        return web.json_response({
+            "choices": [{"message": {"content": f"echo: {prompt}"}}],
+            "usage": {"total_tokens": 1},
+        })
+
+
+@pytest.fixture
+async def stub_server():
+    servers = []
+
+    async def start(**kwargs):
+        provider = StubProvider(**kwargs)
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", provider.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        servers.append(runner)
+        return provider, f"http://127.0.0.1:{port}/v1"
+
+    yield start
+    for runner in servers:
+        await runner.cleanup()
+
+
+def make_client(base_url: str, **kwargs) -> AsyncLLMClient:
+    return AsyncLLMClient(api_key="test", base_url=base_url, backoff_base=0, redis_url=None, **kwargs)
+
+
+class TestAsyncLLMClientConcurrency:
+    """Test bounded batching and coalescing"""
+
+    @pytest.mark.asyncio
+    async def test_batch_respects_concurrency_limit(self, stub_server):
+        provider, base_url = await stub_server()
+        client = make_client(base_url, max_concurrency=3)
+
+        responses = await client.ask_batch([LLMRequest(prompt=f"p{i}") for i in range(12)])
+        await client.close()
+
+        assert [r.content for r in responses] == [f"echo: p{i}" for i in range(12)]
+        assert provider.peak_active <= 3
+        assert client.limiter.peak_in_flight <= 3
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_are_coalesced(self, stub_server):
+        provider, base_url = await stub_server(delay=0.05)
+        client = make_client(base_url)
+
+        responses = await client.ask_batch([LLMRequest(prompt="same") for _ in range(5)])
+        await client.close()
+
+        assert provider.calls == 1
+        assert all(r.content == "echo: same" for r in responses)
+        assert sum(r.coalesced for r in responses) == 4
+        assert client.get_stats()["coalesced_requests"] == 4
+
+    @pytest.mark.asyncio
+    async def test_throttling_backs_off_and_retries(self, stub_server):
+        provider, base_url = await stub_server(throttle_first=2)
+        client = make_client(base_url, max_concurrency=4)
+
+        response = await client.ask_async(LLMRequest(prompt="retry me"))
+        await client.close()
+
+        assert response.error is None
+        assert response.content == "echo: retry me"
+        assert provider.calls == 3
+        assert client.limiter.throttle_events == 2
+        # Halved twice, then one additive step after the successful call
+        assert client.limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, stub_server):
+        provider, base_url = await stub_server(throttle_first=10)
+        client = make_client(base_url, max_retries=1)
+
+        response = await client.ask_async(LLMRequest(prompt="nope"))
+        await client.close()
+
+        assert response.error == "API error: 429"
+        assert provider.calls == 2
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD limit adjustments"""
+
+    def test_additive_increase_multiplicative_decrease(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=8, initial_concurrency=4)
+        limiter.on_throttle()
+        assert limiter.limit == 2
+        limiter.on_success()
+        limiter.on_success()
+        assert limiter.limit == 3
+        for _ in range(50):
+            limiter.on_success()
+        assert limiter.limit == 8
+
+    def test_never_below_minimum(self):
+        limiter = AdaptiveConcurrencyLimiter(max_concurrency=2, min_concurrency=1)
+        for _ in range(5):
+            limiter.on_throttle()
+        assert limiter.limit == 1
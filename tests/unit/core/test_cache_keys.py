@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests voor canonieke cache key generatie.
+"""
+
+import datetime
+from dataclasses import dataclass
+from enum import Enum
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.data import cache_keys
+from bmad.agents.core.data import redis_cache as redis_cache_module
+from bmad.agents.core.data.cache_keys import KeyBuilder, encode_key, make_key
+from bmad.agents.core.data.redis_cache import RedisCache, cached
+
+
+@dataclass
+class Config:
+    name: str
+    retries: int = 3
+
+
+class Color(Enum):
+    RED = 1
+
+
+class Agent:
+    def __init__(self, state):
+        self.state = state
+
+
+class TestEncodeKey:
+    """Test de structurele encoding"""
+
+    def test_mapping_order_does_not_matter(self):
+        assert encode_key({"a": 1, "b": [1, 2]}) == encode_key({"b": [1, 2], "a": 1})
+        assert encode_key({3, 1, 2}) == encode_key({1, 2, 3})
+
+    @pytest.mark.parametrize("a, b", [
+        (1, True), (1, 1.0), (1, "1"), ("1", b"1"), ([1], (1,)), (None, "None"),
+        (["ab", "c"], ["a", "bc"]), ({"a": "b"}, ["a", "b"]), (Color.RED, 1),
+    ])
+    def test_distinct_values_do_not_collide(self, a, b):
+        assert encode_key(a) != encode_key(b)
+
+    def test_dataclasses_are_keyed_by_value(self):
+        assert encode_key(Config("x")) == encode_key(Config("x"))
+        assert encode_key(Config("x")) != encode_key(Config("y"))
+
+    def test_objects_are_keyed_by_type(self):
+        assert encode_key(Agent(1)) == encode_key(Agent(2))
+
+    def test_value_types_use_str(self):
+        day = datetime.date(2024, 1, 1)
+        assert encode_key(day) == encode_key(datetime.date(2024, 1, 1))
+        assert encode_key(day) != encode_key("2024-01-01")
+
+    def test_cycles_are_safe(self):
+        items = [1]
+        items.append(items)
+        assert encode_key(items) == encode_key(items)
+
+
+class TestMakeKey:
+    """Test hashing"""
+
+    def test_key_is_stable_hex(self):
+        key = make_key("func", (1, {"b": 2, "a": 1}), {"x": "y"})
+        assert key == make_key("func", (1, {"a": 1, "b": 2}), {"x": "y"})
+        assert len(key) == 32
+        int(key, 16)
+
+    def test_fallback_without_xxhash(self):
+        with patch.object(cache_keys, "xxhash", None):
+            key = make_key("func", (1,))
+        assert len(key) == 32
+        assert key != make_key("func", (2,))
+
+
+class TestKeyBuilder:
+    """Test argument normalisatie"""
+
+    @staticmethod
+    def func(self, x, y=2, *, debug=False):
+        return x + y
+
+    def test_positional_and_keyword_calls_share_a_key(self):
+        builder = KeyBuilder(self.func)
+        calls = [((None, 1), {}), ((None, 1, 2), {}), ((None,), {"x": 1, "y": 2})]
+        keys = {make_key("f", *builder.arguments(args, kwargs)) for args, kwargs in calls}
+        assert len(keys) == 1
+
+    def test_include_and_exclude(self):
+        builder = KeyBuilder(self.func, exclude=["self", "debug"])
+        assert builder.arguments((Agent(1), 1), {"debug": True}) == ((), {"x": 1, "y": 2})
+        builder = KeyBuilder(self.func, include=["x"])
+        assert builder.arguments((None, 1, 5), {}) == ((), {"x": 1})
+
+    def test_unknown_parameter_is_rejected(self):
+        with pytest.raises(ValueError):
+            KeyBuilder(self.func, exclude=["z"])
+
+    def test_invalid_call_keeps_raw_arguments(self):
+        builder = KeyBuilder(self.func)
+        assert builder.arguments((), {"z": 1}) == ((), {"z": 1})
+
+
+class TestDecoratorKeys:
+    """Test keys in de cached decorator"""
+
+    def test_equivalent_calls_hit_the_same_entry(self):
+        with patch.object(redis_cache_module, "cache") as mock_cache:
+            mock_cache.get.return_value = None
+            mock_cache.default_ttls = {}
+
+            @cached(ttl=60, key_prefix="test", key_exclude=["verbose"])
+            def func(options, verbose=False):
+                return options
+
+            func({"a": 1, "b": 2})
+            func(options={"b": 2, "a": 1}, verbose=True)
+
+        first, second = (call.args[0] for call in mock_cache.get.call_args_list)
+        assert first == second
+
+    def test_parameter_named_func_name(self):
+        @cached(ttl=60)
+        def func(func_name):
+            return func_name
+
+        with patch.object(redis_cache_module, "cache") as mock_cache:
+            mock_cache.get.return_value = None
+            assert func("x") == "x"
+
+    def test_method_uses_module_key(self):
+        cache = RedisCache.__new__(RedisCache)
+        assert cache._generate_key("f", 1, a=2) == redis_cache_module._generate_key("f", 1, a=2)
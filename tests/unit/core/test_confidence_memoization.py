@@ -0,0 +1,85 @@
+"""
+Tests for memoized confidence scoring and the llm_client heuristics.
+"""
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.ai import llm_client
+from bmad.agents.core.ai.confidence_scoring import ConfidenceScoring
+from bmad.agents.core.ai.memoization import ContentMemo, content_hash
+
+# The package re-exports a `confidence_scoring` instance under the module name
+confidence_module = sys.modules["bmad.agents.core.ai.confidence_scoring"]
+
+
+class TestContentMemo:
+    """Test the bounded memo."""
+
+    def test_lru_eviction(self):
+        memo = ContentMemo(maxsize=2)
+        memo.get_or_compute("a", lambda: 1)
+        memo.get_or_compute("b", lambda: 2)
+        memo.get_or_compute("a", lambda: 0)  # refresh a
+        memo.get_or_compute("c", lambda: 3)  # evicts b
+
+        assert memo.get_or_compute("a", lambda: -1) == 1
+        assert memo.get_or_compute("b", lambda: -2) == -2
+        assert len(memo) == 2
+
+    def test_content_hash_separates_parts(self):
+        assert content_hash("ab", "c") != content_hash("a", "bc")
+        assert content_hash(None) != content_hash("")
+        assert content_hash("x") == content_hash("x")
+
+
+class TestHeuristics:
+    """Test the llm_client heuristics."""
+
+    def test_security_risk_unchanged(self):
+        context = {"agent": "SecurityDeveloper", "task": "rotate token"}
+        risk = llm_client.assess_security_risk("delete the admin password", context)
+        # delete/admin/password in the output, token in the context, +0.2 for the agent
+        assert risk == pytest.approx(0.6)
+
+    def test_logprob_confidence_is_the_mean(self):
+        values = [-0.001 * i for i in range(500)]
+        data = {"choices": [{"logprobs": {"content": [{"logprob": v} for v in values]}}]}
+        assert llm_client.calculate_confidence_from_logprobs(data) == pytest.approx(
+            (sum(values) / len(values) + 2.0) / 2.0)
+
+
+class TestEnhanceAgentOutputMemo:
+    """Test memoized scoring in ConfidenceScoring."""
+
+    def test_repeated_output_is_scored_once(self):
+        scoring = ConfidenceScoring()
+        with patch.object(confidence_module, "calculate_confidence",
+                          wraps=confidence_module.calculate_confidence) as calc:
+            first = scoring.enhance_agent_output("same output", "Architect", "design_api")
+            second = scoring.enhance_agent_output("same output", "Architect", "design_api")
+
+        assert calc.call_count == 1
+        assert first["confidence"] == second["confidence"]
+        assert first["review_required"] == second["review_required"]
+        # Metadata stays per call
+        assert second["metadata"]["context"] is not first["metadata"]["context"]
+
+    def test_context_changes_invalidate(self):
+        scoring = ConfidenceScoring()
+        low = scoring.enhance_agent_output("x", "TestEngineer", "unit", {"llm_confidence": 0.0})
+        high = scoring.enhance_agent_output("x", "TestEngineer", "unit", {"llm_confidence": 1.0})
+        assert high["confidence"] > low["confidence"]
+
+    def test_extra_context_is_scored_without_memo(self):
+        scoring = ConfidenceScoring()
+        scoring.enhance_agent_output("x", "TestEngineer", "unit", {"obj": object()})
+        scoring.enhance_agent_output("x", "TestEngineer", "unit", {"note": "rotate the admin password"})
+        assert len(scoring._score_memo) == 0
+
+    def test_key_does_not_serialize_context(self):
+        scoring = ConfidenceScoring()
+        with patch("json.dumps", side_effect=AssertionError("key must not serialize the context")):
+            scoring.enhance_agent_output("x", "TestEngineer", "unit", {"llm_confidence": 0.7})
+        assert len(scoring._score_memo) == 1
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tests for LLM context compaction
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from bmad.core.ai.async_llm_client import AsyncLLMClient, LLMRequest
+from bmad.core.ai.context_compaction import (
+    REPEATED_MARKER,
+    TRUNCATION_MARKER,
+    ContextCompactor,
+    estimate_message_tokens,
+    estimate_tokens,
+)
+
+SPEC = "Project specification. " * 20
+
+
+@pytest.fixture(autouse=True)
+def no_tokenizer_download():
+    # Keep the estimate deterministic and offline
+    with patch("bmad.core.ai.context_compaction._get_encoding", return_value=None):
+        yield
+
+
+class TestContextCompactor:
+    """Test ContextCompactor"""
+
+    def test_only_system_messages_are_normalized(self):
+        compactor = ContextCompactor()
+        messages = [
+            {"role": "user", "content": "earlier  \r\n"},
+            {"role": "system", "content": "You are an agent.   \r\nBe brief.  "},
+            {"role": "assistant", "content": "ok  "},
+            {"role": "user", "content": "final  "},
+        ]
+        compacted = compactor.compact(messages)
+
+        # Order kept, system prompt byte-stable, conversation as sent
+        assert [m["role"] for m in compacted] == [m["role"] for m in messages]
+        assert compacted[1]["content"] == "You are an agent.\nBe brief."
+        assert [compacted[i] for i in (0, 2, 3)] == [messages[i] for i in (0, 2, 3)]
+        assert compactor.compact(compacted) is compacted
+        assert compactor.stats.requests == 1
+
+    def test_repeated_sections_are_removed_from_later_messages(self):
+        compactor = ContextCompactor(min_section_chars=50)
+        messages = [
+            {"role": "system", "content": f"Rules.\n\n{SPEC.strip()}"},
+            {"role": "user", "content": f"{SPEC}\n\nFirst question"},
+            {"role": "assistant", "content": SPEC},
+            {"role": "user", "content": f"Second question\n\n{SPEC}\n\n{SPEC}"},
+        ]
+        compacted = compactor.compact(messages)
+
+        # System and final message untouched, later copies removed, no message dropped
+        assert compacted[0] == messages[0]
+        assert compacted[-1] == messages[-1]
+        assert compacted[1]["content"] == "First question"
+        assert compacted[2] == {"role": "assistant", "content": REPEATED_MARKER}
+        assert [m["role"] for m in compacted] == ["system", "user", "assistant", "user"]
+        assert compactor.stats.sections_deduplicated == 2
+        assert compactor.stats.tokens_saved > 0
+
+    def test_repeated_user_content_is_kept_within_budget(self):
+        compactor = ContextCompactor(min_section_chars=50)
+        messages = [
+            {"role": "system", "content": "Rules."},
+            {"role": "user", "content": f"{SPEC}\n\n{SPEC}\n\nFirst question"},
+            {"role": "assistant", "content": "ok"},
+            {"role": "user", "content": "Second question"},
+        ]
+        assert compactor.compact(messages) is messages
+
+        budget = estimate_message_tokens(messages) - 10
+        compacted = compactor.compact(messages, token_budget=budget)
+        assert compacted[1]["content"] == f"{SPEC}\n\nFirst question"
+        assert compactor.stats.sections_deduplicated == 1
+
+    def test_compacted_prefix_is_stable_as_conversation_grows(self):
+        compactor = ContextCompactor(min_section_chars=50)
+        first = [
+            {"role": "system", "content": f"Rules.  \n\n{SPEC}"},
+            {"role": "user", "content": f"{SPEC}\n\nFirst question"},
+            {"role": "assistant", "content": "First answer"},
+            {"role": "user", "content": "Second question"},
+        ]
+        second = first + [
+            {"role": "assistant", "content": "Second answer"},
+            {"role": "user", "content": f"{SPEC}\n\nThird question"},
+        ]
+        compacted_first = compactor.compact(first)
+        compacted_second = compactor.compact(second)
+
+        assert compacted_second[:3] == compacted_first[:3]
+        assert compacted_second[1]["content"] == "First question"
+
+    def test_short_sections_are_kept(self):
+        compactor = ContextCompactor()
+        messages = [
+            {"role": "user", "content": "ok\n\nthanks"},
+            {"role": "assistant", "content": "ok\n\nsure"},
+        ]
+        assert compactor.compact(messages) == messages
+
+    def test_duplicate_short_messages_are_kept(self):
+        compactor = ContextCompactor(min_section_chars=50)
+        messages = [
+            {"role": "user", "content": f"{SPEC}\n\nyes"},
+            {"role": "assistant", "content": "ok"},
+            {"role": "user", "content": f"{SPEC}\n\nyes"},
+            {"role": "assistant", "content": "ok"},
+            {"role": "user", "content": "yes"},
+        ]
+        assert compactor.compact(messages) is messages
+
+        budget = estimate_message_tokens(messages) - 10
+        compacted = compactor.compact(messages, token_budget=budget)
+
+        # Only the repeated section goes; roles keep alternating
+        assert [m["role"] for m in compacted] == [m["role"] for m in messages]
+        assert compacted[2]["content"] == "yes"
+        assert compacted[3:] == messages[3:]
+
+    def test_budget_drops_oldest_turns_first(self):
+        compactor = ContextCompactor()
+        history = [{"role": "user" if i % 2 else "assistant", "content": f"turn {i} " * 50}
+                   for i in range(6)]
+        messages = [{"role": "system", "content": "system"}] + history + [{"role": "user", "content": "final"}]
+        budget = estimate_message_tokens([messages[0], history[-1], messages[-1]]) + 1
+
+        compacted = compactor.compact(messages, token_budget=budget)
+
+        assert estimate_message_tokens(compacted) <= budget
+        assert compacted[0]["content"] == "system"
+        assert compacted[-1]["content"] == "final"
+        assert compacted[1] == history[-1]
+
+    def test_budget_truncates_long_final_message(self):
+        compactor = ContextCompactor()
+        text = "start " + "filler " * 2000 + "end"
+        compacted = compactor.compact([{"role": "user", "content": text}], token_budget=200)
+
+        content = compacted[0]["content"]
+        assert TRUNCATION_MARKER in content
+        assert content.startswith("start")
+        assert content.endswith("end")
+        assert estimate_message_tokens(compacted) <= 200
+
+    def test_character_estimate_without_tokenizer(self):
+        with patch("bmad.core.ai.context_compaction._get_encoding", return_value=None):
+            assert estimate_tokens("") == 0
+            assert estimate_tokens("abcd") == 1
+            assert estimate_tokens("abcde") == 2
+
+
+class TestAsyncClientCompaction:
+    """Test compaction in AsyncLLMClient"""
+
+    def test_conversation_only_compacted_over_budget(self):
+        request = LLMRequest(prompt="", messages=[{"role": "user", "content": SPEC},
+                                                  {"role": "system", "content": "s"},
+                                                  {"role": "user", "content": "q"}])
+        assert AsyncLLMClient(redis_url=None)._prepare_request(request) is request
+
+        client = AsyncLLMClient(redis_url=None, context_token_budget=20)
+        compacted = client._prepare_request(request).messages
+        assert [m["role"] for m in compacted] == ["system", "user"]
+        assert compacted[-1]["content"] == "q"
+
+    def test_compaction_can_be_disabled(self):
+        client = AsyncLLMClient(redis_url=None, compact_context=False)
+        request = LLMRequest(prompt="", messages=[{"role": "user", "content": "q"},
+                                                  {"role": "system", "content": "s"}])
+        assert client._prepare_request(request) is request
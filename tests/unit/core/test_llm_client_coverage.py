@@ -359,7 +359,7 @@ class TestAskOpenAIWithConfidence:
     
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     def test_successful_api_call(self, mock_cache_get, mock_post, mock_file_cache_get):
         """Test successful API call."""
@@ -402,7 +402,7 @@ class TestAskOpenAIWithConfidence:
     
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     @patch('bmad.agents.core.data.redis_cache.cache.set')
     def test_structured_output_parsing(self, mock_cache_set, mock_cache_get, mock_post, mock_file_cache_get):
@@ -437,7 +437,7 @@ class TestAskOpenAIWithConfidence:
 
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     def test_invalid_json_structured_output(self, mock_cache_get, mock_post, mock_file_cache_get):
         """Test handling of invalid JSON in structured output with cache testing."""
@@ -469,7 +469,7 @@ class TestAskOpenAIWithConfidence:
         assert isinstance(result["llm_confidence"], float)
     
     @patch.dict(os.environ, {'OPENAI_API_KEY': 'test-key'})
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     def test_api_error_handling(self, mock_cache_get, mock_post):
         """Test API error handling."""
@@ -478,7 +478,7 @@ class TestAskOpenAIWithConfidence:
         with patch('bmad.agents.core.data.redis_cache.cache.get') as mock_cache_get:
             mock_cache_get.return_value = None
             
-            with patch('requests.post') as mock_post:
+            with patch('requests.Session.post') as mock_post:
                 mock_post.side_effect = requests.exceptions.RequestException("API Error")
                 
                 # The decorator might handle the error by returning a cached result
@@ -497,7 +497,7 @@ class TestAskOpenAIWithConfidence:
     
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     @patch('bmad.agents.core.data.redis_cache.cache.set')
     @pytest.mark.asyncio
@@ -581,7 +581,7 @@ class TestLLMClientIntegration:
     
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     @patch('bmad.agents.core.data.redis_cache.cache.set')
     def test_full_workflow_with_cache(self, mock_cache_set, mock_cache_get, mock_post, mock_file_cache_get):
@@ -611,7 +611,7 @@ class TestLLMClientIntegration:
 
     @patch('bmad.agents.core.ai.llm_client.OPENAI_API_KEY', 'test-key')
     @patch('bmad.agents.core.ai.llm_client._file_cache_get')
-    @patch('requests.post')
+    @patch('requests.Session.post')
     @patch('bmad.agents.core.data.redis_cache.cache.get')
     @pytest.mark.asyncio
     async def test_confidence_scoring_workflow(self, mock_cache_get, mock_post, mock_file_cache_get):
@@ -638,4 +638,125 @@ class TestLLMClientIntegration:
         assert result["answer"] == "Test response"
         assert isinstance(result["llm_confidence"], float)
         assert 0.0 <= result["llm_confidence"] <= 1.0  # Confidence should be between 0 and 1
-        assert mock_post.called  # API was called 
\ No newline at end of file
+        assert mock_post.called  # API was called 
+
+class TestHttpSession:
+    """Test pooled HTTP session."""
+    
+    def test_session_is_reused(self):
+        """Test that the same keep-alive session serves every call."""
+        from bmad.agents.core.ai.llm_client import get_http_session
+        assert get_http_session() is get_http_session()
+    
+    def test_configure_rebuilds_session_with_pool_size(self):
+        """Test that configuring the pool replaces the session."""
+        from bmad.agents.core.ai import llm_client
+        original = (llm_client.HTTP_POOL_SIZE, llm_client.HTTP_CONNECT_TIMEOUT, llm_client.HTTP_READ_TIMEOUT)
+        old_session = llm_client.get_http_session()
+        try:
+            llm_client.configure_http_session(pool_size=3, connect_timeout=1, read_timeout=2)
+            session = llm_client.get_http_session()
+            assert session is not old_session
+            assert session.get_adapter("https://api.openai.com")._pool_maxsize == 3
+        finally:
+            llm_client.configure_http_session(*original)
+    
+    @patch('bmad.agents.core.ai.llm_client._file_cache_get', return_value=None)
+    @patch('bmad.agents.core.data.redis_cache.cache.get', return_value=None)
+    @patch('requests.Session.post')
+    def test_no_stdout_on_hot_path(self, mock_post, mock_cache_get, mock_file_cache_get, capsys):
+        """Test that a call does not print and uses the configured timeouts."""
+        from bmad.agents.core.ai import llm_client
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "ok"}}]}
+        mock_post.return_value = mock_response
+        
+        ask_openai_with_confidence("hot path prompt", {"task": "test", "agent": "TestEngineer"})
+        
+        assert capsys.readouterr().out == ""
+        assert mock_post.call_args.kwargs["timeout"] == (llm_client.HTTP_CONNECT_TIMEOUT, llm_client.HTTP_READ_TIMEOUT)
+
+
+class TestAgentModelResolution:
+    """Test cached agent YAML model resolution."""
+    
+    @pytest.fixture
+    def agent_root(self, tmp_path, monkeypatch):
+        from bmad.agents.core.ai import llm_client
+        monkeypatch.setattr(llm_client, "AGENT_CONFIG_ROOT", tmp_path)
+        monkeypatch.setattr(llm_client, "AGENT_CONFIG_CHECK_INTERVAL", 0)
+        monkeypatch.delenv("BMAD_LLM_CACHEDAGENT_MODEL", raising=False)
+        llm_client.clear_agent_config_cache()
+        (tmp_path / "CachedAgent").mkdir()
+        yield tmp_path / "CachedAgent" / "cachedagent.yaml"
+        llm_client.clear_agent_config_cache()
+    
+    def test_yaml_parsed_once_until_file_changes(self, agent_root):
+        """Test that the YAML is only re-parsed when its mtime changes."""
+        from bmad.agents.core.ai import llm_client
+        agent_root.write_text("llm:\n  model: model-a\n")
+        
+        with patch.object(llm_client.yaml, "safe_load", wraps=llm_client.yaml.safe_load) as safe_load:
+            assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == "model-a"
+            assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == "model-a"
+            assert safe_load.call_count == 1
+            
+            agent_root.write_text("llm_model: model-b\n")
+            stat = agent_root.stat()
+            os.utime(agent_root, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == "model-b"
+            assert safe_load.call_count == 2
+        
+        assert llm_client.get_agent_model_routes()["CachedAgent"] == "model-b"
+    
+    def test_missing_yaml_falls_back_to_default(self, agent_root):
+        """Test that agents without YAML resolve to the project default."""
+        from bmad.agents.core.ai import llm_client
+        assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == llm_client.OPENAI_MODEL
+        
+        agent_root.write_text("llm:\n  model: model-c\n")
+        assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == "model-c"
+    
+    def test_routes_are_built_from_all_agent_directories(self, agent_root):
+        """Test that the routing table covers agents that were never resolved."""
+        from bmad.agents.core.ai import llm_client
+        agent_root.write_text("llm:\n  model: model-a\n")
+        (agent_root.parent.parent / "OtherAgent").mkdir()
+        (agent_root.parent.parent / "OtherAgent" / "otheragent.yaml").write_text("llm_model: model-o\n")
+        
+        routes = llm_client.load_agent_model_routes()
+        assert routes == {"CachedAgent": "model-a", "OtherAgent": "model-o"}
+        assert llm_client.get_agent_model_routes() == routes
+    
+    def test_routes_store_effective_model(self, agent_root, monkeypatch):
+        """Test that agents without a YAML model are routed to the model actually used."""
+        from bmad.agents.core.ai import llm_client
+        (agent_root.parent.parent / "EnvAgent").mkdir()
+        monkeypatch.setenv("BMAD_LLM_ENVAGENT_MODEL", "model-env")
+        
+        routes = llm_client.load_agent_model_routes()
+        assert routes == {"CachedAgent": llm_client.OPENAI_MODEL, "EnvAgent": "model-env"}
+    
+    def test_agent_config_cache_is_bounded(self, agent_root, monkeypatch):
+        """Test that arbitrary agent names cannot grow the cache without bound."""
+        from bmad.agents.core.ai import llm_client
+        monkeypatch.setattr(llm_client, "AGENT_CONFIG_CACHE_SIZE", 3)
+        agent_root.write_text("llm:\n  model: model-a\n")
+        
+        llm_client.resolve_agent_model({"agent": "CachedAgent"}, None)
+        for i in range(5):
+            llm_client.resolve_agent_model({"agent": f"Unknown{i}"}, None)
+        llm_client.resolve_agent_model({"agent": "CachedAgent"}, None)
+        
+        assert list(llm_client._agent_configs) == ["Unknown3", "Unknown4", "CachedAgent"]
+    
+    def test_check_interval_skips_filesystem(self, agent_root, monkeypatch):
+        """Test that lookups within the check interval do not touch the filesystem."""
+        from bmad.agents.core.ai import llm_client
+        agent_root.write_text("llm:\n  model: model-a\n")
+        llm_client.resolve_agent_model({"agent": "CachedAgent"}, None)
+        monkeypatch.setattr(llm_client, "AGENT_CONFIG_CHECK_INTERVAL", 3600)
+        
+        with patch.object(llm_client, "_find_agent_yaml") as find:
+            assert llm_client.resolve_agent_model({"agent": "CachedAgent"}, None) == "model-a"
+            find.assert_not_called()
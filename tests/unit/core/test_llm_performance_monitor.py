@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for LLMPerformanceMonitor histograms and per-model/per-agent breakdown
+"""
+
+import json
+import math
+
+import pytest
+
+from bmad.core.ai.async_llm_client import (
+    AsyncLLMClient,
+    LatencyHistogram,
+    LLMPerformanceMonitor,
+    LLMRequest,
+    LLMResponse,
+)
+
+
+class TestLatencyHistogram:
+    """Test LatencyHistogram"""
+
+    def test_fixed_memory(self):
+        histogram = LatencyHistogram()
+        buckets = len(histogram.counts)
+        for i in range(10000):
+            histogram.record((i % 500) / 100)
+        assert len(histogram.counts) == buckets
+        assert histogram.count == 10000
+
+    def test_percentiles_within_bucket_error(self):
+        histogram = LatencyHistogram(buckets_per_octave=4)
+        values = [0.1] * 90 + [2.0] * 9 + [30.0]
+        for value in values:
+            histogram.record(value)
+
+        growth = 2 ** 0.25
+        assert 0.1 <= histogram.percentile(0.5) <= 0.1 * growth
+        assert 2.0 <= histogram.percentile(0.95) <= 2.0 * growth
+        # Clamped to the observed maximum
+        assert histogram.percentile(1.0) == 30.0
+        assert histogram.to_dict()["mean"] == pytest.approx(sum(values) / len(values))
+
+    def test_out_of_range_values(self):
+        histogram = LatencyHistogram(min_value=0.01, max_value=1.0)
+        histogram.record(0.0)
+        histogram.record(5.0)
+        assert histogram.counts[0] == 1
+        assert histogram.counts[-1] == 1
+        assert histogram.upper_bound(len(histogram.counts) - 1) == math.inf
+        assert histogram.percentile(0.99) == 5.0
+        assert histogram.to_dict()["buckets"][-1] == ["+Inf", 1]
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(0.95) is None
+
+
+class TestLLMPerformanceMonitor:
+    """Test LLMPerformanceMonitor"""
+
+    def test_per_model_and_agent_breakdown(self):
+        monitor = LLMPerformanceMonitor()
+        monitor.record_request(1.0, model="gpt-4", agent="Architect", prompt_tokens=100, completion_tokens=50)
+        monitor.record_request(0.01, cached=True, model="gpt-4", agent="TestEngineer")
+        monitor.record_request(2.0, error=True, model="gpt-4o-mini", agent="Architect")
+        monitor.record_request(0.5, model="gpt-4", ttft=0.2, completion_tokens=50)
+
+        snapshot = monitor.snapshot()
+        gpt4 = snapshot["models"]["gpt-4"]
+        assert gpt4["requests"] == 3
+        assert gpt4["cache_hits"] == 1
+        assert gpt4["cache_hit_ratio"] == pytest.approx(1 / 3)
+        assert gpt4["completion_tokens_per_second"] == pytest.approx(100 / 1.5)
+        assert gpt4["time_to_first_token"]["count"] == 1
+        assert snapshot["agents"]["Architect"]["errors"] == 1
+        assert snapshot["totals"]["requests"] == 4
+        # Snapshot is plain data
+        json.dumps(snapshot, allow_nan=False)
+
+    def test_snapshot_with_overflow_is_strict_json(self):
+        monitor = LLMPerformanceMonitor()
+        monitor.record_request(10_000.0, model="gpt-4")
+        snapshot = monitor.snapshot()
+        assert snapshot["totals"]["latency"]["buckets"] == [["+Inf", 1]]
+        json.loads(json.dumps(snapshot, allow_nan=False))
+
+    def test_get_stats_keeps_legacy_keys(self):
+        monitor = LLMPerformanceMonitor()
+        monitor.record_request(0.2)
+        monitor.record_request(0.4, cached=True)
+        stats = monitor.get_stats()
+
+        assert stats["total_requests"] == 2
+        assert stats["cache_hit_rate"] == 50.0
+        assert stats["avg_response_time"] == pytest.approx(0.3)
+        assert stats["p95_response_time"] == pytest.approx(0.4)
+
+    def test_label_cardinality_is_bounded(self):
+        monitor = LLMPerformanceMonitor(max_labels=2)
+        for i in range(5):
+            monitor.record_request(0.1, model=f"model-{i}")
+        models = monitor.snapshot()["models"]
+        assert len(models) == 3
+        assert models[LLMPerformanceMonitor.OTHER_LABEL]["requests"] == 3
+
+    def test_reset(self):
+        monitor = LLMPerformanceMonitor()
+        monitor.record_request(0.1, model="m")
+        monitor.reset()
+        assert monitor.snapshot()["models"] == {}
+        assert monitor.get_stats()["total_requests"] == 0
+
+
+class TestAsyncClientReporting:
+    """Test that AsyncLLMClient reports to its monitor"""
+
+    @pytest.mark.asyncio
+    async def test_upstream_and_cache_hits_are_recorded(self):
+        monitor = LLMPerformanceMonitor()
+        client = AsyncLLMClient(redis_url=None, monitor=monitor)
+
+        async def fake_upstream(request, cache_key):
+            response = LLMResponse(content="ok", model=request.model,
+                                   usage={"prompt_tokens": 3, "completion_tokens": 7}, response_time=0.05)
+            await client._cache_response(cache_key, response)
+            return response
+
+        client._call_upstream = fake_upstream
+        request = LLMRequest(prompt="hello", model="gpt-4", agent="Architect")
+        await client.ask_async(request)
+        await client.ask_async(request)
+
+        agent = monitor.snapshot()["agents"]["Architect"]
+        assert agent["requests"] == 2
+        assert agent["cache_hits"] == 1
+        assert agent["completion_tokens"] == 7
+        await client.close()
@@ -0,0 +1,95 @@
+"""
+Tests for the sharded on-disk LLM response cache.
+"""
+import json
+
+from bmad.agents.core.ai.response_cache import ShardedFileCache
+
+
+def _key(n: int) -> str:
+    return f"{n:064x}"
+
+
+class TestShardedFileCache:
+    """Test ShardedFileCache."""
+
+    def test_roundtrip_uses_shard_directory(self, tmp_path):
+        """Test that entries are stored in a fanout directory."""
+        cache = ShardedFileCache(str(tmp_path), compress=False)
+        key = "ab" + "0" * 62
+        cache.set(key, {"answer": "hi"})
+
+        assert (tmp_path / "ab" / f"{key}.json").exists()
+        assert cache.get(key) == {"answer": "hi"}
+        assert cache.get(_key(1)) is None
+
+    def test_compressed_entries(self, tmp_path):
+        """Test that compressed entries round-trip and are smaller."""
+        value = {"answer": "x" * 5000}
+        cache = ShardedFileCache(str(tmp_path), compress=True)
+        cache.set(_key(1), value)
+
+        path = tmp_path / "00" / f"{_key(1)}.json.gz"
+        assert path.exists()
+        assert path.stat().st_size < 1000
+        assert cache.get(_key(1)) == value
+
+    def test_entry_cap_evicts_least_recently_used(self, tmp_path):
+        """Test LRU eviction on the entry-count cap."""
+        cache = ShardedFileCache(str(tmp_path), max_entries=2)
+        cache.set(_key(1), {"n": 1})
+        cache.set(_key(2), {"n": 2})
+        assert cache.get(_key(1)) == {"n": 1}
+        cache.set(_key(3), {"n": 3})
+
+        assert cache.get(_key(2)) is None
+        assert cache.get(_key(1)) == {"n": 1}
+        assert cache.get(_key(3)) == {"n": 3}
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_size_cap(self, tmp_path):
+        """Test that the total size stays under the byte cap."""
+        cache = ShardedFileCache(str(tmp_path), max_bytes=2500, compress=False)
+        for n in range(10):
+            cache.set(_key(n), {"payload": "y" * 1000})
+
+        stats = cache.get_stats()
+        assert stats["total_bytes"] <= 2500
+        assert stats["entries"] == 2
+        files = [p for p in tmp_path.rglob("*.json")]
+        assert len(files) == 2
+
+    def test_ttl_expiry(self, tmp_path, monkeypatch):
+        """Test that expired entries are misses and get removed."""
+        now = [1000.0]
+        monkeypatch.setattr("bmad.agents.core.ai.response_cache.time.time", lambda: now[0])
+        cache = ShardedFileCache(str(tmp_path), ttl=60)
+        cache.set(_key(1), {"n": 1})
+        now[0] += 61
+
+        assert cache.get(_key(1)) is None
+        assert cache.get_stats()["entries"] == 0
+        assert not list(tmp_path.rglob("*.json.gz"))
+
+    def test_index_rebuilt_from_disk_and_legacy_files_migrated(self, tmp_path):
+        """Test that a new instance sees existing and legacy flat entries."""
+        ShardedFileCache(str(tmp_path)).set(_key(1), {"n": 1})
+        legacy = tmp_path / f"{_key(2)}.json"
+        legacy.write_text(json.dumps({"answer": "legacy"}))
+
+        cache = ShardedFileCache(str(tmp_path))
+        assert cache.get(_key(1)) == {"n": 1}
+        assert cache.get(_key(2)) == {"answer": "legacy"}
+        assert not legacy.exists()
+        assert cache.get_stats()["entries"] == 2
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test that unreadable entries are dropped."""
+        cache = ShardedFileCache(str(tmp_path), compress=False)
+        cache.set(_key(1), {"n": 1})
+        path = tmp_path / "00" / f"{_key(1)}.json"
+        path.write_text("{not json")
+
+        assert cache.get(_key(1)) is None
+        assert not path.exists()
+        assert cache.get_stats()["total_bytes"] == 0
@@ -0,0 +1,174 @@
+"""
+Tests for token streaming from the LLM client against a local SSE stub.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.ai import llm_client
+from bmad.agents.core.ai.llm_client import stream_openai_with_confidence
+from bmad.core.ai.async_llm_client import LLMPerformanceMonitor
+
+
+def _sse(payload) -> bytes:
+    data = payload if isinstance(payload, str) else json.dumps(payload)
+    return f"data: {data}\n\n".encode("utf-8")
+
+
+def _chunk(content, logprob=None, finish_reason=None) -> dict:
+    choice = {"delta": {"content": content} if content else {}, "finish_reason": finish_reason}
+    if logprob is not None:
+        choice["logprobs"] = {"content": [{"token": content, "logprob": logprob}]}
+    return {"model": "stub-model", "choices": [choice]}
+
+
+class SSEStub:
+    """Chunked SSE endpoint that holds the stream open after the first token"""
+
+    def __init__(self, events):
+        self.events = events
+        self.release = threading.Event()
+        self.timed_out = False
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                stub.request = json.loads(self.rfile.read(length))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, event in enumerate(stub.events):
+                    if i == 1 and not stub.release.wait(timeout=5):
+                        stub.timed_out = True
+                    body = _sse(event)
+                    self.wfile.write(f"{len(body):x}\r\n".encode() + body + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/chat/completions"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+EVENTS = [
+    _chunk("Hello", logprob=-0.1),
+    _chunk(" world", logprob=-0.3),
+    _chunk(None, finish_reason="stop"),
+    "[DONE]",
+]
+
+
+@pytest.fixture(autouse=True)
+def no_file_cache():
+    with patch.object(llm_client, "_file_cache_set") as cache_set:
+        yield cache_set
+
+
+class TestStreaming:
+    """Test stream_openai_with_confidence."""
+
+    def test_first_token_arrives_before_stream_ends(self):
+        """Test that tokens are delivered while the server is still sending."""
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url):
+            stream = stream_openai_with_confidence("hi", {"agent": "TestEngineer"}, model="stub")
+            first = next(stream)
+            assert first == "Hello"
+            assert not stub.release.is_set()
+            assert stream.result is None
+
+            stub.release.set()
+            assert list(stream) == [" world"]
+
+        assert not stub.timed_out
+        assert stub.request["stream"] is True
+        assert stream.result["content"] == "Hello world"
+        assert stream.result["model"] == "stub-model"
+        assert stream.result["finish_reason"] == "stop"
+        assert stream.result["streamed"] is True
+
+    def test_logprob_confidence_accumulates(self, no_file_cache):
+        """Test incremental logprob confidence and caching of the final result."""
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url):
+            stub.release.set()
+            stream = stream_openai_with_confidence("hi", model="stub")
+            next(stream)
+            assert stream.logprob_confidence == pytest.approx((-0.1 + 2) / 2)
+            result = stream.consume()
+
+        assert stream.logprob_confidence == pytest.approx((-0.2 + 2) / 2)
+        assert 0.0 <= result["confidence"] <= 1.0
+        no_file_cache.assert_called_once()
+        cached = no_file_cache.call_args.args[1]
+        assert cached["answer"] == result["content"]
+        assert cached["llm_confidence"] == result["confidence"]
+
+    def test_streamed_answer_serves_later_non_streaming_calls(self):
+        """Test that a cached stream result has the shape ask_openai reads."""
+        store = {}
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url), \
+                patch.object(llm_client, "_file_cache_set", side_effect=store.__setitem__), \
+                patch.object(llm_client, "_file_cache_get", side_effect=store.get):
+            stub.release.set()
+            stream_openai_with_confidence("same prompt", model="stub").consume()
+
+            with patch.object(llm_client, "get_http_session") as session:
+                assert llm_client.ask_openai("same prompt", model="stub") == "Hello world"
+                result = llm_client.ask_openai_with_confidence("same prompt", model="stub")
+            session.assert_not_called()
+
+        assert 0.0 <= result["llm_confidence"] <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_async_iteration(self):
+        """Test async iteration over the token stream."""
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url):
+            stub.release.set()
+            stream = stream_openai_with_confidence("hi", model="stub")
+            tokens = [token async for token in stream]
+
+        assert tokens == ["Hello", " world"]
+        assert stream.result["content"] == "Hello world"
+
+    def test_handle_streaming_response_still_returns_full_result(self):
+        """Test the blocking helper used by ask_openai_with_confidence(stream=True)."""
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url):
+            stub.release.set()
+            result = llm_client.ask_openai_with_confidence.__wrapped__(
+                "hi", {"agent": "TestEngineer"}, model="stub", stream=True)
+
+        assert result["content"] == "Hello world"
+        assert result["streamed"] is True
+
+    def test_time_to_first_token_is_reported(self):
+        """Test that streaming reports TTFT to the performance monitor."""
+        monitor = LLMPerformanceMonitor()
+        with SSEStub(EVENTS) as stub, patch.object(llm_client, "OPENAI_CHAT_URL", stub.url), \
+                patch.object(llm_client, "get_llm_performance_monitor", return_value=monitor):
+            stub.release.set()
+            stream = stream_openai_with_confidence("hi", {"agent": "TestEngineer"}, model="stub")
+            stream.consume()
+
+        assert stream.time_to_first_token is not None
+        agent = monitor.snapshot()["agents"]["TestEngineer"]
+        assert agent["time_to_first_token"]["count"] == 1
+        assert agent["completion_tokens"] == 2
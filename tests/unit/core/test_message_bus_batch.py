@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for batched publishing on the BMAD MessageBus
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from bmad.core.message_bus import MessageBus
+
+
+@pytest.fixture
+def message_bus(tmp_path):
+    bus = MessageBus(use_redis=False)
+    bus.event_file = tmp_path / "events.json"
+    return bus
+
+
+class TestPublishMany:
+    """Test MessageBus.publish_many"""
+
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_events_in_order(self, message_bus):
+        received = []
+
+        async def handler(event):
+            received.append(event.data["n"])
+
+        await message_bus.subscribe("task_updated", handler)
+        success = await message_bus.publish_many(
+            [("task_updated", {"n": i}) for i in range(5)], source_agent="Scrummaster"
+        )
+
+        assert success is True
+        assert received == [0, 1, 2, 3, 4]
+        ids = [e.event_id for e in message_bus.event_history]
+        assert len(set(ids)) == 5
+
+    @pytest.mark.asyncio
+    async def test_batch_subscribers_get_one_call_per_type(self, message_bus):
+        batches = []
+        await message_bus.subscribe_batch("task_updated", lambda events: batches.append(events))
+
+        await message_bus.publish_many([
+            ("task_updated", {"n": 1}),
+            {"event_type": "workflow_completed", "data": {}, "source_agent": "Orchestrator"},
+            ("task_updated", {"n": 2}),
+        ])
+
+        assert len(batches) == 1
+        assert [e.data["n"] for e in batches[0]] == [1, 2]
+
+        await message_bus.publish("task_updated", {"n": 3})
+        assert [e.data["n"] for e in batches[1]] == [3]
+
+        assert await message_bus.unsubscribe_batch("task_updated", batches.append) is False
+
+    @pytest.mark.asyncio
+    async def test_single_persistence_flush(self, message_bus):
+        with patch.object(message_bus, "_save_events_to_file",
+                          wraps=message_bus._save_events_to_file) as save:
+            await message_bus.publish_many([("e", {"n": i}) for i in range(10)])
+        assert save.call_count == 1
+        data = json.loads(message_bus.event_file.read_text())
+        assert len(data["events"]) == 10
+
+    @pytest.mark.asyncio
+    async def test_event_log_batch(self, tmp_path):
+        bus = MessageBus(use_redis=False, event_log_dir=str(tmp_path / "log"))
+        await bus.publish_many([("e", {"n": i}) for i in range(3)])
+        replayed = await bus.replay_events()
+        assert [e.data["n"] for e in replayed] == [0, 1, 2]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_redis_batch_is_one_pipeline(self, message_bus):
+        fakeredis = pytest.importorskip("fakeredis")
+        message_bus.use_redis = True
+        message_bus.redis_client = fakeredis.FakeRedis()
+
+        with patch.object(message_bus.redis_client, "pipeline",
+                          wraps=message_bus.redis_client.pipeline) as pipeline:
+            await message_bus.publish_many([("e", {"n": i}) for i in range(4)])
+
+        assert pipeline.call_count == 1
+        assert message_bus.redis_client.llen("bmad:events:history:e") == 4
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self, message_bus):
+        assert await message_bus.publish_many([]) is True
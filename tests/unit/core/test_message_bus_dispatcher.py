@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the BMAD subscriber dispatcher
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from bmad.core.message_bus import MessageBus, OverflowPolicy, SubscriberDispatcher
+
+
+class TestSubscriberDispatcher:
+    """Test SubscriberDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_does_not_delay_others(self):
+        dispatcher = SubscriberDispatcher()
+        fast_received = []
+        slow_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow(event):
+            slow_started.set()
+            await release.wait()
+
+        async def fast(event):
+            fast_received.append(event)
+
+        await dispatcher.dispatch("e1", [slow, fast])
+        await dispatcher.dispatch("e2", [slow, fast])
+        await asyncio.wait_for(slow_started.wait(), timeout=1)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert fast_received == ["e1", "e2"]
+
+        release.set()
+        await dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_drop_newest_policy(self):
+        dispatcher = SubscriberDispatcher(max_queue_size=2, overflow_policy=OverflowPolicy.DROP_NEWEST)
+        received = []
+        release = asyncio.Event()
+
+        async def handler(event):
+            await release.wait()
+            received.append(event)
+
+        await dispatcher.dispatch(0, [handler])
+        await asyncio.sleep(0)  # let the worker pick up event 0
+        for i in range(1, 5):
+            await dispatcher.dispatch(i, [handler])
+        release.set()
+        await dispatcher.drain()
+
+        # one event is in flight, two fit in the queue
+        assert received == [0, 1, 2]
+        metrics = next(iter(dispatcher.get_metrics().values()))
+        assert metrics["dropped"] == 2
+        await dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_policy(self):
+        dispatcher = SubscriberDispatcher(max_queue_size=2, overflow_policy="drop_oldest")
+        received = []
+        release = asyncio.Event()
+
+        async def handler(event):
+            await release.wait()
+            received.append(event)
+
+        await dispatcher.dispatch(0, [handler])
+        await asyncio.sleep(0)  # let the worker pick up event 0
+        for i in range(1, 5):
+            await dispatcher.dispatch(i, [handler])
+        release.set()
+        await dispatcher.drain()
+
+        assert received == [0, 3, 4]
+        await dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_block_policy_applies_backpressure(self):
+        dispatcher = SubscriberDispatcher(max_queue_size=1)
+
+        async def handler(event):
+            await asyncio.sleep(0.01)
+
+        for i in range(4):
+            await asyncio.wait_for(dispatcher.dispatch(i, [handler]), timeout=1)
+        await dispatcher.drain()
+        metrics = next(iter(dispatcher.get_metrics().values()))
+        assert metrics["delivered"] == 4
+        assert metrics["dropped"] == 0
+        await dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_concurrency_per_subscriber(self):
+        dispatcher = SubscriberDispatcher(concurrency=4)
+        active = 0
+        peak = 0
+
+        async def handler(event):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        for i in range(8):
+            await dispatcher.dispatch(i, [handler])
+        await dispatcher.drain()
+        assert peak == 4
+        await dispatcher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_metrics_track_failures_and_latency(self):
+        dispatcher = SubscriberDispatcher()
+
+        def failing(event):
+            raise ValueError("boom")
+
+        await dispatcher.dispatch("e", [failing])
+        await dispatcher.drain()
+        metrics = next(iter(dispatcher.get_metrics().values()))
+        assert metrics["failed"] == 1
+        assert metrics["queue_depth"] == 0
+        assert metrics["max_latency"] >= 0.0
+        await dispatcher.shutdown()
+
+
+class TestMessageBusConcurrentDispatch:
+    """Test MessageBus with concurrent dispatch enabled"""
+
+    @pytest.mark.asyncio
+    async def test_publish_does_not_wait_for_handlers(self):
+        bus = MessageBus(use_redis=False, concurrent_dispatch=True)
+        received = []
+
+        async def slow_handler(event):
+            await asyncio.sleep(0.2)
+            received.append(event)
+
+        await bus.subscribe("test_event", slow_handler)
+        started = time.perf_counter()
+        assert await bus.publish("test_event", {"n": 1}, "TestAgent") is True
+        assert time.perf_counter() - started < 0.1
+        assert received == []
+
+        await bus.drain()
+        assert len(received) == 1
+        assert len(bus.get_dispatch_metrics()) == 1
+
+        await bus.unsubscribe("test_event", slow_handler)
+        assert bus.get_dispatch_metrics() == {}
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the BMAD bounded, indexed event history
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from bmad.core.message_bus import EventHistory, MessageBus
+from bmad.core.message_bus.message_bus import Event
+
+BASE = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def _event(i, event_type="event", source="Agent", minutes=0):
+    return Event(event_type=event_type, data={"i": i}, source_agent=source,
+                 timestamp=BASE + timedelta(minutes=minutes), event_id=f"evt_{i}")
+
+
+class TestEventHistory:
+    """Test EventHistory"""
+
+    def test_ring_buffer_is_bounded(self):
+        history = EventHistory(maxlen=5)
+        for i in range(12):
+            history.append(_event(i))
+        assert len(history) == 5
+        assert history.total_appended == 12
+        assert [e.data["i"] for e in history] == [7, 8, 9, 10, 11]
+        assert history[0].data["i"] == 7
+        assert history[-1].data["i"] == 11
+        assert [e.data["i"] for e in history[-2:]] == [10, 11]
+
+    def test_indexes_are_trimmed_on_eviction(self):
+        history = EventHistory(maxlen=4)
+        for i in range(10):
+            history.append(_event(i, event_type=f"type_{i % 2}", source=f"agent_{i % 3}", minutes=i))
+        assert sum(history.count_by_type().values()) == 4
+        assert sum(history.count_by_source().values()) == 4
+        assert history.query(event_type="type_0", limit=None) == [history[0], history[2]]
+
+    def test_query_by_type_source_and_time(self):
+        history = EventHistory(maxlen=100)
+        for i in range(30):
+            history.append(_event(i, event_type="a" if i % 3 else "b",
+                                  source="x" if i < 15 else "y", minutes=i))
+
+        by_type = history.query(event_type="b", limit=None)
+        assert [e.data["i"] for e in by_type] == [0, 3, 6, 9, 12, 15, 18, 21, 24, 27]
+
+        combined = history.query(event_type="b", source_agent="y", limit=2)
+        assert [e.data["i"] for e in combined] == [24, 27]
+
+        window = history.query(since=BASE + timedelta(minutes=10),
+                               until=BASE + timedelta(minutes=13), limit=None)
+        assert [e.data["i"] for e in window] == [10, 11, 12, 13]
+
+        open_ended = history.query(since=BASE + timedelta(minutes=28), limit=None)
+        assert [e.data["i"] for e in open_ended] == [28, 29]
+
+    def test_time_filter_with_selective_index_reads_only_matches(self):
+        history = EventHistory(maxlen=5000)
+        for i in range(5000):
+            history.append(_event(i, event_type="rare" if i % 1000 == 0 else "common", minutes=i // 100))
+
+        reads = []
+        buffer = history._buffer
+
+        class CountingBuffer(list):
+            def __getitem__(self, index):
+                reads.append(index)
+                return buffer[index]
+
+        history._buffer = CountingBuffer(buffer)
+        result = history.query(event_type="rare", since=BASE + timedelta(minutes=10), limit=None)
+        assert [e.data["i"] for e in result] == [1000, 2000, 3000, 4000]
+        assert len(reads) == 5
+
+        # Time as the driving index is walked lazily, newest first, across buckets
+        reads.clear()
+        latest = history.query(since=BASE, limit=3)
+        assert [e.data["i"] for e in latest] == [4997, 4998, 4999]
+        assert len(reads) == 3
+
+    def test_out_of_order_timestamps_and_bucket_eviction(self):
+        history = EventHistory(maxlen=3)
+        for i, minutes in enumerate([5, 1, 3, 2, 4]):
+            history.append(_event(i, minutes=minutes))
+        assert history._bucket_keys == sorted(history._by_bucket)
+        window = history.query(since=BASE + timedelta(minutes=2), limit=None)
+        assert [e.data["i"] for e in window] == [2, 3, 4]
+
+    def test_query_unknown_key_returns_empty(self):
+        history = EventHistory(maxlen=10)
+        history.append(_event(1))
+        assert history.query(event_type="missing") == []
+        assert history.query(source_agent="missing") == []
+
+    def test_invalid_maxlen(self):
+        with pytest.raises(ValueError):
+            EventHistory(maxlen=0)
+
+
+class TestMessageBusHistory:
+    """Test MessageBus get_events filters"""
+
+    @pytest.mark.asyncio
+    async def test_history_size_and_filters(self, tmp_path):
+        bus = MessageBus(use_redis=False, history_size=3)
+        bus.event_file = tmp_path / "events.json"
+        for i in range(5):
+            await bus.publish(f"event{i % 2}", {"i": i}, f"Agent{i}")
+
+        assert len(bus.event_history) == 3
+        assert [e.data["i"] for e in await bus.get_events("event0")] == [2, 4]
+        assert [e.data["i"] for e in await bus.get_events(source_agent="Agent3")] == [3]
+        since = datetime.now() - timedelta(minutes=1)
+        assert len(await bus.get_events(since=since)) == 3
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the BMAD segmented event log
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from bmad.core.message_bus import MessageBus, SegmentedEventLog
+
+
+def _record(i, ts=None):
+    return {
+        "event_type": "test_event",
+        "data": {"i": i},
+        "source_agent": "TestAgent",
+        "timestamp": ts if ts is not None else time.time(),
+        "event_id": f"evt_{i}",
+    }
+
+
+class TestSegmentedEventLog:
+    """Test SegmentedEventLog"""
+
+    def test_append_assigns_sequential_offsets(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path))
+        offsets = [log.append(_record(i)) for i in range(5)]
+        assert offsets == [0, 1, 2, 3, 4]
+        assert [r["data"]["i"] for r in log.read()] == [0, 1, 2, 3, 4]
+        log.close()
+
+    def test_records_are_compact_ndjson(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path))
+        log.append(_record(1))
+        log.close()
+        content = (tmp_path / f"{0:020d}.log").read_text()
+        assert content.count("\n") == 1
+        assert ": " not in content
+
+    def test_size_based_rollover(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path), segment_max_bytes=200)
+        for i in range(20):
+            log.append(_record(i))
+        assert log.get_stats()["segments"] > 1
+        assert [r["offset"] for r in log.read(from_offset=7, limit=5)] == [7, 8, 9, 10, 11]
+        log.close()
+
+    def test_time_based_rollover(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path), segment_max_age=0.0)
+        log.append(_record(0))
+        log.append(_record(1))
+        assert log.get_stats()["segments"] == 2
+        log.close()
+
+    def test_retention_drops_oldest_segments(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path), segment_max_bytes=1, max_segments=3)
+        for i in range(10):
+            log.append(_record(i))
+        assert log.get_stats()["segments"] == 3
+        assert [r["data"]["i"] for r in log.read()] == [7, 8, 9]
+        log.close()
+
+    def test_fsync_batching(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path), fsync_every=10, fsync_interval=60)
+        for i in range(5):
+            log.append(_record(i))
+        assert log.get_stats()["unsynced_records"] == 5
+        log.flush()
+        assert log.get_stats()["unsynced_records"] == 0
+        log.close()
+
+    def test_replay_from_event_id_and_timestamp(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path), segment_max_bytes=300)
+        base = time.time()
+        for i in range(10):
+            log.append(_record(i, ts=base + i))
+        assert [r["data"]["i"] for r in log.replay(from_event_id="evt_6")] == [7, 8, 9]
+        assert [r["data"]["i"] for r in log.replay(since=base + 4.5)] == [5, 6, 7, 8, 9]
+        assert list(log.replay(from_event_id="missing")) == []
+        log.close()
+
+    def test_reopen_recovers_torn_tail(self, tmp_path):
+        log = SegmentedEventLog(str(tmp_path))
+        for i in range(3):
+            log.append(_record(i))
+        log.close()
+        with open(tmp_path / f"{0:020d}.log", "ab") as handle:
+            handle.write(b'{"partial":')
+
+        reopened = SegmentedEventLog(str(tmp_path))
+        assert reopened.append(_record(3)) == 3
+        assert [r["data"]["i"] for r in reopened.read()] == [0, 1, 2, 3]
+        reopened.close()
+
+
+class TestMessageBusEventLog:
+    """Test MessageBus with the event log backend"""
+
+    @pytest.mark.asyncio
+    async def test_publish_and_replay(self, tmp_path):
+        bus = MessageBus(use_redis=False, event_log_dir=str(tmp_path / "log"))
+        await bus.publish("event1", {"n": 1}, "Agent1")
+        await bus.publish("event2", {"n": 2}, "Agent2")
+        await bus.publish("event3", {"n": 3}, "Agent3")
+
+        first_id = bus.event_history[0].event_id
+        replayed = await bus.replay_events(from_event_id=first_id)
+        assert [e.event_type for e in replayed] == ["event2", "event3"]
+
+        since = datetime.now() - timedelta(minutes=1)
+        assert len(await bus.replay_events(since=since)) == 3
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_replay_without_event_log_uses_history(self):
+        bus = MessageBus(use_redis=False)
+        await bus.publish("event1", {}, "Agent1")
+        await bus.publish("event2", {}, "Agent2")
+        replayed = await bus.replay_events(from_event_id=bus.event_history[0].event_id)
+        assert [e.event_type for e in replayed] == ["event2"]
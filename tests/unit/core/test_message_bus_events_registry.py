@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled BMAD event-type registry
+"""
+
+import pytest
+
+from bmad.core.message_bus import (
+    EVENT_CATEGORIES,
+    VALID_EVENT_TYPES,
+    EventTypes,
+    MessageBus,
+    get_all_event_types,
+    get_event_categories,
+    intern_event_type,
+    is_valid_event_type,
+)
+
+
+class TestEventRegistry:
+    """Test the event-type registry"""
+
+    def test_registry_matches_event_types(self):
+        expected = sorted(
+            (attr, getattr(EventTypes, attr)) for attr in dir(EventTypes)
+            if not attr.startswith('_') and isinstance(getattr(EventTypes, attr), str)
+        )
+        assert get_all_event_types() == [value for _, value in expected]
+        assert isinstance(VALID_EVENT_TYPES, frozenset)
+
+    def test_validation(self):
+        assert is_valid_event_type(EventTypes.FEEDBACK_COLLECTED)
+        assert not is_valid_event_type("not_a_real_event")
+
+    def test_category_lookup(self):
+        assert "feedback" in get_event_categories(EventTypes.FEEDBACK_COLLECTED)
+        assert get_event_categories("not_a_real_event") == ()
+        for category, events in EVENT_CATEGORIES.items():
+            for event_type in events:
+                assert category in get_event_categories(event_type)
+
+    def test_interning(self):
+        dynamic = "".join(["feedback", "_", "collected"])
+        assert dynamic is not EventTypes.FEEDBACK_COLLECTED
+        assert intern_event_type(dynamic) is EventTypes.FEEDBACK_COLLECTED
+        assert intern_event_type("custom_event") == "custom_event"
+
+
+class TestMessageBusValidation:
+    """Test event-type validation on publish"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_types_rejected_when_enabled(self, tmp_path):
+        bus = MessageBus(use_redis=False, validate_event_types=True)
+        bus.event_file = tmp_path / "events.json"
+
+        assert await bus.publish("not_a_real_event", {}) is False
+        assert await bus.publish(EventTypes.FEEDBACK_COLLECTED, {}) is True
+        assert await bus.publish_many([("not_a_real_event", {})]) is False
+        assert len(bus.event_history) == 1
@@ -0,0 +1,172 @@
+"""
+Tests for the incremental (journal) backend and cached reader of the communication message bus.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+import bmad.agents.core.communication.message_bus as mb
+from bmad.agents.core.communication.event_journal import EventJournal
+
+
+@pytest.fixture
+def incremental_bus(tmp_path):
+    """Message bus in incremental mode against a temporary context file."""
+    context_path = tmp_path / "shared_context.json"
+    context_path.write_text(json.dumps({"events": []}))
+
+    original = (mb.SHARED_CONTEXT_PATH, mb.BACKEND, mb.COMPACTION_THRESHOLD_BYTES)
+    original_subscribers = mb._subscribers.copy()
+    mb._subscribers.clear()
+    mb.SHARED_CONTEXT_PATH = context_path
+    mb.configure_backend("incremental", compaction_threshold_bytes=10 * 1024 * 1024)
+
+    yield context_path
+
+    mb.SHARED_CONTEXT_PATH, mb.BACKEND, mb.COMPACTION_THRESHOLD_BYTES = original
+    mb._subscribers.clear()
+    mb._subscribers.update(original_subscribers)
+
+
+class TestEventJournal:
+    """Test EventJournal."""
+
+    def test_append_and_read_from_offset(self, tmp_path):
+        journal = EventJournal(tmp_path / "ctx.json")
+        journal.append({"event": "a", "data": {}, "timestamp": "t1"})
+        events, offset = journal.read_from(0)
+        assert [e["event"] for e in events] == ["a"]
+
+        journal.append({"event": "b", "data": {}, "timestamp": "t2"})
+        events, new_offset = journal.read_from(offset)
+        assert [e["event"] for e in events] == ["b"]
+        assert new_offset == journal.size()
+
+    def test_partial_trailing_line_is_deferred(self, tmp_path):
+        journal = EventJournal(tmp_path / "ctx.json")
+        journal.append({"event": "a", "data": {}, "timestamp": "t1"})
+        with open(journal.journal_path, "ab") as f:
+            f.write(b'{"event": "b"')
+        events, offset = journal.read_from(0)
+        assert len(events) == 1
+        assert offset < journal.size()
+
+
+class TestIncrementalBackend:
+    """Test the incremental publish path of the communication message bus."""
+
+    def test_publish_appends_to_journal_only(self, incremental_bus):
+        mb.publish("event1", {"n": 1})
+        mb.publish("event2", {"n": 2})
+
+        snapshot = json.loads(incremental_bus.read_text())
+        assert snapshot["events"] == []
+        assert not Path(f"{incremental_bus}.backup").exists()
+        assert [e["event"] for e in mb.get_events()] == ["event1", "event2"]
+        assert mb.get_statistics()["total_events"] == 2
+
+    def test_compaction_folds_journal_into_snapshot(self, incremental_bus):
+        for i in range(3):
+            mb.publish("event", {"n": i})
+        assert mb.compact_events() == 3
+
+        snapshot = json.loads(incremental_bus.read_text())
+        assert [e["data"]["n"] for e in snapshot["events"]] == [0, 1, 2]
+        assert mb.get_statistics()["journal_size"] == 0
+        assert len(mb.get_events()) == 3
+
+    def test_threshold_triggers_compaction(self, incremental_bus):
+        mb.configure_backend("incremental", compaction_threshold_bytes=1)
+        mb.publish("event", {"n": 1})
+        snapshot = json.loads(incremental_bus.read_text())
+        assert len(snapshot["events"]) == 1
+
+    def test_subscribers_run_outside_lock(self, incremental_bus):
+        received = []
+
+        def callback(event_obj):
+            # Publishing from a callback would deadlock if the lock were still held
+            if event_obj["event"] == "outer":
+                mb.publish("inner", {})
+            received.append(event_obj["event"])
+
+        mb.subscribe("outer", callback)
+        mb.subscribe("inner", callback)
+        mb.publish("outer", {})
+        assert received == ["inner", "outer"]
+
+    def test_concurrent_publishers_lose_no_events(self, incremental_bus):
+        def worker(n):
+            for i in range(25):
+                mb.publish("event", {"worker": n, "i": i})
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(mb.get_events()) == 100
+
+    def test_clear_events_clears_journal(self, incremental_bus):
+        mb.publish("event", {})
+        mb.clear_events()
+        assert mb.get_events() == []
+
+    def test_unknown_backend(self, incremental_bus):
+        with pytest.raises(ValueError):
+            mb.configure_backend("nope")
+
+
+class TestContextReader:
+    """Test cached statistics and tail reads."""
+
+    def test_statistics_count_types_and_agents(self, incremental_bus):
+        mb.publish("built", {"agent": "Backend"})
+        mb.publish("built", {"agent_name": "Frontend"})
+        mb.publish("tested", {})
+
+        stats = mb.get_statistics()
+        assert stats["total_events"] == 3
+        assert stats["event_types"] == {"built": 2, "tested": 1}
+        assert stats["agents"] == {"Backend": 1, "Frontend": 1, "unknown": 1}
+
+    def test_unchanged_snapshot_is_not_reparsed(self, incremental_bus, monkeypatch):
+        mb.publish("event", {"n": 1})
+        mb.get_events()
+
+        calls = []
+        original = mb.load_context_safely
+        monkeypatch.setattr(mb._readers[incremental_bus], "_load_snapshot",
+                            lambda: calls.append(1) or original())
+
+        mb.publish("event", {"n": 2})
+        assert len(mb.get_events()) == 2
+        assert mb.get_statistics()["total_events"] == 2
+        assert calls == []
+
+    def test_only_new_journal_bytes_are_read(self, incremental_bus, monkeypatch):
+        mb.publish("event", {"n": 1})
+        reader = mb._get_reader()
+        offsets = []
+        original = reader.journal.read_from
+        monkeypatch.setattr(reader.journal, "read_from",
+                            lambda offset=0: offsets.append(offset) or original(offset))
+
+        mb.publish("event", {"n": 2})
+        mb.get_events()
+        assert offsets and offsets[0] > 0
+
+    def test_compaction_and_external_rewrite_are_detected(self, incremental_bus):
+        mb.publish("event", {"n": 1})
+        assert len(mb.get_events()) == 1
+        mb.compact_events()
+        mb.publish("event", {"n": 2})
+        assert [e["data"]["n"] for e in mb.get_events()] == [1, 2]
+
+        incremental_bus.write_text(json.dumps({"events": [
+            {"timestamp": "2023-01-01T10:00:00", "event": "external", "data": {}}
+        ]}))
+        assert [e["event"] for e in mb.get_events()] == ["external", "event"]
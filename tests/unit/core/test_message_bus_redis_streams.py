@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Tests for the BMAD Redis Streams transport
+"""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from bmad.core.message_bus import MessageBus, RedisStreamsTransport
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _transport(server, consumer="worker-1", **kwargs):
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    return RedisStreamsTransport(stream="test:stream", group="test", consumer=consumer,
+                                 block_ms=10, client=client, **kwargs)
+
+
+class TestRedisStreamsTransport:
+    """Test RedisStreamsTransport"""
+
+    @pytest.mark.asyncio
+    async def test_publish_batch_is_read_in_order(self, server):
+        transport = _transport(server)
+        await transport.ensure_group()
+        ids = await transport.publish_batch([{"event_type": "e", "n": i} for i in range(5)])
+        assert len(ids) == 5
+
+        messages = await transport.read()
+        assert [data["n"] for _, data in messages] == [0, 1, 2, 3, 4]
+        assert await transport.ack([message_id for message_id, _ in messages]) == 5
+
+    @pytest.mark.asyncio
+    async def test_consumer_group_splits_work(self, server):
+        first = _transport(server, consumer="worker-1", batch_size=2)
+        second = _transport(server, consumer="worker-2", batch_size=2)
+        await first.ensure_group()
+        await first.publish_batch([{"n": i} for i in range(4)])
+
+        got_first = await first.read()
+        got_second = await second.read()
+        seen = sorted(data["n"] for _, data in got_first + got_second)
+        assert seen == [0, 1, 2, 3]
+        assert len(got_first) == 2 and len(got_second) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_messages_are_reclaimed(self, server):
+        failing = _transport(server, consumer="worker-1")
+        await failing.ensure_group()
+        await failing.publish({"event_type": "e", "n": 1})
+
+        async def broken(_event):
+            raise RuntimeError("boom")
+
+        await failing._process(await failing.read(), broken)
+        assert failing.stats["failed"] == 1
+
+        healthy = _transport(server, consumer="worker-2")
+        reclaimed = await healthy.reclaim(min_idle_ms=0)
+        assert [data["n"] for _, data in reclaimed] == [1]
+
+    @pytest.mark.asyncio
+    async def test_consume_until_stopped(self, server):
+        transport = _transport(server)
+        await transport.ensure_group()
+        await transport.publish_batch([{"n": i} for i in range(3)])
+        received = []
+
+        async def handler(event):
+            received.append(event["n"])
+            if len(received) == 3:
+                transport.stop()
+
+        await asyncio.wait_for(transport.consume(handler), timeout=2)
+        assert received == [0, 1, 2]
+        assert transport.stats["acked"] == 3
+
+
+def _bus(server, **streams_options):
+    sync_client = fakeredis.FakeRedis(server=server)
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    fan_out = streams_options.pop("fan_out", False)
+    with patch("bmad.core.message_bus.message_bus.redis.from_url", return_value=sync_client):
+        return MessageBus(use_streams=True, streams_fan_out=fan_out,
+                          streams_options={"client": async_client, "block_ms": 10, **streams_options})
+
+
+class TestMessageBusStreams:
+    """Test MessageBus with the Redis Streams transport"""
+
+    @pytest.mark.asyncio
+    async def test_events_cross_bus_instances(self, server):
+        publisher = _bus(server, consumer="publisher")
+        consumer = _bus(server, consumer="consumer")
+        received = []
+
+        async def handler(event):
+            received.append(event)
+            consumer.streams.stop()
+
+        await consumer.subscribe("remote_event", handler)
+        await consumer.start()
+        await publisher.publish("remote_event", {"n": 1}, "Publisher")
+
+        await asyncio.wait_for(consumer.start_redis_listener(), timeout=2)
+        assert len(received) == 1
+        assert received[0].source_agent == "Publisher"
+        await publisher.aclose()
+        await consumer.aclose()
+
+    @pytest.mark.asyncio
+    async def test_default_group_keeps_events_published_before_listening(self, server, monkeypatch):
+        monkeypatch.setenv("BMAD_STREAMS_GROUP", "service-a")
+        publisher = _bus(server)
+        await publisher.publish("offline_event", {"n": 1}, "Publisher")
+        await publisher.aclose()
+
+        consumer = _bus(server)
+        assert consumer.streams.group == "service-a"
+        received = []
+
+        async def handler(event):
+            received.append(event.data["n"])
+            consumer.streams.stop()
+
+        await consumer.subscribe("offline_event", handler)
+        await asyncio.wait_for(consumer.start_redis_listener(), timeout=2)
+        assert received == [1]
+
+        # The stable group outlives the bus
+        await consumer.aclose()
+        client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        groups = await client.xinfo_groups("bmad:stream:events")
+        assert [group["name"] for group in groups] == ["service-a"]
+
+    @pytest.mark.asyncio
+    async def test_fan_out_buses_receive_each_others_events(self, server):
+        first, second = _bus(server, fan_out=True), _bus(server, fan_out=True)
+        assert first.streams.consumer != second.streams.consumer
+        assert first.streams.group != second.streams.group
+        received = {"first": [], "second": []}
+
+        def handler(name):
+            async def handle(event):
+                received[name].append(event.data["n"])
+            return handle
+
+        await first.subscribe("shared_event", handler("first"))
+        await second.subscribe("shared_event", handler("second"))
+        await first.start()
+        await second.start()
+        listeners = [asyncio.create_task(bus.start_redis_listener()) for bus in (first, second)]
+
+        await first.publish("shared_event", {"n": 1}, "First")
+        await second.publish("shared_event", {"n": 2}, "Second")
+        for _ in range(200):
+            if len(received["first"]) == 2 and len(received["second"]) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        for bus in (first, second):
+            bus.streams.stop()
+        await asyncio.wait_for(asyncio.gather(*listeners), timeout=2)
+        # Own events locally, the peer's events through the stream, each exactly once
+        assert sorted(received["first"]) == [1, 2]
+        assert sorted(received["second"]) == [1, 2]
+
+        # aclose deletes the per-instance group
+        await first.aclose()
+        groups = await second.streams.client.xinfo_groups("bmad:stream:events")
+        assert [group["name"] for group in groups] == [second.streams.group]
+        await second.aclose()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for BMAD hierarchical topic subscriptions
+"""
+
+import pytest
+
+from bmad.core.message_bus import EventTypes, MessageBus, TopicTrie, topics_for_event_type
+
+
+def _cb(name):
+    def callback(event):
+        return name
+    callback.__name__ = name
+    return callback
+
+
+class TestTopicTrie:
+    """Test TopicTrie matching"""
+
+    @pytest.mark.parametrize("pattern,topic,expected", [
+        ("agent.started", "agent.started", True),
+        ("agent.*", "agent.started", True),
+        ("agent.*", "agent.task.started", False),
+        ("agent.#", "agent", True),
+        ("agent.#", "agent.task.started", True),
+        ("#", "anything.at.all", True),
+        ("*.started", "agent.started", True),
+        ("agent.#.failed", "agent.task.step.failed", True),
+        ("agent.#.failed", "agent.failed", True),
+        ("agent.#.failed", "agent.task.done", False),
+        ("workflow.*", "agent.started", False),
+    ])
+    def test_pattern_semantics(self, pattern, topic, expected):
+        trie = TopicTrie()
+        callback = _cb("cb")
+        trie.add(pattern, callback)
+        assert (callback in trie.match(topic)) is expected
+
+    def test_remove_prunes_and_invalidates_cache(self):
+        trie = TopicTrie()
+        callback = _cb("cb")
+        trie.add("workflow.*", callback)
+        assert trie.match_event_type(EventTypes.WORKFLOW_STARTED) == (callback,)
+
+        assert trie.remove("workflow.*", callback) is True
+        assert len(trie) == 0
+        assert trie.match_event_type(EventTypes.WORKFLOW_STARTED) == ()
+        assert trie.remove("workflow.*", callback) is False
+
+    def test_event_type_matches_through_categories(self):
+        assert "workflow.workflow_started" in topics_for_event_type(EventTypes.WORKFLOW_STARTED)
+
+        trie = TopicTrie()
+        callback = _cb("cb")
+        trie.add("#", callback)
+        trie.add("workflow.*", callback)
+        # matched via several topics, reported once
+        assert trie.match_event_type(EventTypes.WORKFLOW_STARTED) == (callback,)
+
+    def test_many_subscribers_single_pattern(self):
+        trie = TopicTrie()
+        callbacks = [_cb(f"cb{i}") for i in range(100)]
+        for callback in callbacks:
+            trie.add("feedback.*", callback)
+        assert trie.match_event_type(EventTypes.FEEDBACK_COLLECTED) == tuple(callbacks)
+
+
+class TestMessageBusTopics:
+    """Test wildcard subscriptions on MessageBus"""
+
+    @pytest.mark.asyncio
+    async def test_wildcard_and_exact_subscribers(self, tmp_path):
+        bus = MessageBus(use_redis=False)
+        bus.event_file = tmp_path / "events.json"
+        audit, workflow = [], []
+
+        async def audit_handler(event):
+            audit.append(event.event_type)
+
+        async def workflow_handler(event):
+            workflow.append(event.event_type)
+
+        await bus.subscribe("#", audit_handler)
+        await bus.subscribe("workflow.*", workflow_handler)
+        await bus.subscribe(EventTypes.WORKFLOW_STARTED, workflow_handler)
+
+        await bus.publish(EventTypes.WORKFLOW_STARTED, {})
+        await bus.publish(EventTypes.FEEDBACK_COLLECTED, {})
+        await bus.publish("agent.task.started", {})
+
+        assert audit == [EventTypes.WORKFLOW_STARTED, EventTypes.FEEDBACK_COLLECTED, "agent.task.started"]
+        assert workflow == [EventTypes.WORKFLOW_STARTED]
+
+        assert await bus.unsubscribe("#", audit_handler) is True
+        await bus.publish(EventTypes.FEEDBACK_COLLECTED, {})
+        assert len(audit) == 3
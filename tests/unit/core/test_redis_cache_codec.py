@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests voor de binaire cache codec en RedisCache met een echte (fake) Redis.
+"""
+
+import datetime
+import gzip
+import json
+import os
+import pickle
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.data import cache_codec
+from bmad.agents.core.data.cache_codec import MAGIC, CacheCodec, CodecError
+from bmad.agents.core.data.redis_cache import RedisCache, _compress_data, _decompress_data
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class Point:
+    def __init__(self):
+        self.x = 1
+        self.y = 2
+
+
+class TestCacheCodec:
+    """Test CacheCodec"""
+
+    @pytest.mark.parametrize("value", [
+        "tekst", b"\x00\xffbinary", {"a": [1, 2.5, None, True]}, [1, "twee"], 0, None, 2 ** 80,
+    ])
+    def test_roundtrip(self, value):
+        codec = CacheCodec()
+        assert codec.decode(codec.encode(value)) == value
+
+    def test_header_identifies_format(self):
+        codec = CacheCodec(serializer="json", compressor="zlib")
+        encoded = codec.encode({"a": 1})
+        assert encoded[:1] == MAGIC
+        assert encoded[1] >> 4 == cache_codec.JsonSerializer.tag
+        assert encoded[1] & 0x0F == 0
+
+    def test_large_payloads_are_compressed(self):
+        codec = CacheCodec(compressor="zlib", level=1, compress_min_bytes=1024)
+        value = {"content": "lorem ipsum " * 1000}
+        encoded = codec.encode(value)
+
+        assert encoded[1] & 0x0F == cache_codec.ZlibCompressor.tag
+        assert len(encoded) < len(json.dumps(value)) / 10
+        assert codec.decode(encoded) == value
+
+    def test_small_or_incompressible_payloads_stay_raw(self):
+        codec = CacheCodec(compressor="zlib", compress_min_bytes=16)
+        assert codec.encode("short")[1] & 0x0F == 0
+        assert codec.encode(os.urandom(512))[1] & 0x0F == 0
+
+    @pytest.mark.skipif(not cache_codec.ZstdCompressor.available(), reason="zstandard not installed")
+    def test_zstd_compression(self):
+        codec = CacheCodec(compressor="zstd", level=1)
+        value = "x" * 5000
+        encoded = codec.encode(value)
+        assert encoded[1] & 0x0F == cache_codec.ZstdCompressor.tag
+        assert CacheCodec(compressor="none").decode(encoded) == value
+
+    def test_json_fallback_without_msgpack(self):
+        codec = CacheCodec(serializer="json")
+        assert codec.decode(codec.encode({"a": 1})) == {"a": 1}
+
+    def test_objects_are_stored_by_attributes(self):
+        codec = CacheCodec()
+        assert codec.decode(codec.encode(Point())) == {"x": 1, "y": 2}
+
+    def test_unserializable_values_raise(self):
+        with pytest.raises(CodecError):
+            CacheCodec().encode(lambda: None)
+        with pytest.raises(CodecError):
+            CacheCodec().encode({"handler": print})
+
+    @pytest.mark.parametrize("serializer", ["auto", "json", "json-std"])
+    def test_common_value_types_are_stored_plain(self, serializer):
+        codec = CacheCodec(serializer=serializer)
+        value = {
+            "at": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "day": datetime.date(2024, 1, 2),
+            "tags": {"b", "a"},
+            "price": Decimal("1.10"),
+            "id": uuid.UUID(int=1),
+        }
+        assert codec.decode(codec.encode(value)) == {
+            "at": "2024-01-02T03:04:05",
+            "day": "2024-01-02",
+            "tags": ["a", "b"],
+            "price": "1.10",
+            "id": "00000000-0000-0000-0000-000000000001",
+        }
+
+    def test_legacy_values_are_readable(self):
+        codec = CacheCodec()
+        assert codec.decode(b'{"a": 1}') == {"a": 1}
+        assert codec.decode("plain text") == "plain text"
+        assert codec.decode(gzip.compress(b'{"a": 1}')) == {"a": 1}
+
+    def test_legacy_pickle_is_not_loaded(self):
+        payload = gzip.compress(pickle.dumps(Point()))
+        with pytest.raises(CodecError):
+            CacheCodec().decode(payload)
+        assert _decompress_data(payload) is None
+
+    def test_compress_helpers_keep_error_marker(self):
+        assert _decompress_data(_compress_data(print)) == {
+            "error": "Serialization failed: Cannot serialize function object"}
+
+
+class TestRedisCacheBinary:
+    """Test RedisCache tegen fakeredis"""
+
+    @pytest.fixture
+    def redis_cache(self):
+        server = fakeredis.FakeServer()
+
+        def from_url(url, **kwargs):
+            return fakeredis.FakeRedis(server=server, **kwargs)
+
+        with patch("redis.from_url", side_effect=from_url):
+            yield RedisCache()
+
+    def test_values_keep_their_type(self, redis_cache):
+        for value in [{"a": [1, 2]}, "123", 42, b"\x00\x01", None]:
+            assert redis_cache.set("key", value, ttl=60)
+            assert redis_cache.get("key", default="missing") == value
+
+    def test_values_are_stored_binary(self, redis_cache):
+        redis_cache.set("key", {"content": "x" * 5000}, ttl=60)
+        raw = redis_cache.binary_client.get("key")
+        assert raw.startswith(MAGIC)
+        assert len(raw) < 1000
+
+    def test_legacy_json_entries_still_read(self, redis_cache):
+        redis_cache.redis_client.set("legacy", json.dumps({"a": 1}))
+        assert redis_cache.get("legacy") == {"a": 1}
+
+    def test_unserializable_value_is_not_cached(self, redis_cache):
+        assert redis_cache.set("key", {"handler": print}) is False
+        assert not redis_cache.exists("key")
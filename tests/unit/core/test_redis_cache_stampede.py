@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests voor stampede protection (single-flight, stale-while-revalidate en
+probabilistic early refresh) in de cache decorators.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.data import redis_cache as redis_cache_module
+from bmad.agents.core.data.redis_cache import (
+    ENTRY_MARKER,
+    LOCK_PREFIX,
+    RedisCache,
+    _StampedeGuard,
+    cache_llm_response,
+    cached,
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_cache():
+    server = fakeredis.FakeServer()
+
+    def from_url(url, **kwargs):
+        return fakeredis.FakeRedis(server=server, **kwargs)
+
+    with patch("redis.from_url", side_effect=from_url):
+        cache = RedisCache()
+    with patch.object(redis_cache_module, "cache", cache):
+        yield cache
+
+
+def _wait_for_refresh():
+    executor = redis_cache_module._get_refresh_executor()
+    executor.submit(lambda: None).result(timeout=5)
+
+
+class TestLocks:
+    """Test acquire_lock/release_lock"""
+
+    def test_lock_is_exclusive(self, redis_cache):
+        token = redis_cache.acquire_lock("key", ttl=5)
+        assert token
+        assert redis_cache.acquire_lock("key", ttl=5) is None
+
+        redis_cache.release_lock("key", "not-the-owner")
+        assert redis_cache.binary_client.exists(LOCK_PREFIX + "key")
+
+        redis_cache.release_lock("key", token)
+        assert redis_cache.acquire_lock("key", ttl=5)
+
+    def test_disabled_cache_never_blocks(self):
+        cache = RedisCache.__new__(RedisCache)
+        cache.enabled = False
+        cache.binary_client = None
+        assert cache.acquire_lock("key")
+        assert cache.acquire_lock("key")
+
+
+class TestSingleFlight:
+    """Test dat concurrent misses één keer berekenen"""
+
+    def test_concurrent_misses_compute_once(self, redis_cache):
+        calls = []
+
+        @cached(ttl=60, key_prefix="test")
+        def slow(x):
+            calls.append(x)
+            time.sleep(0.2)
+            return x * 2
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [42] * 8
+        assert calls == [21]
+
+    def test_lock_is_released_when_function_raises(self, redis_cache):
+        @cached(ttl=60, key_prefix="test")
+        def failing():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            failing()
+        assert not redis_cache.binary_client.keys(LOCK_PREFIX + "*")
+
+    def test_waiter_backs_off_and_computes_after_lock_timeout(self):
+        reads = []
+        guard = _StampedeGuard(
+            read=lambda key: reads.append(key),
+            write=lambda key, value, ttl: None,
+            acquire=lambda key, ttl: None,  # lock held by a worker that never fills
+            release=lambda key, token: None,
+            ttl=60, lock_timeout=1.0)
+
+        start = time.time()
+        assert guard.get("key", lambda: "local") == "local"
+        assert time.time() - start < 1.5
+        # Initial read plus a handful of backed-off polls, not one per 50ms
+        assert len(reads) <= 8
+
+    def test_plain_values_from_before_the_envelope_are_returned(self, redis_cache):
+        @cached(ttl=60, key_prefix="test")
+        def func():
+            return "computed"
+
+        key = redis_cache_module._generate_key("test_func")
+        redis_cache.set(key, "legacy", ttl=60)
+        assert func() == "legacy"
+
+
+class TestStaleWhileRevalidate:
+    """Test serveren van stale waarden met refresh op de achtergrond"""
+
+    def test_expired_value_is_served_while_refreshing(self, redis_cache):
+        version = {"n": 0}
+
+        @cached(ttl=60, key_prefix="test", stale_ttl=30)
+        def func():
+            version["n"] += 1
+            return version["n"]
+
+        assert func() == 1
+        key = redis_cache_module._generate_key("test_func")
+        entry = redis_cache.get(key)
+        assert entry[ENTRY_MARKER] == 1
+        assert redis_cache.binary_client.ttl(key) > 60
+
+        # Soft TTL verlopen: oude waarde direct, nieuwe na de refresh
+        entry["expires"] = time.time() - 1
+        redis_cache.set(key, entry, ttl=30)
+        assert func() == 1
+        _wait_for_refresh()
+        assert func() == 2
+        assert version["n"] == 2
+
+    def test_early_refresh_probability(self):
+        entry = {ENTRY_MARKER: 1, "value": 1, "delta": 1.0}
+
+        entry["expires"] = time.time() + 3600
+        assert not redis_cache_module._should_refresh(entry, beta=1.0)
+        entry["expires"] = time.time() - 1
+        assert redis_cache_module._should_refresh(entry, beta=0.0)
+
+        # Dichtbij expiry met een dure berekening: vaak al eerder verversen
+        entry["expires"] = time.time() + 1.0
+        with patch.object(redis_cache_module.random, "random", return_value=0.9):
+            assert redis_cache_module._should_refresh(entry, beta=1.0)
+
+    def test_only_one_background_refresh(self):
+        store = {"k": {ENTRY_MARKER: 1, "value": "old", "expires": 0, "delta": 0}}
+        acquired = []
+
+        def acquire(key, ttl):
+            if acquired:
+                return None
+            acquired.append(key)
+            return "token"
+
+        refreshes = []
+        guard = _StampedeGuard(
+            read=store.get,
+            write=lambda key, entry, ttl: store.__setitem__(key, entry),
+            acquire=acquire,
+            release=lambda key, token: None,
+            ttl=60,
+            stale_ttl=30,
+        )
+        with patch.object(redis_cache_module, "_get_refresh_executor") as executor:
+            executor.return_value.submit.side_effect = lambda fn, *args: refreshes.append(args)
+            assert [guard.get("k", lambda: "new") for _ in range(5)] == ["old"] * 5
+        assert len(refreshes) == 1
+
+
+class TestLLMResponseCache:
+    """Test cache_llm_response met stampede protection"""
+
+    def test_concurrent_prompts_call_upstream_once(self):
+        client = fakeredis.FakeRedis()
+        calls = []
+
+        @cache_llm_response(ttl=60)
+        def ask(prompt):
+            calls.append(prompt)
+            time.sleep(0.2)
+            return {"answer": prompt.upper()}
+
+        with patch.object(redis_cache_module, "get_redis_client", return_value=client):
+            results = []
+            threads = [threading.Thread(target=lambda: results.append(ask("hi"))) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert results == [{"answer": "HI"}] * 5
+        assert calls == ["hi"]
+
+    def test_redis_errors_fall_back_to_execution(self):
+        class BrokenClient:
+            def __getattr__(self, name):
+                def fail(*args, **kwargs):
+                    raise ConnectionError("down")
+                return fail
+
+        @cache_llm_response
+        def ask(prompt):
+            return prompt
+
+        with patch.object(redis_cache_module, "get_redis_client", return_value=BrokenClient()):
+            assert ask("x") == "x"
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Tests voor de L1 near cache in RedisCache.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from bmad.agents.core.data.near_cache import NearCache, derive_l1_ttls
+from bmad.agents.core.data.redis_cache import RedisCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _wait_until(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestNearCache:
+    """Test NearCache"""
+
+    def test_lru_bounds(self):
+        near = NearCache(max_entries=2, max_bytes=10)
+        near.set("a", b"1234", ttl=60)
+        near.set("b", b"1234", ttl=60)
+        near.get("a")
+        near.set("c", b"1234", ttl=60)  # evicts b on count and bytes
+
+        assert near.get("b") is None
+        assert near.get("a") == b"1234"
+        assert near.stats()["bytes"] == 8
+        assert not near.set("big", b"x" * 100, ttl=60)
+        assert len(near) == 2
+
+    def test_entries_expire(self):
+        near = NearCache()
+        near.set("a", b"1", ttl=0.01)
+        time.sleep(0.02)
+        assert near.get("a") is None
+
+    def test_large_values_stay_remote(self):
+        near = NearCache(max_value_bytes=4)
+        assert not near.set("a", b"12345", ttl=60)
+
+    def test_invalidation_during_read_is_not_stored(self):
+        near = NearCache()
+        version = near.version
+        near.invalidate("a")
+        assert not near.set("a", b"old", ttl=60, version=version)
+
+    def test_mutable_values_are_copied(self):
+        near = NearCache()
+        near.set("a", {"items": [1]}, ttl=60, size=16)
+        near.get("a")["items"].append(2)
+        assert near.get("a") == {"items": [1]}
+        assert near.stats()["bytes"] == 16
+
+    def test_invalidate_pattern(self):
+        near = NearCache()
+        near.set("project_x", b"1", ttl=60)
+        near.set("clickup_y", b"1", ttl=60)
+        near.invalidate_pattern("project_*")
+        assert near.get("project_x") is None
+        assert near.get("clickup_y") == b"1"
+
+    def test_ttls_derived_from_default_table(self):
+        ttls = derive_l1_ttls({"project_config": 86400, "metrics": 60}, fraction=0.1, max_ttl=300)
+        assert ttls == {"project_config": 300, "metrics": 6}
+
+
+class TestRedisCacheL1:
+    """Test RedisCache met L1 tegen fakeredis"""
+
+    @pytest.fixture
+    def server(self):
+        return fakeredis.FakeServer()
+
+    @pytest.fixture
+    def make_cache(self, server):
+        caches = []
+
+        def from_url(url, **kwargs):
+            return fakeredis.FakeRedis(server=server, **kwargs)
+
+        def make(**kwargs):
+            with patch("redis.from_url", side_effect=from_url):
+                cache = RedisCache(l1_size=100, **kwargs)
+            caches.append(cache)
+            return cache
+
+        yield make
+        for cache in caches:
+            cache.close_near_cache()
+
+    def test_hot_reads_are_local(self, make_cache):
+        cache = make_cache()
+        cache.set("config", {"name": "bmad"}, cache_type="project_config")
+
+        with patch.object(cache.binary_client, "get", side_effect=AssertionError("network")), \
+                patch.object(cache.codec, "decode", side_effect=AssertionError("decode")):
+            assert cache.get("config", cache_type="project_config") == {"name": "bmad"}
+        assert cache.near_cache.stats()["hits"] == 1
+
+    def test_local_hits_cannot_be_mutated_by_callers(self, make_cache):
+        cache = make_cache()
+        cache.set("config", {"agents": ["a"]})
+        cache.get("config")["agents"].append("b")
+        assert cache.get("config") == {"agents": ["a"]}
+
+    def test_cached_none_is_a_local_hit(self, make_cache):
+        cache = make_cache()
+        cache.set("empty", None)
+        with patch.object(cache.binary_client, "get", side_effect=AssertionError("network")):
+            assert cache.get("empty", default="missing") is None
+
+    def test_remote_values_are_cached_locally(self, make_cache):
+        writer, reader = make_cache(), make_cache()
+        writer.set("config", "v1")
+        # A read racing the invalidation message is (conservatively) not stored
+        assert _wait_until(lambda: reader.near_cache.invalidations == 1)
+
+        assert reader.get("config") == "v1"
+        assert reader.near_cache.get("config") is not None
+
+    def test_writes_invalidate_other_instances(self, make_cache):
+        writer, reader = make_cache(), make_cache()
+        writer.set("config", "v1")
+        assert reader.get("config") == "v1"
+
+        writer.set("config", "v2")
+        assert _wait_until(lambda: reader.near_cache.get("config") is None)
+        assert reader.get("config") == "v2"
+
+        writer.delete("config")
+        assert _wait_until(lambda: reader.get("config") is None)
+
+    def test_clear_pattern_invalidates_other_instances(self, make_cache):
+        writer, reader = make_cache(), make_cache()
+        writer.set("project_a", 1)
+        assert reader.get("project_a") == 1
+
+        writer.clear_pattern("project_*")
+        assert _wait_until(lambda: reader.get("project_a") is None)
+
+    def test_listener_failure_disables_l1(self, make_cache):
+        cache = make_cache()
+        thread = cache._invalidation_thread
+        cache._on_invalidation_error(ConnectionError("lost"), thread.pubsub, thread)
+
+        assert cache.near_cache is None
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+    def test_l1_is_off_by_default(self, server):
+        def from_url(url, **kwargs):
+            return fakeredis.FakeRedis(server=server, **kwargs)
+
+        with patch("redis.from_url", side_effect=from_url):
+            cache = RedisCache()
+        assert cache.near_cache is None
+        assert "l1" not in cache.get_stats()
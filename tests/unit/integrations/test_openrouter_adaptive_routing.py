@@ -0,0 +1,187 @@
+"""
+Unit Tests for OpenRouter adaptive routing
+
+Tests latency/error tracking, budget-aware model selection and hedged
+requests against a simulated provider.
+"""
+
+import asyncio
+
+import pytest
+
+from integrations.openrouter.adaptive_router import AdaptiveRouter, ModelStats, RequestBudget
+from integrations.openrouter.openrouter_client import (
+    LLMConfig,
+    LLMProvider,
+    LLMResponse,
+    ModelTier,
+    OpenRouterClient,
+)
+
+FAST = LLMConfig(LLMProvider.OPENAI, "gpt-3.5-turbo", ModelTier.FAST)
+BALANCED = LLMConfig(LLMProvider.GOOGLE, "gemini-1.5-flash", ModelTier.BALANCED)
+QUALITY = LLMConfig(LLMProvider.OPENAI, "gpt-4o", ModelTier.QUALITY)
+
+
+class SimulatedProvider:
+    """Replaces _call_llm with configurable per-model latency and failures."""
+
+    def __init__(self, latencies, failing=()):
+        self.latencies = latencies
+        self.failing = set(failing)
+        self.calls = []
+        self.cancelled = []
+
+    async def __call__(self, config, prompt, context=None):
+        self.calls.append(config.model)
+        try:
+            await asyncio.sleep(self.latencies.get(config.model, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(config.model)
+            raise
+        if config.model in self.failing:
+            raise RuntimeError(f"{config.model} unavailable")
+        return LLMResponse(
+            content=f"answer from {config.model}",
+            model=config.model,
+            provider=config.provider.value,
+            tokens_used=100,
+            cost=0.0,
+            latency=self.latencies.get(config.model, 0.01),
+            confidence_score=0.0,
+        )
+
+
+@pytest.fixture
+def client():
+    return OpenRouterClient(api_key="test-key")
+
+
+def _warm_up(router, config, latency, n=10):
+    for _ in range(n):
+        router.record(config, latency, success=True)
+
+
+class TestModelStats:
+    """Test online statistics."""
+
+    def test_ewma_and_p95(self):
+        stats = ModelStats(alpha=0.5)
+        for latency in [1.0] * 19 + [10.0]:
+            stats.record_success(latency)
+        assert stats.p95_latency == 1.0
+        stats.record_success(10.0)
+        assert stats.p95_latency == 10.0
+        assert 1.0 < stats.ewma_latency < 10.0
+
+    def test_error_rate_decays_after_recovery(self):
+        stats = ModelStats(alpha=0.5)
+        stats.record_failure()
+        stats.record_failure()
+        assert stats.error_rate == pytest.approx(0.75)
+        for _ in range(5):
+            stats.record_success(0.1)
+        assert stats.error_rate < 0.05
+        assert stats.total_errors == 2
+
+
+class TestAdaptiveRouter:
+    """Test budget-aware ranking."""
+
+    def test_best_tier_within_latency_budget(self, client):
+        router = client.router
+        _warm_up(router, QUALITY, 3.0)
+        _warm_up(router, BALANCED, 0.8)
+        _warm_up(router, FAST, 0.3)
+
+        ranked = router.rank([FAST, BALANCED, QUALITY], RequestBudget(max_latency=1.0))
+        assert ranked == [BALANCED, FAST, QUALITY]
+
+    def test_cost_budget(self, client):
+        budget = RequestBudget(max_cost=0.001, expected_tokens=1000)
+        ranked = client.router.rank([QUALITY, BALANCED], budget)
+        assert ranked[0] == BALANCED
+
+    def test_unhealthy_models_go_last(self, client):
+        router = client.router
+        _warm_up(router, QUALITY, 0.1)
+        for _ in range(10):
+            router.record(QUALITY, 0.0, success=False)
+        assert router.rank([QUALITY, FAST])[0] == FAST
+
+    def test_closest_to_budget_when_nothing_fits(self):
+        router = AdaptiveRouter(lambda provider, model, tokens: 0.0)
+        _warm_up(router, QUALITY, 5.0)
+        _warm_up(router, FAST, 2.0)
+        assert router.rank([QUALITY, FAST], RequestBudget(max_latency=1.0)) == [FAST, QUALITY]
+
+
+class TestAdaptiveResponses:
+    """Test routing and hedging end-to-end with a simulated provider."""
+
+    @pytest.mark.asyncio
+    async def test_measured_latency_drives_selection(self, client):
+        provider = SimulatedProvider({QUALITY.model: 0.05, BALANCED.model: 0.01})
+        client._call_llm = provider
+
+        budget = RequestBudget(max_latency=0.03)
+        client.router.min_samples = 1
+        client.router.default_latency = 0.0
+        await client.generate_adaptive_response("q", budget, candidates=[QUALITY, BALANCED])
+        await client.generate_adaptive_response("q", budget, candidates=[QUALITY, BALANCED])
+        response = await client.generate_adaptive_response("q", budget, candidates=[QUALITY, BALANCED])
+
+        assert response.model == BALANCED.model
+        assert response.metadata["routing"]["selected"] == "google/gemini-1.5-flash"
+        stats = client.get_routing_stats()["models"]
+        assert stats["openai/gpt-4o"]["ewma_latency"] >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_falls_back_and_records_errors(self, client):
+        provider = SimulatedProvider({}, failing={QUALITY.model})
+        client._call_llm = provider
+
+        response = await client.generate_adaptive_response("q", candidates=[QUALITY, FAST])
+
+        assert response.model == FAST.model
+        assert provider.calls == [QUALITY.model, FAST.model]
+        assert client.router.stats["openai/gpt-4o"].total_errors == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_wins_when_primary_is_slow(self, client):
+        provider = SimulatedProvider({QUALITY.model: 1.0, FAST.model: 0.01})
+        client._call_llm = provider
+
+        budget = RequestBudget(hedge=True, hedge_delay=0.02)
+        response = await asyncio.wait_for(
+            client.generate_adaptive_response("q", budget, candidates=[QUALITY, FAST]), timeout=0.5)
+
+        assert response.model == FAST.model
+        assert provider.cancelled == [QUALITY.model]
+        assert client.hedge_stats == {"hedged_requests": 1, "hedge_wins": 1}
+        # The cancelled primary is not counted as an error
+        assert "openai/gpt-4o" not in client.router.stats
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_when_primary_is_fast(self, client):
+        provider = SimulatedProvider({QUALITY.model: 0.01, FAST.model: 0.01})
+        client._call_llm = provider
+
+        budget = RequestBudget(hedge=True, hedge_delay=0.5)
+        response = await client.generate_adaptive_response("q", budget, candidates=[QUALITY, FAST])
+
+        assert response.model == QUALITY.model
+        assert provider.calls == [QUALITY.model]
+        assert client.hedge_stats["hedged_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_hedge_started_immediately_when_primary_fails(self, client):
+        provider = SimulatedProvider({QUALITY.model: 0.0, FAST.model: 0.01}, failing={QUALITY.model})
+        client._call_llm = provider
+
+        budget = RequestBudget(hedge=True, hedge_delay=5.0)
+        response = await asyncio.wait_for(
+            client.generate_adaptive_response("q", budget, candidates=[QUALITY, FAST]), timeout=1)
+
+        assert response.model == FAST.model
+        assert client.hedge_stats == {"hedged_requests": 1, "hedge_wins": 1}